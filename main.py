@@ -1,9 +1,22 @@
+import argparse
+import contextlib
+import json
+import math
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, islice
 
 import numpy as np
 from matplotlib import pyplot as plt
 
+import mylibs.audit_log as al
+import mylibs.cluster as cluster
+import mylibs.explanation as ex
+import mylibs.hvac_batch as hb
 import mylibs.membership_functions as mf
+import mylibs.memory_profile as mp
+import mylibs.rule_analysis as ra
 
 """ Universe of Discourse """
 # input variables
@@ -111,60 +124,36 @@ def dominant_category(name, memberships):
     return dominant
 
 
-def hvac_control_app(in_temp=None, in_humid=None, in_co2=None):
-    print("HVAC Control System using Fuzzy Logic")
+"""
+Runs the controller for one reading.
+    Returns an explanation.HvacResult; categories, degrees and the rule trace are only computed when it is
+    printed or inspected. verbose=False skips the printed summary and plot=False skips the figures.
+    defuzzifier is "centroid" or "trap" (see hvac_batch.DEFUZZIFIERS). With an audit_log.AuditLog as `audit`,
+    the inference is logged for `zone` at the current time.
+"""
 
-    # Print inputs with categories
-    print(f"Input Temperature: {in_temp:.1f} °C")
-    print(f"Input Humidity: {in_humid:.1f}")
-    print(f"Input CO₂: {in_co2:.1f} ppm")
 
-    # Fuzzification
+def hvac_control_app(in_temp=None, in_humid=None, in_co2=None, verbose=True, plot=True, defuzzifier="centroid",
+                     audit=None, zone=0):
+    result = ex.explain(in_temp, in_humid, in_co2, defuzzifier=defuzzifier)
+    if audit is not None:
+        audit.append(time.time(), zone, (in_temp, in_humid, in_co2), result.strengths, result.output,
+                     hb.height_categories(hb.clip_heights(result.strengths)))
+    if verbose:
+        print("HVAC Control System using Fuzzy Logic")
+        print(result)
+    if plot:
+        plot_hvac(in_temp, in_humid, in_co2, float(result), defuzzifier)
+    return result
+
+
+def plot_hvac(in_temp, in_humid, in_co2, res, defuzzifier="centroid"):
+    # Fuzzification and rules evaluation for the plotted points and aggregate
     fuzzify_temp(in_temp)
     fuzzify_humid(in_humid)
     fuzzify_co2(in_co2)
-
-    # Collect memberships
-    temp_memberships = {
-        "Cold": in_cold_temp,
-        "Comfortable": in_comfortable_temp,
-        "Warm": in_warm_temp,
-    }
-    humid_memberships = {
-        "Dry": in_dry_humid,
-        "Normal": in_normal_humid,
-        "High": in_high_humid,
-    }
-    co2_memberships = {"Low": in_low_co2, "Medium": in_medium_co2, "High": in_high_co2}
-
-    # Show dominant categories
-    temp_cat = dominant_category("Temperature", temp_memberships)
-    humid_cat = dominant_category("Humidity", humid_memberships)
-    co2_cat = dominant_category("CO₂", co2_memberships)
-
-    # Rules Evaluation
     r = evaluate_rules()
 
-    # Defuzzification
-    # res = mf.defuzzify_trap(hvac, r)
-    res = mf.defuzzify_centroid(hvac, r)
-
-    # HVAC category (compare crisp output to membership functions)
-    hvac_memberships = {
-        "Off": np.max(np.minimum(r, off_hvac)),
-        "Low": np.max(np.minimum(r, low_hvac)),
-        "Medium": np.max(np.minimum(r, medium_hvac)),
-        "High": np.max(np.minimum(r, high_hvac)),
-    }
-
-    res_cat = dominant_category("HVAC", hvac_memberships)
-
-    print(f"Input Summary:")
-    print(f" - Temperature: {in_temp:.1f} °C ({temp_cat})")
-    print(f" - Humidity: {in_humid:.1f} % ({humid_cat})")
-    print(f" - CO₂: {in_co2:.1f} ppm ({co2_cat})")
-    print(f"Recommended HVAC Level: {res:.2f} % ({res_cat})")
-
     plt.figure(0, figsize=(12, 6))
     plt.subplot(1, 3, 1)
     plt.plot(temp, cold_temp, label="Cold", color="skyblue")
@@ -208,20 +197,199 @@ def hvac_control_app(in_temp=None, in_humid=None, in_co2=None):
     plt.fill_between(hvac, np.zeros_like(hvac), r, color="orange", alpha=0.7)
     plt.scatter([res], [0], color="red", label="Defuzzified Output")
     plt.xlabel("HVAC Level")
-    plt.title("Defuzzification using Centroid Method")
+    plt.title(f"Defuzzification using {defuzzifier.capitalize()} Method")
     plt.legend()
     plt.show()
 
 
+""" Batch Mode """
+BATCH_BLOCK = 65536  # rows read, inferred and written per block
+
+
+"""
+Crisp HVAC level and HVAC category code (index into hvac_batch.HVAC_TERMS) for an (N, 3) block of readings.
+    The category is the dominant term of the aggregate, as printed by hvac_control_app. Rows are inferred in
+    chunks of chunk_size, which bounds the (chunk, grid) temporaries (see memory_profile.recommend_chunk_size).
+    Only the rules of rule_analysis.HVAC_MINIMAL_RULES are evaluated; the subsumed ones cannot change the result.
+"""
+
+
+def infer_block(readings, defuzzifier="centroid", chunk_size=hb.DEFAULT_CHUNK_SIZE):
+    readings = np.asarray(readings, dtype=float).reshape(-1, 3)
+    levels = np.empty(len(readings))
+    categories = np.empty(len(readings), dtype=np.intp)
+    rules = ra.HVAC_MINIMAL_RULES
+    for start in range(0, len(readings), chunk_size):
+        sl = slice(start, start + chunk_size)
+        strengths = hb.firing_strengths(hb.fuzzify_inputs(*readings[sl].T), rules)
+        levels[sl] = hb.DEFUZZIFIERS[defuzzifier](hb.HVAC_UNIVERSE, hb.aggregate(strengths, rules=rules))
+        categories[sl] = hb.height_categories(hb.clip_heights(strengths, rules))
+    return readings, levels, categories
+
+
+def is_csv_header(line):
+    if line.lstrip()[:1] in ("[", "{"):
+        return False
+    try:
+        float(line.split(",")[0])
+    except ValueError:
+        return True
+    return False
+
+
+"""
+Parses a block of input lines: CSV rows "temp,humidity,co2" or JSON lines, either [temp, humidity, co2] or
+    {"temp": ..., "humid": ..., "co2": ...}. A non-numeric CSV header line is skipped when skip_header is set;
+    run_batch strips it once per stream instead, so later blocks never lose their first line.
+"""
+
+
+def parse_lines(lines, skip_header=True):
+    lines = [line for line in lines if line.strip()]
+    if not lines:
+        return np.empty((0, 3))
+    if lines[0].lstrip()[0] in "[{":
+        rows = [json.loads(line) for line in lines]
+        return np.array([[r["temp"], r["humid"], r["co2"]] if isinstance(r, dict) else r for r in rows], dtype=float)
+    if skip_header and is_csv_header(lines[0]):
+        lines = lines[1:]
+    return np.loadtxt(lines, delimiter=",", usecols=(0, 1, 2), ndmin=2)
+
+
+def _json_number(x):
+    # json.dumps would write a bare NaN / Infinity token, which is not JSON.
+    return x if math.isfinite(x) else None
+
+
+def format_block(readings, levels, categories, fmt="csv"):
+    labels = [label for label, _, _ in hb.HVAC_TERMS]
+    if fmt == "jsonl":
+        return "".join(
+            json.dumps({"temp": _json_number(t), "humid": _json_number(h), "co2": _json_number(c),
+                        "hvac": _json_number(round(level, 4)), "category": labels[cat]}) + "\n"
+            for (t, h, c), level, cat in zip(readings.tolist(), levels.tolist(), categories.tolist())
+        )
+    return "".join(
+        f"{t:g},{h:g},{c:g},{level:.4f},{labels[cat]}\n"
+        for (t, h, c), level, cat in zip(readings.tolist(), levels.tolist(), categories.tolist())
+    )
+
+
+def _run_block(job):
+    lines, defuzzifier, fmt, chunk_size, audited = job
+    readings, levels, categories = infer_block(parse_lines(lines, skip_header=False), defuzzifier, chunk_size)
+    text = format_block(readings, levels, categories, fmt)
+    if not audited:
+        return len(readings), text, None
+    # Audit records hold the strengths of every HVAC rule, including the subsumed one infer_block skips.
+    strengths = hb.firing_strengths(hb.fuzzify_inputs(*readings.T))
+    return len(readings), text, (readings, strengths, levels, categories)
+
+
+"""
+Reads readings from `source` (an open text file), writes one result row per reading to `out` and returns
+    (rows, seconds). Blocks of BATCH_BLOCK lines are parsed, inferred and formatted in worker processes when
+    workers > 1; results are written in input order as they complete, so memory stays bounded.
+    chunk_size is passed on to infer_block. With an audit_log.AuditLog as `audit`, every inference is logged for
+    `zone`, stamped with the time its block was written out.
+"""
+
+
+def run_batch(source, out, fmt="csv", defuzzifier="centroid", workers=1, block_size=BATCH_BLOCK,
+              chunk_size=hb.DEFAULT_CHUNK_SIZE, audit=None, zone=0):
+    started = time.perf_counter()
+    if fmt == "csv":
+        out.write("temp,humid,co2,hvac,category\n")
+    source = iter(source)
+    for first in source:
+        if first.strip():
+            if not is_csv_header(first):
+                source = chain([first], source)
+            break
+    blocks = iter(lambda: list(islice(source, block_size)), [])
+    jobs = ((lines, defuzzifier, fmt, chunk_size, audit is not None) for lines in blocks)
+    rows = 0
+
+    def write(result):
+        nonlocal rows
+        n, text, record = result
+        out.write(text)
+        if record is not None:
+            audit.append(time.time(), zone, *record)  # packed here, written by the log's background thread
+        rows += n
+
+    if workers <= 1:
+        for result in map(_run_block, jobs):
+            write(result)
+    else:
+        with ProcessPoolExecutor(workers) as executor:
+            # Keep at most 2 blocks per worker in flight, so reading never runs far ahead of writing.
+            pending = []
+            for job in jobs:
+                pending.append(executor.submit(_run_block, job))
+                if len(pending) >= 2 * workers:
+                    write(pending.pop(0).result())
+            for future in pending:
+                write(future.result())
+    return rows, time.perf_counter() - started
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="HVAC Control System using Fuzzy Logic",
+        usage="python main.py <temp> <humidity> <co2> [--no-plot] [--audit-log PATH [--zone ID]]\n"
+              "       python main.py --input FILE|- [--format csv|jsonl] [--workers N] [--defuzzifier centroid|trap]"
+              " [--memory-limit MIB] [--audit-log PATH [--zone ID]]\n"
+              "       python main.py --serve HOST:PORT",
+    )
+    parser.add_argument("values", nargs="*", help="temperature (°C), humidity (%%) and CO2 (ppm)")
+    parser.add_argument("-i", "--input", help="batch mode: CSV or JSON-lines readings file, '-' for stdin")
+    parser.add_argument("--format", choices=("csv", "jsonl"), default="csv", help="batch output format")
+    parser.add_argument("--workers", type=int, default=1, help="batch worker processes")
+    parser.add_argument("--defuzzifier", choices=sorted(hb.DEFUZZIFIERS), default="centroid")
+    parser.add_argument("--memory-limit", type=float, metavar="MIB",
+                        help="batch mode: pick the inference chunk size that keeps each worker's peak under MIB")
+    parser.add_argument("--serve", metavar="HOST:PORT",
+                        help="run as a cluster worker answering infer_block requests (mylibs/cluster.py)")
+    parser.add_argument("--audit-log", metavar="PATH",
+                        help="append every inference, single or batch, to this audit log (mylibs/audit_log.py)")
+    parser.add_argument("--zone", type=int, default=0, help="zone id recorded in the audit log")
+    parser.add_argument("--no-plot", action="store_true", help="skip the figures for a single reading")
+    return parser
+
+
 if __name__ == "__main__":
+    args = build_parser().parse_args()
+    if args.serve is not None:
+        host, _, port = args.serve.rpartition(":")
+        with cluster.WorkerServer((host or "127.0.0.1", int(port)), infer_block) as server:
+            print(f"Worker listening on {server.server_address[0]}:{server.server_address[1]}", file=sys.stderr)
+            server.serve_forever()
+        sys.exit(0)
+    if args.input is not None:
+        source = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+        chunk_size = hb.DEFAULT_CHUNK_SIZE
+        if args.memory_limit is not None:
+            chunk_size = mp.recommend_chunk_size(args.memory_limit * 2**20, rules=ra.HVAC_MINIMAL_RULES,
+                                                 defuzzifier=args.defuzzifier)
+        with source, contextlib.ExitStack() as stack:
+            audit = None if args.audit_log is None else stack.enter_context(al.AuditLog(args.audit_log))
+            rows, seconds = run_batch(source, sys.stdout, args.format, args.defuzzifier, args.workers,
+                                      chunk_size=chunk_size, audit=audit, zone=args.zone)
+        # The summary goes to stderr so stdout stays a clean CSV / JSON-lines stream.
+        print(f"Processed {rows} readings in {seconds:.3f} s ({rows / max(seconds, 1e-9):,.0f} readings/s, "
+              f"{max(1, args.workers)} worker(s))", file=sys.stderr)
+        sys.exit(0)
+
     # Check if exactly 3 arguments (plus the script name) are provided.
-    if len(sys.argv) == 4:
-        arg1 = sys.argv[1]
-        arg2 = sys.argv[2]
-        arg3 = sys.argv[3]
+    if len(args.values) == 3:
+        arg1, arg2, arg3 = args.values
         print(f"Received arguments: {arg1}, {arg2}, {arg3}")
     else:
-        print("Usage: python main.py <temp> <humidity> <co2> (no commas)")
+        print("Usage: python main.py <temp> <humidity> <co2> (no commas) [--no-plot] [--audit-log PATH [--zone ID]]")
+        print("       python main.py --input FILE|- [--format csv|jsonl] [--workers N] [--defuzzifier centroid|trap]"
+              " [--memory-limit MIB] [--audit-log PATH [--zone ID]]")
+        print("       python main.py --serve HOST:PORT")
         sys.exit(1)  # Exit with an error code
 
     # # Sample input values
@@ -229,4 +397,9 @@ if __name__ == "__main__":
     in_humid = float(arg2)  # Current indoor humidity in %
     in_co2 = float(arg3)  # Current CO2 concentration in ppm
 
-    hvac_control_app(in_temp, in_humid, in_co2)
+    if args.audit_log is None:
+        hvac_control_app(in_temp, in_humid, in_co2, plot=not args.no_plot, defuzzifier=args.defuzzifier)
+    else:
+        with al.AuditLog(args.audit_log, background=False) as audit:
+            hvac_control_app(in_temp, in_humid, in_co2, plot=not args.no_plot, defuzzifier=args.defuzzifier,
+                             audit=audit, zone=args.zone)
@@ -0,0 +1,277 @@
+# Append-only binary audit log of inferences: fixed-size records, optional ring buffer and a block index.
+import os
+import queue
+import struct
+import threading
+
+import numpy as np
+
+import mylibs.hvac_batch as hb
+
+""" Record Layout (61 bytes per inference) """
+AUDIT_DTYPE = np.dtype([
+    ("time", "<f8"),
+    ("zone", "<i8"),
+    ("temp", "<f4"),
+    ("humid", "<f4"),
+    ("co2", "<f4"),
+    ("strengths", "<f4", (len(hb.HVAC_RULES),)),  # weighted rule firing strengths
+    ("output", "<f4"),
+    ("category", "i1"),  # HVAC term index (hvac_batch.height_categories)
+])
+
+""" File Layout """
+# <path>: a 64-byte header (magic, version, record size, capacity in records (0: unbounded), block_rows, records
+# written so far), then the records; record number `seq` sits in slot seq % capacity (seq when unbounded).
+# <path>.idx: one INDEX_DTYPE entry per block of block_rows consecutive records (slot block % blocks in ring mode),
+# so a reader picks the blocks overlapping a zone / time range without touching the others.
+MAGIC = b"FZAUDIT1"
+VERSION = 1
+HEADER = struct.Struct("<8sIIQQQ")
+HEADER_BYTES = 64
+INDEX_DTYPE = np.dtype([
+    ("first", "<i8"),  # record number of the block's first record, -1: empty
+    ("count", "<i8"),
+    ("t_min", "<f8"),
+    ("t_max", "<f8"),
+    ("zone_min", "<i8"),
+    ("zone_max", "<i8"),
+])
+
+
+def read_header(f):
+    f.seek(0)
+    magic, version, record_bytes, capacity, block_rows, next_seq = HEADER.unpack(f.read(HEADER.size))
+    if magic != MAGIC or version != VERSION or record_bytes != AUDIT_DTYPE.itemsize:
+        raise ValueError(f"{getattr(f, 'name', f)} is not a version {VERSION} audit log")
+    return capacity, block_rows, next_seq
+
+
+def _empty_index(n):
+    index = np.zeros(n, dtype=INDEX_DTYPE)
+    index["first"] = -1
+    return index
+
+
+"""
+Audit log writer.
+    capacity: None appends forever; a number of records turns the file into a ring buffer of that many records
+        (rounded up to whole blocks) that overwrites the oldest block once full, so disk usage stays bounded.
+    block_rows: records per index entry; the ring keeps at least capacity - block_rows of the latest records.
+    background: file writes happen on a writer thread, so append() only packs the batch into records and queues
+        them; at most max_pending batches wait (append() blocks beyond that rather than drop records). flush()
+        waits until everything queued is on disk, close() also stops the thread.
+    An existing log is reopened and appended to; its capacity and block_rows win over the arguments.
+"""
+
+
+class AuditLog:
+    __slots__ = ("path", "capacity", "block_rows", "next_seq", "index", "_file", "_index_file", "_queue",
+                 "_thread", "_error")
+
+    def __init__(self, path, capacity=None, block_rows=4096, background=True, max_pending=64):
+        self.path = os.fspath(path)
+        if os.path.exists(self.path):
+            self._file = open(self.path, "r+b")
+            capacity, self.block_rows, self.next_seq = read_header(self._file)
+            self.capacity = capacity or None
+            self.index = np.fromfile(self.path + ".idx", dtype=INDEX_DTYPE)
+            self._index_file = open(self.path + ".idx", "r+b")
+        else:
+            self.block_rows = block_rows
+            self.capacity = None if capacity is None else -(-capacity // block_rows) * block_rows
+            self.next_seq = 0
+            self.index = _empty_index(0 if self.capacity is None else self.capacity // block_rows)
+            self._file = open(self.path, "w+b")
+            self._index_file = open(self.path + ".idx", "w+b")
+            self._index_file.write(self.index.tobytes())
+            self._write_header()
+            if self.capacity is not None:
+                # The whole ring up front: a first write that overflows it leaves the skipped slots unwritten.
+                self._file.truncate(HEADER_BYTES + self.capacity * AUDIT_DTYPE.itemsize)
+        self._error = None
+        self._queue = self._thread = None
+        if background:
+            self._queue = queue.Queue(maxsize=max_pending)
+            self._thread = threading.Thread(target=self._drain, name=f"audit-log {self.path}", daemon=True)
+            self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _write_header(self):
+        self._file.seek(0)
+        self._file.write(HEADER.pack(MAGIC, VERSION, AUDIT_DTYPE.itemsize, self.capacity or 0, self.block_rows,
+                                     self.next_seq).ljust(HEADER_BYTES, b"\0"))
+
+    """
+    Logs a batch of inferences. time may be a scalar or one value per row; readings are (N, 3), strengths
+        (N, 7); zone_ids, outputs and categories have N entries (zone_ids may also be a scalar).
+    """
+
+    def append(self, time, zone_ids, readings, strengths, outputs, categories):
+        if self._error is not None:
+            raise self._error
+        readings = np.asarray(readings).reshape(-1, 3)
+        records = np.empty(len(readings), dtype=AUDIT_DTYPE)
+        records["time"] = time
+        records["zone"] = zone_ids
+        records["temp"], records["humid"], records["co2"] = readings.T
+        records["strengths"] = strengths
+        records["output"] = outputs
+        records["category"] = categories
+        if self._queue is None:
+            self._write(records)
+        else:
+            self._queue.put(records)
+
+    def _drain(self):
+        while True:
+            batches = [self._queue.get()]
+            # Whatever else is already queued goes to disk in the same write.
+            while True:
+                try:
+                    batches.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = batches[-1] is None
+            try:
+                records = [b for b in batches if b is not None]
+                if records and self._error is None:
+                    self._write(np.concatenate(records))
+            except Exception as e:  # re-raised on the control path by the next append / flush
+                self._error = e
+            finally:
+                for _ in batches:
+                    self._queue.task_done()
+            if stop:
+                return
+
+    def _write(self, records):
+        if not len(records):
+            return
+        seq = self.next_seq
+        if self.capacity is not None:
+            # Only the blocks the ring still holds afterwards are written.
+            last_block = (seq + len(records) - 1) // self.block_rows
+            skip = max((last_block - len(self.index) + 1) * self.block_rows - seq, 0)
+            seq += skip
+            records = records[skip:]
+        seqs = seq + np.arange(len(records))
+        # Records: one contiguous run, or two when the ring wraps around.
+        slots = seqs % self.capacity if self.capacity is not None else seqs
+        bounds = np.r_[0, np.flatnonzero(np.diff(slots) != 1) + 1, len(records)]
+        for lo, hi in zip(bounds[:-1].tolist(), bounds[1:].tolist()):
+            self._file.seek(HEADER_BYTES + int(slots[lo]) * AUDIT_DTYPE.itemsize)
+            self._file.write(records[lo:hi].tobytes())
+
+        blocks = seqs // self.block_rows
+        starts = np.flatnonzero(np.r_[True, blocks[1:] != blocks[:-1]])
+        entries = blocks[starts] % len(self.index) if self.capacity is not None else blocks[starts]
+        if self.capacity is None and entries[-1] >= len(self.index):
+            self.index = np.concatenate([self.index, _empty_index(entries[-1] + 1 - len(self.index))])
+        e = self.index[entries]
+        reset = e["first"] != blocks[starts] * self.block_rows  # a new block, or a ring slot being reused
+        e["first"][reset] = blocks[starts][reset] * self.block_rows
+        e["count"][reset] = 0
+        e["t_min"][reset], e["t_max"][reset] = np.inf, -np.inf
+        e["zone_min"][reset], e["zone_max"][reset] = np.iinfo(np.int64).max, np.iinfo(np.int64).min
+        e["count"] += np.diff(np.r_[starts, len(records)])
+        e["t_min"] = np.minimum(e["t_min"], np.minimum.reduceat(records["time"], starts))
+        e["t_max"] = np.maximum(e["t_max"], np.maximum.reduceat(records["time"], starts))
+        e["zone_min"] = np.minimum(e["zone_min"], np.minimum.reduceat(records["zone"], starts))
+        e["zone_max"] = np.maximum(e["zone_max"], np.maximum.reduceat(records["zone"], starts))
+        self.index[entries] = e
+        for entry, row in zip(entries.tolist(), e):
+            self._index_file.seek(entry * INDEX_DTYPE.itemsize)
+            self._index_file.write(row.tobytes())
+
+        # The header goes last: readers only trust records below next_seq.
+        self.next_seq = int(seqs[-1]) + 1
+        self._index_file.flush()
+        self._file.flush()
+        self._write_header()
+        self._file.flush()
+
+    def flush(self):
+        if self._queue is not None:
+            self._queue.join()
+        if self._error is not None:
+            raise self._error
+
+    def close(self):
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+        self._file.close()
+        self._index_file.close()
+        if self._error is not None:
+            raise self._error
+
+
+"""
+Indexed audit log reader. query() reads the header and the small block index, then only the record blocks whose
+    time and zone ranges overlap the request (through a memory map), and filters those rows.
+"""
+
+
+class AuditReader:
+    __slots__ = ("path", "capacity", "block_rows", "next_seq", "index", "records")
+
+    def __init__(self, path):
+        self.path = os.fspath(path)
+        self.refresh()
+
+    """ Picks up records written since the reader was opened. """
+
+    def refresh(self):
+        with open(self.path, "rb") as f:
+            capacity, self.block_rows, self.next_seq = read_header(f)
+        self.capacity = capacity or None
+        self.index = np.fromfile(self.path + ".idx", dtype=INDEX_DTYPE)
+        slots = self.next_seq if self.capacity is None else min(self.next_seq, self.capacity)
+        self.records = np.memmap(self.path, dtype=AUDIT_DTYPE, mode="r", offset=HEADER_BYTES, shape=(slots,)) \
+            if slots else np.empty(0, dtype=AUDIT_DTYPE)
+
+    """ Records held in the index (the whole log, or the ring's retained part). """
+
+    def __len__(self):
+        return int(np.minimum(self.index["count"], self.next_seq - self.index["first"]).clip(0)
+                   [self.index["first"] >= 0].sum())
+
+    """
+    Records of the given zones (a zone id or ids; None: all) with start <= time < end (None: open), in the order
+        they were logged.
+        Returns:
+            ndarray: AUDIT_DTYPE records.
+    """
+
+    def query(self, zones=None, start=None, end=None):
+        self.refresh()
+        e = self.index
+        keep = (e["first"] >= 0) & (e["first"] < self.next_seq)
+        if start is not None:
+            keep &= e["t_max"] >= start
+        if end is not None:
+            keep &= e["t_min"] < end
+        if zones is not None:
+            zones = np.atleast_1d(np.asarray(zones, dtype=np.int64))
+            keep &= (e["zone_min"] <= zones.max()) & (e["zone_max"] >= zones.min())
+        out = []
+        for entry in e[keep][np.argsort(e["first"][keep], kind="stable")]:
+            count = min(int(entry["count"]), self.next_seq - int(entry["first"]))
+            slot = int(entry["first"]) % self.capacity if self.capacity is not None else int(entry["first"])
+            rows = self.records[slot:slot + count]
+            mask = np.ones(len(rows), dtype=bool)
+            if start is not None:
+                mask &= rows["time"] >= start
+            if end is not None:
+                mask &= rows["time"] < end
+            if zones is not None:
+                mask &= np.isin(rows["zone"], zones)
+            out.append(np.array(rows[mask]))
+        return np.concatenate(out) if out else np.empty(0, dtype=AUDIT_DTYPE)
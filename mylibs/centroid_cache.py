@@ -0,0 +1,100 @@
+# Output-level cache: quantized per-term clip heights mapped straight to the centroid.
+import numpy as np
+
+import mylibs.hvac_batch as hb
+
+"""
+Centroid cache for min implication with max aggregation, where the crisp output depends only on the T clip
+    heights (hvac_batch.clip_heights). Heights are rounded to `levels` steps on a square-root scale (finer near 0,
+    where the centroid is most sensitive to the ratio between small heights) and the T codes form one key into a
+    dense table of levels ** T centroids. An entry is filled from hvac_batch.height_centroid the first time its
+    key is seen; after that a hit is a single table read, shared by every reading whose heights round alike.
+    The table holds levels ** T float64 values (8 MiB for 32 levels and 4 terms); tables larger than max_entries
+    raise ValueError.
+    Accuracy: one step in a height moves the output by more than a step's share of the universe where two distant
+    sets fire together (the centroid follows the ratio of their heights), most of all when both are small. For
+    uniformly drawn HVAC readings at 32 levels the error is about 0.06 on average, 1.3 at the 99.9th percentile
+    and up to about 4.3 (a million readings); arbitrary clip heights reach about 8. Raising `levels` shrinks the
+    average far more than the worst case; quantization_error() measures it on the caller's own data.
+    Rows with a non-finite clip height (e.g. a dead sensor) get key -1 and a NaN output, as from
+    hvac_batch.centroid, and count as neither hit nor miss.
+    Counters: misses = table entries filled so far (each computed once, also when its key repeats within a batch),
+    hits = every other looked-up row.
+"""
+
+
+class CentroidCache:
+    __slots__ = ("levels", "tables", "values", "radix", "hits", "misses")
+
+    def __init__(self, levels=32, n_terms=len(hb.HVAC_TERMS), tables=hb.HVAC_CLIP_TABLES, max_entries=1 << 24):
+        if levels ** n_terms > max_entries:
+            raise ValueError(f"{levels} levels for {n_terms} terms need {levels ** n_terms} entries, "
+                             f"more than max_entries={max_entries}")
+        self.levels = levels
+        self.tables = tables
+        self.values = np.full(levels ** n_terms, np.nan)
+        self.radix = levels ** np.arange(n_terms - 1, -1, -1, dtype=np.int64)
+        self.hits = self.misses = 0
+
+    def __len__(self):
+        return self.misses
+
+    @property
+    def hit_rate(self):
+        return self.hits / max(self.hits + self.misses, 1)
+
+    """ Table key of every row of clip heights, shape (...); -1 for rows with a non-finite height. """
+
+    def keys(self, heights):
+        finite = np.isfinite(heights).all(axis=-1)
+        heights = np.where(finite[..., None], np.clip(heights, 0, 1), 0.0)
+        codes = np.rint(np.sqrt(heights) * (self.levels - 1)).astype(np.int64)
+        # A firing term never rounds to 0: that would drop its set, or turn a firing row into "no rule fires".
+        codes[(codes == 0) & (heights > 0)] = 1
+        return np.where(finite, codes @ self.radix, -1)
+
+    """ Quantized clip heights of table keys, shape (..., T); NaN for key -1. """
+
+    def heights(self, keys):
+        keys = np.asarray(keys)
+        heights = np.square((keys[..., None] // self.radix % self.levels) / (self.levels - 1))
+        return np.where(keys[..., None] < 0, np.nan, heights)
+
+    """ Cached centroids for clip heights of shape (..., T), filling the missing entries. """
+
+    def lookup(self, heights):
+        keys = self.keys(heights)
+        valid = keys >= 0
+        out = np.where(valid, self.values[np.where(valid, keys, 0)], np.nan)
+        missed = valid & np.isnan(out)
+        new = np.unique(keys[missed])
+        if len(new):
+            self.values[new] = hb.height_centroid(self.heights(new), self.tables)
+            out[missed] = self.values[keys[missed]]
+        self.hits += int(valid.sum()) - len(new)
+        self.misses += len(new)
+        return out
+
+    """ Crisp outputs from firing strengths, as hvac_batch.centroid with the default (min / max) operators. """
+
+    def centroid(self, strengths, rules=hb.HVAC_RULES, weights=None):
+        if weights is not None:
+            strengths = strengths * np.asarray(weights, dtype=float)
+        return self.lookup(hb.clip_heights(strengths, rules, len(self.radix)))
+
+    """
+    Quantization error of the cached outputs for the given clip heights: |cached - exact| per row (NaN for
+        non-finite rows). Does not touch the table or the counters.
+    """
+
+    def quantization_error(self, heights):
+        heights = np.asarray(heights, dtype=float)
+        keys = self.keys(heights)
+        valid = keys >= 0
+        error = np.full(keys.shape, np.nan)
+        exact = hb.height_centroid(heights[valid], self.tables)
+        error[valid] = np.abs(hb.height_centroid(self.heights(keys[valid]), self.tables) - exact)
+        return error
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hit_rate, "table_bytes": self.values.nbytes}
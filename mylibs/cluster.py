@@ -0,0 +1,370 @@
+# Sharded coordinator / worker pool over TCP with a binary NumPy protocol.
+import multiprocessing
+import selectors
+import socket
+import socketserver
+import struct
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+import mylibs.hvac_batch as hb
+
+""" Wire Format """
+# Every message is a 20-byte header followed by `length` payload bytes:
+#   magic, message type, flags (READINGS: defuzzifier index), request id, payload length.
+HEADER = struct.Struct("<4sBBxxQI")
+MAGIC = b"FZH1"
+READINGS, RESULTS, PING, PONG, ERROR, SHUTDOWN = 1, 2, 3, 4, 5, 6
+DEFUZZIFIER_NAMES = tuple(sorted(hb.DEFUZZIFIERS))
+# READINGS payload: zone ids (int64, N) then readings (float64, N x 3); RESULTS payload: levels (float64, N) then
+# HVAC category codes (int8, N). Both are raw little-endian buffers.
+READING_BYTES = 8 + 3 * 8
+RESULT_BYTES = 8 + 1
+
+
+def send_message(sock, kind, request_id=0, *buffers, flags=0):
+    payload = b"".join(memoryview(np.ascontiguousarray(b)).cast("B") if isinstance(b, np.ndarray) else b
+                       for b in buffers)
+    sock.sendall(HEADER.pack(MAGIC, kind, flags, request_id, len(payload)) + payload)
+
+
+def _recv_exact(sock, n):
+    buf = bytearray(n)
+    view = memoryview(buf)
+    while view:
+        got = sock.recv_into(view)
+        if not got:
+            raise ConnectionError("Connection closed by peer")
+        view = view[got:]
+    return buf
+
+
+""" Reads one message: (kind, flags, request id, payload bytes). """
+
+
+def recv_message(sock):
+    magic, kind, flags, request_id, length = HEADER.unpack(_recv_exact(sock, HEADER.size))
+    if magic != MAGIC:
+        raise ConnectionError(f"Bad message magic {magic!r}")
+    return kind, flags, request_id, _recv_exact(sock, length)
+
+
+def encode_readings(zone_ids, readings):
+    return (np.asarray(zone_ids, dtype="<i8"), np.asarray(readings, dtype="<f8").reshape(-1, 3))
+
+
+def decode_readings(payload):
+    n = len(payload) // READING_BYTES
+    zones = np.frombuffer(payload, dtype="<i8", count=n)
+    readings = np.frombuffer(payload, dtype="<f8", count=3 * n, offset=8 * n).reshape(n, 3)
+    return zones, readings
+
+
+def decode_results(payload):
+    n = len(payload) // RESULT_BYTES
+    return np.frombuffer(payload, dtype="<f8", count=n), np.frombuffer(payload, dtype="i1", count=n, offset=8 * n)
+
+
+""" Worker """
+
+
+class _WorkerHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        sock = self.request
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        while True:
+            try:
+                kind, flags, request_id, payload = recv_message(sock)
+            except (ConnectionError, OSError):
+                return
+            if kind == PING:
+                send_message(sock, PONG, request_id)
+            elif kind == READINGS:
+                zones, readings = decode_readings(payload)
+                try:
+                    _, levels, categories = self.server.infer(readings, DEFUZZIFIER_NAMES[flags])
+                except Exception as e:  # reported to the coordinator instead of dropping the connection
+                    send_message(sock, ERROR, request_id, str(e).encode())
+                    continue
+                send_message(sock, RESULTS, request_id, np.asarray(levels, dtype="<f8"),
+                             np.asarray(categories, dtype="i1"))
+            elif kind == SHUTDOWN:
+                threading.Thread(target=self.server.shutdown, daemon=True).start()
+                return
+
+
+"""
+TCP worker: answers READINGS with `infer(readings, defuzzifier) -> (readings, levels, categories)`, the contract
+    of main.infer_block, and PING with PONG. One thread per connection; SHUTDOWN stops the server.
+"""
+
+
+class WorkerServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address, infer):
+        super().__init__(address, _WorkerHandler)
+        self.infer = infer
+
+
+def _run_worker(address, infer, ready):
+    with WorkerServer(address, infer) as server:
+        ready.put(server.server_address)
+        server.serve_forever()
+
+
+"""
+Starts n worker processes listening on free ports of `host`.
+    Returns:
+        tuple: (processes, addresses), addresses as (host, port) pairs.
+"""
+
+
+def start_local_workers(n, infer, host="127.0.0.1"):
+    ready = multiprocessing.Queue()
+    processes = [multiprocessing.Process(target=_run_worker, args=((host, 0), infer, ready), daemon=True)
+                 for _ in range(n)]
+    for p in processes:
+        p.start()
+    addresses = [tuple(ready.get(timeout=30)) for _ in processes]
+    return processes, addresses
+
+
+""" Coordinator """
+
+
+class _Link:
+    __slots__ = ("address", "sock", "alive", "pending", "queue", "rows")
+
+    def __init__(self, address):
+        self.address = tuple(address)
+        self.sock = None
+        self.alive = False
+        self.pending = {}  # request id -> (row indices, send time)
+        self.queue = deque()  # row index arrays waiting for a free in-flight slot
+        self.rows = 0
+
+
+"""
+Shards zones across workers by zone id and gathers their results.
+    Zone z belongs to shard z % n_shards; shards are spread evenly over the live workers. infer() splits a batch
+    by worker into messages of at most batch_rows readings, keeps at most max_in_flight messages outstanding per
+    worker (backpressure: a slow worker stalls only its own shards, and memory stays bounded), and waits at most
+    timeout seconds for a reply. A worker that fails, closes or times out is dropped: its shards move to the
+    remaining workers and its unanswered rows are sent again. health_check() pings every worker, drops the
+    silent ones and reconnects workers that came back, rebalancing the shards either way.
+    Counters in `stats`: messages sent, rows resent, workers dropped and rejoined.
+"""
+
+
+class Coordinator:
+    def __init__(self, addresses, n_shards=64, batch_rows=4096, max_in_flight=2, timeout=10.0,
+                 defuzzifier="centroid"):
+        self.links = [_Link(a) for a in addresses]
+        self.n_shards = n_shards
+        self.batch_rows = batch_rows
+        self.max_in_flight = max_in_flight
+        self.timeout = timeout
+        self.flags = DEFUZZIFIER_NAMES.index(defuzzifier)
+        self.shards = np.full(n_shards, -1, dtype=np.intp)  # shard -> link index
+        self.stats = dict.fromkeys(("messages", "resent_rows", "dropped", "rejoined"), 0)
+        self._next_id = 0
+        for link in self.links:
+            self._connect(link)
+        self._rebalance()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def live(self):
+        return [i for i, link in enumerate(self.links) if link.alive]
+
+    def _connect(self, link):
+        try:
+            link.sock = socket.create_connection(link.address, timeout=self.timeout)
+            link.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            link.alive = True
+        except OSError:
+            link.sock, link.alive = None, False
+        return link.alive
+
+    """ Moves as few shards as possible so every live worker holds n_shards // live or one more. """
+
+    def _rebalance(self):
+        live = self.live
+        if not live:
+            return
+        orphans = [s for s in range(self.n_shards) if self.shards[s] not in live]
+        counts = {i: int(np.count_nonzero(self.shards == i)) for i in live}
+        quota = {i: self.n_shards // len(live) + (k < self.n_shards % len(live)) for k, i in enumerate(live)}
+        for i in live:
+            surplus = counts[i] - quota[i]
+            if surplus > 0:
+                orphans += np.flatnonzero(self.shards == i)[-surplus:].tolist()
+        for i in live:
+            while counts[i] < quota[i] and orphans:
+                self.shards[orphans.pop()] = i
+                counts[i] += 1
+
+    def _drop(self, index):
+        link = self.links[index]
+        if link.sock is not None:
+            link.sock.close()
+        link.sock, link.alive = None, False
+        self.stats["dropped"] += 1
+        unanswered = [rows for rows, _ in link.pending.values()] + list(link.queue)
+        link.pending.clear()
+        link.queue.clear()
+        self._rebalance()
+        return np.concatenate(unanswered) if unanswered else np.empty(0, dtype=np.intp)
+
+    def _enqueue(self, rows, zone_ids):
+        owner = self.shards[zone_ids[rows] % self.n_shards]
+        for i in np.unique(owner):
+            mine = rows[owner == i]
+            for start in range(0, len(mine), self.batch_rows):
+                self.links[i].queue.append(mine[start:start + self.batch_rows])
+
+    """ Forgets the queued messages and reads off the replies still in flight; a link that cannot is dropped. """
+
+    def _resync(self):
+        for i, link in enumerate(self.links):
+            link.queue.clear()
+            try:
+                while link.alive and link.pending:
+                    _, _, request_id, _ = recv_message(link.sock)
+                    link.pending.pop(request_id, None)
+            except (ConnectionError, OSError):
+                self._drop(i)
+            link.pending.clear()
+
+    """
+    Levels and HVAC category codes for the readings of the given zones, in input order.
+        Raises ConnectionError when no worker is left, RuntimeError when a worker reports an error.
+    """
+
+    def infer(self, zone_ids, readings):
+        zone_ids = np.asarray(zone_ids, dtype=np.int64)
+        readings = np.asarray(readings, dtype=float).reshape(-1, 3)
+        levels = np.empty(len(readings))
+        categories = np.empty(len(readings), dtype=np.int8)
+        if not self.live:
+            raise ConnectionError("No live workers")
+        self._enqueue(np.arange(len(readings)), zone_ids)
+
+        try:
+            with selectors.DefaultSelector() as selector:
+                while any(link.queue or link.pending for link in self.links):
+                    retry = []
+                    for i in self.live:
+                        link = self.links[i]
+                        try:
+                            while link.queue and len(link.pending) < self.max_in_flight:
+                                rows = link.queue[0]  # dequeued only once sent, so a failed send is retried
+                                self._next_id += 1
+                                send_message(link.sock, READINGS, self._next_id, *encode_readings(zone_ids[rows],
+                                                                                                  readings[rows]),
+                                             flags=self.flags)
+                                link.pending[self._next_id] = (link.queue.popleft(), time.monotonic())
+                                link.rows += len(rows)
+                                self.stats["messages"] += 1
+                        except OSError:
+                            retry.append(self._drop(i))
+                    waiting = {i: self.links[i] for i in self.live if self.links[i].pending}
+                    for i, link in waiting.items():
+                        selector.register(link.sock, selectors.EVENT_READ, i)
+                    ready = selector.select(timeout=self.timeout) if waiting else []
+                    for i in waiting:
+                        selector.unregister(self.links[i].sock)
+                    for key, _ in ready:
+                        i = key.data
+                        try:
+                            kind, _, request_id, payload = recv_message(self.links[i].sock)
+                        except (ConnectionError, OSError):
+                            retry.append(self._drop(i))
+                            continue
+                        rows, _ = self.links[i].pending.pop(request_id)
+                        if kind == ERROR:
+                            raise RuntimeError(f"Worker {self.links[i].address}: {payload.decode()}")
+                        levels[rows], categories[rows] = decode_results(payload)
+                    now = time.monotonic()
+                    for i in self.live:
+                        oldest = min((sent for _, sent in self.links[i].pending.values()), default=now)
+                        if now - oldest > self.timeout:
+                            retry.append(self._drop(i))
+                    retry = [rows for rows in retry if len(rows)]
+                    if retry:
+                        if not self.live:
+                            raise ConnectionError("All workers dropped")
+                        rows = np.concatenate(retry)
+                        self.stats["resent_rows"] += len(rows)
+                        self._enqueue(rows, zone_ids)
+        except BaseException:
+            # Leave no queued rows or unread replies of this batch behind for the next call.
+            self._resync()
+            raise
+        return levels, categories
+
+    """
+    Pings every worker (reconnecting dropped ones first) and rebalances the shards over those that answered.
+        Returns:
+            dict: address -> round-trip seconds, or None for workers that did not answer.
+    """
+
+    def health_check(self):
+        result = {}
+        for i, link in enumerate(self.links):
+            rejoining = not link.alive
+            if rejoining and not self._connect(link):
+                result[link.address] = None
+                continue
+            started = time.monotonic()
+            try:
+                send_message(link.sock, PING, 0)
+                kind, _, _, _ = recv_message(link.sock)
+                if kind != PONG:
+                    raise ConnectionError(f"Expected PONG, got message type {kind}")
+            except (ConnectionError, OSError):
+                if rejoining:
+                    link.sock.close()
+                    link.sock, link.alive = None, False
+                else:
+                    self._drop(i)
+                result[link.address] = None
+                continue
+            result[link.address] = time.monotonic() - started
+            if rejoining:
+                self.stats["rejoined"] += 1
+        self._rebalance()
+        return result
+
+    """ Zone ids of the given candidates owned by each live worker, as {address: zone ids}. """
+
+    def assignment(self, zone_ids):
+        zone_ids = np.asarray(zone_ids, dtype=np.int64)
+        owner = self.shards[zone_ids % self.n_shards]
+        return {self.links[i].address: zone_ids[owner == i] for i in self.live}
+
+    """ Asks every live worker to stop, then closes the connections. """
+
+    def shutdown_workers(self):
+        for i in self.live:
+            try:
+                send_message(self.links[i].sock, SHUTDOWN, 0)
+            except OSError:
+                pass
+        self.close()
+
+    def close(self):
+        for link in self.links:
+            if link.sock is not None:
+                link.sock.close()
+            link.sock, link.alive = None, False
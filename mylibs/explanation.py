@@ -0,0 +1,145 @@
+# Inference results that keep only the crisp output and the firing strengths; explanations are derived on demand.
+import numpy as np
+
+import mylibs.hvac_batch as hb
+import mylibs.operators as ops
+
+INPUT_NAMES = ("Temperature", "Humidity", "CO₂")
+# Units as printed by main.py: the input lines and the input summary differ for humidity.
+INPUT_UNITS = (" °C", "", " ppm")
+SUMMARY_UNITS = (" °C", " %", " ppm")
+
+
+"""
+Result of one inference call (a single reading or a batch).
+    Only the crisp output, the firing strengths and the input degrees (already computed for the strengths) are
+    stored. Labelled degrees, dominant categories, the HVAC term overlaps (which need the aggregate, re-built on
+    first access) and the rule trace are computed when they are read or formatted, and cached.
+    Indexing a batch result returns the result of one reading.
+"""
+
+
+class HvacResult:
+    __slots__ = ("inputs", "output", "strengths", "rules", "weights", "operators", "_input_degrees", "_aggregated",
+                 "_hvac_degrees")
+
+    def __init__(self, inputs, output, strengths, input_degrees, rules=hb.HVAC_RULES, weights=None,
+                 operators=ops.ZADEH):
+        self.inputs = inputs
+        self.output = output
+        self.strengths = strengths
+        self.rules = rules
+        self.weights = weights
+        self.operators = operators
+        self._input_degrees = input_degrees
+        self._aggregated = None
+        self._hvac_degrees = None
+
+    def __len__(self):
+        return len(self.output)
+
+    def __getitem__(self, i):
+        row = HvacResult(tuple(x[i] for x in self.inputs), self.output[i], self.strengths[i],
+                         [d[i] for d in self._input_degrees], self.rules, self.weights, self.operators)
+        if self._aggregated is not None:
+            row._aggregated = self._aggregated[i]
+        return row
+
+    def __float__(self):
+        return float(self.output)
+
+    def __repr__(self):
+        return f"HvacResult(output={np.round(self.output, 2).tolist()})"
+
+    """ Per-term degree of each input: one {label: degree} dict per input, in INPUT_NAMES order """
+
+    @property
+    def degrees(self):
+        return [{label: d[..., t] for t, (label, _, _) in enumerate(terms)}
+                for d, terms in zip(self._input_degrees, hb.INPUT_TERMS)]
+
+    @property
+    def input_categories(self):
+        return tuple(_labels(terms, np.argmax(d, axis=-1)) for d, terms in zip(self._input_degrees, hb.INPUT_TERMS))
+
+    @property
+    def aggregated(self):
+        if self._aggregated is None:
+            self._aggregated = hb.aggregate(self.strengths, hb.HVAC_SETS, self.rules, self.weights, self.operators)
+        return self._aggregated
+
+    """ Overlap of the aggregate with each HVAC term, shape (..., 4): the hvac_memberships values of main.py """
+
+    @property
+    def hvac_degrees(self):
+        if self._hvac_degrees is None:
+            self._hvac_degrees = np.stack([np.minimum(self.aggregated, s).max(axis=-1) for s in hb.HVAC_SETS],
+                                          axis=-1)
+        return self._hvac_degrees
+
+    @property
+    def hvac_category(self):
+        return _labels(hb.HVAC_TERMS, np.argmax(self.hvac_degrees, axis=-1))
+
+    """
+    Human-readable trace of every rule for a single reading, e.g.
+        "Rule 3: Temperature is Cold AND Humidity is Normal -> HVAC is Low (0.25)"
+    """
+
+    @property
+    def rule_trace(self):
+        strengths = np.asarray(self.strengths)
+        if strengths.ndim != 1:
+            raise ValueError("rule_trace needs a single reading; index the batch result first")
+        lines = []
+        for r, (antecedent, c) in enumerate(self.rules):
+            terms = [f"{name} is {hb.INPUT_TERMS[i][t][0]}"
+                     for i, (name, t) in enumerate(zip(INPUT_NAMES, antecedent)) if t is not None]
+            lines.append(f"Rule {r + 1}: {' AND '.join(terms)} -> HVAC is {hb.HVAC_TERMS[c][0]} ({strengths[r]:.2f})")
+        return lines
+
+    """ The summary printed by main.py, one block per reading """
+
+    def __str__(self):
+        if np.ndim(self.output):
+            return "\n".join(str(self[i]) for i in range(len(self)))
+        lines = [f"Input {name}: {x:.1f}{unit}" for name, x, unit in zip(INPUT_NAMES, self.inputs, INPUT_UNITS)]
+        categories = self.input_categories
+        for name, d, cat in zip(INPUT_NAMES, self._input_degrees, categories):
+            lines.append(f"{name} Category: {cat} (μ={d.max():.2f})")
+        hvac_cat = self.hvac_category
+        lines.append(f"HVAC Category: {hvac_cat} (μ={self.hvac_degrees.max():.2f})")
+        lines.append("Input Summary:")
+        for name, x, unit, cat in zip(INPUT_NAMES, self.inputs, SUMMARY_UNITS, categories):
+            lines.append(f" - {name}: {x:.1f}{unit} ({cat})")
+        lines.append(f"Recommended HVAC Level: {self.output:.2f} % ({hvac_cat})")
+        return "\n".join(lines)
+
+
+def _labels(terms, codes):
+    return np.array([label for label, _, _ in terms])[codes]
+
+
+"""
+Inference that returns an HvacResult instead of printing.
+    Scalar readings give a scalar result; array readings give a batch result with outputs of shape (N,).
+    defuzzifier names an entry of hvac_batch.DEFUZZIFIERS.
+"""
+
+
+def explain(in_temp, in_humid, in_co2, rules=hb.HVAC_RULES, weights=None, operators=ops.ZADEH,
+            defuzzifier="centroid"):
+    inputs = tuple(np.asarray(x, dtype=float) for x in np.broadcast_arrays(in_temp, in_humid, in_co2))
+    degrees = hb.fuzzify_inputs(*inputs)
+    strengths = hb.firing_strengths(degrees, rules, operators)
+    if operators.is_closed_form and defuzzifier == "centroid":
+        result = HvacResult(inputs, hb.centroid(strengths, rules=rules, weights=weights, operators=operators),
+                            strengths, degrees, rules, weights, operators)
+    else:
+        # The aggregate is needed for the centroid anyway, so a single reading keeps it for the HVAC category.
+        aggregated = hb.aggregate(strengths, hb.HVAC_SETS, rules, weights, operators)
+        result = HvacResult(inputs, hb.DEFUZZIFIERS[defuzzifier](hb.HVAC_UNIVERSE, aggregated), strengths, degrees,
+                            rules, weights, operators)
+        if aggregated.ndim == 1:
+            result._aggregated = aggregated
+    return result
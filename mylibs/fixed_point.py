@@ -0,0 +1,140 @@
+# Fixed-point (integer only) inference for the main.py controller, for targets without an FPU.
+from dataclasses import dataclass
+
+import numpy as np
+
+import mylibs.hvac_batch as hb
+
+# Default quantization: 8-bit input codes and HVAC output in hundredths of a percent.
+DEFAULT_INPUT_STEPS = (256, 256, 256)
+DEFAULT_OUTPUT_SCALE = 100
+
+
+@dataclass
+class FixedPointTables:
+    dtype: type
+    input_luts: tuple  # one (steps, T) array per input, indexed by input code
+    input_ranges: tuple  # (lo, hi) per input; code k maps to lo + k * (hi - lo) / (steps - 1)
+    output_sets: np.ndarray  # (T, G) output terms sampled at G grid points
+    output_range: tuple  # (lo, hi) of the output universe
+    output_scale: int  # output codes are in 1 / output_scale units
+    rules: tuple
+
+    @property
+    def one(self):
+        return np.iinfo(self.dtype).max
+
+
+"""
+Compiles every term of the controller into integer lookup tables.
+    Membership degrees are stored as round(mu * max(dtype)), so uint8 tables hold 0..255 and uint16 tables 0..65535.
+    Parameters:
+        dtype: np.uint8 or np.uint16.
+        input_steps (tuple): Number of input codes per input variable.
+    Returns:
+        FixedPointTables
+"""
+
+
+def compile_tables(dtype=np.uint8, input_steps=DEFAULT_INPUT_STEPS, output_points=len(hb.HVAC_UNIVERSE),
+                   output_scale=DEFAULT_OUTPUT_SCALE, rules=hb.HVAC_RULES):
+    one = np.iinfo(dtype).max
+    luts, ranges = [], []
+    for terms, universe, steps in zip(hb.INPUT_TERMS, hb.INPUT_UNIVERSES, input_steps):
+        lo, hi = float(universe[0]), float(universe[-1])
+        grid = np.linspace(lo, hi, steps)
+        luts.append(np.rint(hb.fuzzify(grid, terms) * one).astype(dtype))
+        ranges.append((lo, hi))
+    lo, hi = float(hb.HVAC_UNIVERSE[0]), float(hb.HVAC_UNIVERSE[-1])
+    sets = hb.output_sets(np.linspace(lo, hi, output_points), hb.HVAC_TERMS)
+    return FixedPointTables(dtype, tuple(luts), tuple(ranges), np.rint(sets * one).astype(dtype), (lo, hi),
+                            output_scale, rules)
+
+
+"""
+Maps crisp readings to input codes (nearest table entry, clamped to the universe).
+    On the target this step is done by the sensor/ADC scaling; it is the only float step and exists for testing.
+"""
+
+
+def quantize_inputs(tables, in_temp, in_humid, in_co2):
+    codes = []
+    for x, lut, (lo, hi) in zip((in_temp, in_humid, in_co2), tables.input_luts, tables.input_ranges):
+        steps = lut.shape[0]
+        k = np.rint((np.asarray(x, dtype=float) - lo) * (steps - 1) / (hi - lo))
+        codes.append(np.clip(k, 0, steps - 1).astype(np.int64))
+    return np.stack(np.broadcast_arrays(*codes), axis=-1)
+
+
+"""
+Integer inference: table lookup, min for AND and implication, max for aggregation, integer-rational centroid.
+    Parameters:
+        codes (ndarray): Input codes, shape (N, 3).
+    Returns:
+        tuple: (numerator, denominator, output code). The centroid in grid steps is numerator / denominator; the
+        output code is the crisp output in 1 / output_scale units, rounded to nearest (0 when nothing fires).
+        Accumulators are int64; with uint16 degrees the sums exceed 32 bits.
+"""
+
+
+def infer_fixed(tables, codes):
+    codes = np.asarray(codes, dtype=np.int64)
+    degrees = [lut[codes[..., i]] for i, lut in enumerate(tables.input_luts)]
+    strengths = hb.firing_strengths(degrees, tables.rules)
+    aggregated = hb.aggregate(strengths, tables.output_sets, tables.rules).astype(np.int64)
+    points = aggregated.shape[-1]
+    numerator = aggregated @ np.arange(points, dtype=np.int64)
+    denominator = aggregated.sum(axis=-1)
+
+    lo, hi = tables.output_range
+    span = round((hi - lo) * tables.output_scale)
+    base = round(lo * tables.output_scale)
+    divisor = 2 * denominator * (points - 1)
+    code = base + (2 * numerator * span + divisor // 2) // np.maximum(divisor, 1)
+    return numerator, denominator, np.where(denominator == 0, 0, code)
+
+
+@dataclass
+class ValidationReport:
+    max_abs_deviation: float
+    mean_abs_deviation: float
+    worst_input: tuple
+    points: int
+
+
+"""
+Maximum deviation of the fixed-point output from the float defuzzify_centroid result.
+    Every combination of input codes is evaluated (the whole quantized input space), in chunks.
+    Both paths see the same input value (the one the code stands for), so the report measures the table
+    and arithmetic error; input quantization itself is a property of input_steps.
+"""
+
+
+def validation_report(tables, chunk_size=hb.DEFAULT_CHUNK_SIZE):
+    steps = [lut.shape[0] for lut in tables.input_luts]
+    total = int(np.prod(steps))
+    max_dev, sum_dev, worst = 0.0, 0.0, None
+    for start in range(0, total, chunk_size):
+        codes = np.stack(np.unravel_index(np.arange(start, min(start + chunk_size, total)), steps), axis=-1)
+        values = [lo + codes[:, i] * (hi - lo) / (n - 1)
+                  for i, ((lo, hi), n) in enumerate(zip(tables.input_ranges, steps))]
+        expected = hb.hvac_batch(*values)
+        _, _, code = infer_fixed(tables, codes)
+        deviation = np.abs(code / tables.output_scale - expected)
+        sum_dev += float(deviation.sum())
+        i = int(np.argmax(deviation))
+        if deviation[i] > max_dev or worst is None:
+            max_dev, worst = float(deviation[i]), tuple(float(v[i]) for v in values)
+    return ValidationReport(max_dev, sum_dev / total, worst, total)
+
+
+"""
+Writes the tables to a single .npz file (one array per input LUT plus the output sets and rule table) for porting.
+"""
+
+
+def save_tables(tables, path):
+    rules = np.array([[-1 if t is None else t for t in antecedent] + [c] for antecedent, c in tables.rules])
+    arrays = {f"input_{i}": lut for i, lut in enumerate(tables.input_luts)}
+    np.savez(path, output_sets=tables.output_sets, rules=rules, input_ranges=np.array(tables.input_ranges),
+             output_range=np.array(tables.output_range), output_scale=tables.output_scale, **arrays)
@@ -0,0 +1,129 @@
+# Hierarchical controllers: small rule blocks chained through intermediate fuzzy variables.
+from dataclasses import dataclass, field
+
+import numpy as np
+
+import mylibs.hvac_batch as hb
+import mylibs.operators as ops
+
+""" Additional Inputs """
+OCCUPANCY_TERMS = (  # % of design occupancy
+    ("Empty", "trap", (0, 0, 5, 15)),
+    ("Partial", "tri", (10, 40, 70)),
+    ("Full", "trap", (60, 80, 100, 100)),
+)
+OUTDOOR_TERMS = (  # outdoor temperature, °C
+    ("Cold", "trap", (-10, -10, 5, 12)),
+    ("Mild", "tri", (8, 18, 26)),
+    ("Hot", "trap", (22, 30, 40, 40)),
+)
+TIME_TERMS = (  # hour of day
+    ("Off Hours", "trap", (0, 0, 6, 8)),
+    ("Working Hours", "trap", (6, 8, 18, 20)),
+    ("Evening", "trap", (18, 20, 24, 24)),
+)
+
+
+"""
+One rule block. It reads the named variables (crisp inputs or earlier stages) and produces the variable `name`.
+    For intermediate stages `terms` holds the term labels only: the stage hands its per-term degrees (the clip
+    heights of its rules) straight to the next stage, nothing is defuzzified. The last stage's `terms` is a full
+    (label, shape, parameters) table that is sampled over the controller universe.
+"""
+
+
+@dataclass
+class Stage:
+    name: str
+    inputs: tuple
+    terms: tuple
+    rules: tuple
+
+
+@dataclass
+class HierarchicalController:
+    input_terms: dict  # crisp input name -> term table
+    stages: tuple  # evaluation order; the last stage is the output
+    universe: np.ndarray = field(default_factory=lambda: hb.HVAC_UNIVERSE)
+    sets: np.ndarray = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self.sets = hb.output_sets(self.universe, self.stages[-1].terms)
+
+    @property
+    def rule_count(self):
+        return sum(len(stage.rules) for stage in self.stages)
+
+
+"""
+Crisp output of a hierarchical controller for a batch of readings.
+    Parameters:
+        readings (dict): Crisp input name -> array of readings (all broadcastable to one shape).
+    Returns:
+        ndarray: Crisp outputs, shape (N,).
+"""
+
+
+def infer(controller, readings, operators=ops.ZADEH, chunk_size=hb.DEFAULT_CHUNK_SIZE):
+    names = list(controller.input_terms)
+    columns = np.broadcast_arrays(*(np.atleast_1d(np.asarray(readings[n], dtype=float)) for n in names))
+    # Intermediate degrees must stay in [0, 1], so unbounded sum aggregation becomes bounded sum between stages.
+    snorm = "bounded_sum" if operators.snorm == "sum" else operators.snorm
+
+    out = np.empty(columns[0].shape[0])
+    for start in range(0, out.shape[0], chunk_size):
+        sl = slice(start, start + chunk_size)
+        degrees = {n: hb.fuzzify(x[sl], controller.input_terms[n]) for n, x in zip(names, columns)}
+        for stage in controller.stages[:-1]:
+            strengths = hb.firing_strengths([degrees[n] for n in stage.inputs], stage.rules, operators)
+            degrees[stage.name] = hb.clip_heights(strengths, stage.rules, len(stage.terms), snorm)
+        last = controller.stages[-1]
+        strengths = hb.firing_strengths([degrees[n] for n in last.inputs], last.rules, operators)
+        out[sl] = hb.centroid(strengths, controller.sets, controller.universe, last.rules, operators=operators)
+    return out
+
+
+""" Baseline: the main.py controller as a single stage """
+FLAT_HVAC = HierarchicalController(
+    {"temp": hb.TEMP_TERMS, "humid": hb.HUMID_TERMS, "co2": hb.CO2_TERMS},
+    (Stage("hvac", ("temp", "humid", "co2"), hb.HVAC_TERMS, hb.HVAC_RULES),),
+)
+
+
+""" Six-input hierarchy: (temp, humid) -> comfort; (co2, occupancy) -> demand; (outdoor, time) -> load """
+COMFORT_RULES = (  # temp x humid -> Good / Fair / Poor
+    ((0, 0), 2), ((0, 1), 1), ((0, 2), 2),
+    ((1, 0), 1), ((1, 1), 0), ((1, 2), 2),
+    ((2, 0), 1), ((2, 1), 1), ((2, 2), 2),
+)
+DEMAND_RULES = (  # co2 x occupancy -> Low / Medium / High ventilation demand
+    ((0, 0), 0), ((0, 1), 0), ((0, 2), 1),
+    ((1, 0), 0), ((1, 1), 1), ((1, 2), 2),
+    ((2, 0), 2), ((2, 1), 2), ((2, 2), 2),
+)
+LOAD_RULES = (  # outdoor x time -> Low / High external load
+    ((0, 0), 0), ((0, 1), 1), ((0, 2), 0),
+    ((1, 0), 0), ((1, 1), 0), ((1, 2), 0),
+    ((2, 0), 0), ((2, 1), 1), ((2, 2), 1),
+)
+# comfort x demand x load -> HVAC: each step away from (Good, Low, Low) raises the level by one, up to High.
+HVAC_STAGE_RULES = tuple(
+    ((c, d, l), min(3, c + d + l)) for c in range(3) for d in range(3) for l in range(2)
+)
+
+SIX_INPUT_HVAC = HierarchicalController(
+    {
+        "temp": hb.TEMP_TERMS,
+        "humid": hb.HUMID_TERMS,
+        "co2": hb.CO2_TERMS,
+        "occupancy": OCCUPANCY_TERMS,
+        "outdoor": OUTDOOR_TERMS,
+        "time": TIME_TERMS,
+    },
+    (
+        Stage("comfort", ("temp", "humid"), ("Good", "Fair", "Poor"), COMFORT_RULES),
+        Stage("demand", ("co2", "occupancy"), ("Low", "Medium", "High"), DEMAND_RULES),
+        Stage("load", ("outdoor", "time"), ("Low", "High"), LOAD_RULES),
+        Stage("hvac", ("comfort", "demand", "load"), hb.HVAC_TERMS, HVAC_STAGE_RULES),
+    ),
+)
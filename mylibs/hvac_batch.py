@@ -0,0 +1,382 @@
+# Vectorized (batch) counterpart of the Mamdani HVAC controller in main.py.
+from functools import reduce
+
+import numpy as np
+
+import mylibs.membership_functions as mf
+import mylibs.operators as ops
+
+""" Universe of Discourse (same grids as main.py) """
+# input variables
+TEMP_UNIVERSE = np.linspace(18, 30, 400)
+HUMID_UNIVERSE = np.linspace(25, 85, 400)
+CO2_UNIVERSE = np.linspace(300, 1600, 500)
+# output variables
+HVAC_UNIVERSE = np.linspace(0, 100, 400)
+
+
+""" Membership Design: (label, shape, parameters) per term, in main.py order """
+TEMP_TERMS = (
+    ("Cold", "trap", (18, 18, 20, 22)),
+    ("Comfortable", "tri", (20, 23.5, 27)),
+    ("Warm", "trap", (25, 27, 30, 30)),
+)
+HUMID_TERMS = (
+    ("Dry", "trap", (30, 30, 37, 45)),
+    ("Normal", "tri", (40, 52.5, 65)),
+    ("High", "trap", (60, 70, 80, 80)),
+)
+CO2_TERMS = (
+    ("Low", "trap", (400, 400, 500, 600)),
+    ("Medium", "tri", (500, 800, 1100)),
+    ("High", "trap", (1000, 1250, 1500, 1500)),
+)
+HVAC_TERMS = (
+    ("Off", "trap", (0, 0, 5, 15)),
+    ("Low", "tri", (10, 25, 40)),
+    ("Medium", "tri", (35, 55, 75)),
+    ("High", "trap", (70, 85, 100, 100)),
+)
+
+INPUT_TERMS = (TEMP_TERMS, HUMID_TERMS, CO2_TERMS)
+INPUT_UNIVERSES = (TEMP_UNIVERSE, HUMID_UNIVERSE, CO2_UNIVERSE)
+
+
+""" Rule Base: term index per input (None when the input is not used) -> HVAC term index """
+HVAC_RULES = (
+    ((1, 1, 0), 0),  # Rule 1: comfortable, normal, low CO2 -> off
+    ((1, 1, 1), 1),  # Rule 2: comfortable, normal, medium CO2 -> low
+    ((0, 1, None), 1),  # Rule 3: cold, normal -> low
+    ((2, 1, None), 2),  # Rule 4: warm, normal -> medium
+    ((None, 2, None), 2),  # Rule 5: high humidity -> medium
+    ((None, None, 2), 3),  # Rule 6: high CO2 -> high
+    ((2, 2, 2), 3),  # Rule 7: warm, high humidity, high CO2 -> high
+)
+
+SHAPES = {
+    "inc": mf.inc_batch,
+    "dec": mf.dec_batch,
+    "tri": mf.tri_batch,
+    "trap": mf.trap_batch,
+    "gaussian": mf.gaussian,
+    "sigmoid": mf.sigmoid,
+}
+
+DEFUZZIFIERS = {
+    "centroid": mf.defuzzify_centroid_batch,
+    "trap": mf.defuzzify_trap_batch,
+}
+
+# Rows per chunk when materializing (rows, rules, grid) temporaries.
+DEFAULT_CHUNK_SIZE = 2048
+
+
+"""
+Fuzzification of a batch of crisp readings.
+    Parameters:
+        x (array-like): Crisp readings, any shape (...).
+        terms (tuple): (label, shape, parameters) per term. Parameters may be arrays that broadcast with x.
+    Returns:
+        ndarray: Membership degrees, shape (..., T) in term order.
+"""
+
+
+def fuzzify(x, terms):
+    x = np.asarray(x, dtype=float)
+    columns = [SHAPES[shape](x, *params) for _, shape, params in terms]
+    return np.stack(np.broadcast_arrays(*columns), axis=-1)
+
+
+"""
+Fuzzification of all three inputs, computed once and shared by every rule block that reads them.
+    Returns:
+        list: One (..., T_i) membership array per input variable.
+"""
+
+
+def fuzzify_inputs(in_temp, in_humid, in_co2, input_terms=INPUT_TERMS):
+    return [fuzzify(x, terms) for x, terms in zip((in_temp, in_humid, in_co2), input_terms)]
+
+
+"""
+Sampled output membership functions.
+    Returns:
+        ndarray: shape (..., T, G), one row per output term sampled over the universe.
+"""
+
+
+def output_sets(universe, terms):
+    return np.swapaxes(fuzzify(universe, terms), -1, -2)
+
+
+HVAC_SETS = output_sets(HVAC_UNIVERSE, HVAC_TERMS)
+HVAC_AREAS, HVAC_MOMENTS = ops.set_areas_moments(HVAC_UNIVERSE, HVAC_SETS)
+
+
+"""
+Rule firing strengths for a batch of fuzzified inputs (AND = the controller's t-norm, min by default).
+    Parameters:
+        degrees (sequence): One (..., T_i) membership array per input variable.
+        rules (tuple): Rule base in the HVAC_RULES format.
+    Returns:
+        ndarray: Firing strengths, shape (..., R).
+"""
+
+
+def firing_strengths(degrees, rules=HVAC_RULES, operators=ops.ZADEH):
+    tnorm = ops.TNORMS[operators.tnorm]
+    strengths = []
+    for antecedent, _ in rules:
+        used = [degrees[i][..., t] for i, t in enumerate(antecedent) if t is not None]
+        strengths.append(reduce(tnorm, used))
+    return np.stack(strengths, axis=-1)
+
+
+"""
+Implication and aggregation of all rules (min / max by default).
+    Parameters:
+        strengths (ndarray): Firing strengths, shape (..., R).
+        sets (ndarray): Output sets, shape (..., T, G), broadcastable against strengths' leading axes.
+        weights (array-like): Optional per-rule weights in [0, 1] scaling the firing strengths.
+        operators (Operators): Implication and s-norm used for aggregation.
+    Returns:
+        ndarray: Aggregated output membership, shape (..., G).
+"""
+
+
+def aggregate(strengths, sets=HVAC_SETS, rules=HVAC_RULES, weights=None, operators=ops.ZADEH):
+    if weights is not None:
+        strengths = strengths * np.asarray(weights, dtype=float)
+    implication = ops.IMPLICATIONS[operators.implication]
+    if operators.snorm == "max":
+        # Implications are monotone in the firing strength, so
+        # max_r imp(s_r, set_c(r)) == max_c imp(max_{r -> c} s_r, set_c): imply each output term once.
+        heights = clip_heights(strengths, rules, sets.shape[-2])
+        # Accumulating in place is much faster than max(axis=-2) over a (..., T, G) temporary.
+        out = implication(heights[..., 0, None], sets[..., 0, :])
+        for t in range(1, heights.shape[-1]):
+            np.maximum(out, implication(heights[..., t, None], sets[..., t, :]), out=out)
+        return out
+    snorm = ops.SNORMS[operators.snorm]
+    out = None
+    for r, (_, c) in enumerate(rules):
+        implied = implication(strengths[..., r, None], sets[..., c, :])
+        out = implied if out is None else snorm(out, implied)
+    return out
+
+
+"""
+Clip height per output term: the strongest firing among the rules concluding that term (0 when none).
+    With snorm="sum" the strengths are summed instead, as needed by the closed-form product-sum centroid.
+    Returns:
+        ndarray: shape (..., T).
+"""
+
+
+def clip_heights(strengths, rules=HVAC_RULES, n_terms=len(HVAC_TERMS), snorm="max"):
+    heights = np.zeros((*strengths.shape[:-1], n_terms), dtype=strengths.dtype)
+    for t in range(n_terms):
+        members = [r for r, (_, c) in enumerate(rules) if c == t]
+        if members and snorm == "max":
+            heights[..., t] = strengths[..., members].max(axis=-1)
+        elif members:
+            heights[..., t] = reduce(ops.SNORMS[snorm], [strengths[..., r] for r in members])
+    return heights
+
+
+"""
+Weight of every grid point in the centroid sums of each defuzzifier: 1 for the discrete centroid and the
+    trapezoid rule weights for "trap", so sum(w * agg * u) / sum(w * agg) reproduces DEFUZZIFIERS[name].
+"""
+
+
+def trapezoid_weights(universe):
+    universe = np.asarray(universe, dtype=float)
+    gaps = np.diff(universe)
+    return (np.concatenate([gaps, [0.0]]) + np.concatenate([[0.0], gaps])) / 2
+
+
+DEFUZZIFIER_WEIGHTS = {
+    "centroid": np.ones_like,
+    "trap": trapezoid_weights,
+}
+
+
+"""
+Tables for height_centroid. Grid points where only one output set is nonzero are kept per set, sorted by
+    membership with prefix sums, so sum_g w_g min(h, set[g]) (and the moment) is one searchsorted per term; the
+    few points where sets overlap are kept as a (T, S) block and evaluated directly.
+    Parameters:
+        point_weights (ndarray): Per grid point weights (see DEFUZZIFIER_WEIGHTS); 1 when None.
+    Returns:
+        tuple: (per term (values, cumulative areas, cumulative moments, tail weights, tail moments), shared sets,
+            shared weights, shared moment weights, per term span of shared columns)
+"""
+
+
+def clip_tables(sets=HVAC_SETS, universe=HVAC_UNIVERSE, point_weights=None):
+    universe = np.asarray(universe, dtype=float)
+    weights = np.ones_like(universe) if point_weights is None else np.asarray(point_weights, dtype=float)
+    active = sets > 0
+    shared = active.sum(axis=0) > 1
+    exclusive = []
+    for t in range(len(sets)):
+        own = active[t] & ~shared
+        order = np.argsort(sets[t, own], kind="stable")
+        values, points, w = sets[t, own][order], universe[own][order], weights[own][order]
+        exclusive.append((
+            values,
+            np.concatenate([[0.0], np.cumsum(w * values)]),
+            np.concatenate([[0.0], np.cumsum(w * values * points)]),
+            np.concatenate([np.cumsum(w[::-1])[::-1], [0.0]]),
+            np.concatenate([np.cumsum((w * points)[::-1])[::-1], [0.0]]),
+        ))
+    shared_sets = sets[:, shared]
+    # Columns from each set's first to last nonzero shared point: the only ones it can raise.
+    spans = []
+    for row in shared_sets > 0:
+        cols = np.flatnonzero(row)
+        spans.append(slice(int(cols[0]), int(cols[-1]) + 1) if len(cols) else slice(0, 0))
+    return tuple(exclusive), shared_sets, weights[shared], (weights * universe)[shared], tuple(spans)
+
+
+HVAC_CLIP_TABLES = clip_tables(HVAC_SETS, HVAC_UNIVERSE)
+
+
+"""
+Centroid of the min-clipped, max-aggregated output sets from the clip heights alone, equal to
+    defuzzify_centroid_batch(universe, aggregate(...)) without building the (..., G) aggregate (or to
+    defuzzify_trap_batch with tables built from trapezoid_weights).
+    Parameters:
+        heights (ndarray): Clip heights, shape (..., T) (see clip_heights).
+        tables (tuple): clip_tables of the output sets; the HVAC sets by default.
+    Returns:
+        ndarray: Crisp outputs, shape (...). Rows with no firing rule return 0.0.
+"""
+
+
+def height_centroid(heights, tables=HVAC_CLIP_TABLES):
+    exclusive, shared_sets, shared_weights, shared_moments, spans = tables
+    shared = np.zeros((*heights.shape[:-1], len(shared_weights)))
+    for t, span in enumerate(spans):
+        np.maximum(shared[..., span], np.minimum(heights[..., t, None], shared_sets[t, span]), out=shared[..., span])
+    area = shared @ shared_weights
+    moment = shared @ shared_moments
+    for t, (values, cum_area, cum_moment, tail_weights, tail_moments) in enumerate(exclusive):
+        h = heights[..., t]
+        below = np.searchsorted(values, h)  # points whose membership is under the clip height
+        area += cum_area[below] + h * tail_weights[below]
+        moment += cum_moment[below] + h * tail_moments[below]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(area == 0, 0.0, moment / area)
+
+
+"""
+Crisp output (centroid) from firing strengths.
+    Product implication with sum aggregation skips the (..., G) aggregate entirely and uses the closed-form
+    centroid from the per-term areas and moments; min implication with max aggregation uses height_centroid;
+    every other operator set samples the aggregate.
+    Returns:
+        ndarray: Crisp outputs, shape (...).
+"""
+
+
+def centroid(strengths, sets=HVAC_SETS, universe=HVAC_UNIVERSE, rules=HVAC_RULES, weights=None,
+             operators=ops.ZADEH):
+    if operators.is_closed_form:
+        if weights is not None:
+            strengths = strengths * np.asarray(weights, dtype=float)
+        heights = clip_heights(strengths, rules, sets.shape[-2], snorm="sum")
+        if sets is HVAC_SETS and universe is HVAC_UNIVERSE:
+            return ops.closed_form_centroid(heights, HVAC_AREAS, HVAC_MOMENTS)
+        return ops.closed_form_centroid(heights, *ops.set_areas_moments(universe, sets))
+    if operators.implication == "min" and operators.snorm == "max" and sets.ndim == 2:
+        if weights is not None:
+            strengths = strengths * np.asarray(weights, dtype=float)
+        heights = clip_heights(strengths, rules, len(sets))
+        if sets is HVAC_SETS and universe is HVAC_UNIVERSE:
+            return height_centroid(heights)
+        return height_centroid(heights, clip_tables(sets, universe))
+    return mf.defuzzify_centroid_batch(universe, aggregate(strengths, sets, rules, weights, operators))
+
+
+"""
+HVAC category codes (index into HVAC_TERMS), batch equivalent of the hvac_memberships / dominant_category step
+    in main.py: the term whose set overlaps the aggregate the most. Ties go to the first term, as with max().
+    Parameters:
+        aggregated (ndarray): Aggregated output membership, shape (..., G).
+    Returns:
+        ndarray: Category codes, shape (...).
+"""
+
+
+def dominant_categories(aggregated, sets=HVAC_SETS):
+    overlap = np.stack([np.minimum(aggregated, s).max(axis=-1) for s in sets], axis=-1)
+    return np.argmax(overlap, axis=-1)
+
+
+"""
+dominant_categories from the clip heights alone, for min implication and max aggregation, without building the
+    (..., G) aggregate: max_g min(agg, set_t) == max_c min(h_c, max_g min(set_c, set_t)), so only the (T, T)
+    overlaps between the output sets are needed. The result is identical to dominant_categories.
+    Parameters:
+        heights (ndarray): Clip heights, shape (..., T) (see clip_heights).
+"""
+
+
+def set_overlaps(sets=HVAC_SETS):
+    return np.minimum(sets[:, None, :], sets[None, :, :]).max(axis=-1)
+
+
+HVAC_SET_OVERLAPS = set_overlaps(HVAC_SETS)
+
+
+def height_categories(heights, sets=HVAC_SETS):
+    overlaps = HVAC_SET_OVERLAPS if sets is HVAC_SETS else set_overlaps(sets)
+    return np.argmax(np.minimum(heights[..., :, None], overlaps).max(axis=-2), axis=-1)
+
+
+"""
+HVAC category codes of crisp levels: the output term with the highest membership at the level itself.
+    Cheaper than dominant_categories when only crisp outputs are kept.
+"""
+
+
+def level_categories(levels, terms=HVAC_TERMS):
+    return np.argmax(fuzzify(levels, terms), axis=-1)
+
+
+"""
+Batch equivalent of fuzzify_* + evaluate_rules in main.py.
+    Returns:
+        ndarray: Aggregated output membership for every reading, shape (N, G).
+"""
+
+
+def evaluate_rules_batch(in_temp, in_humid, in_co2, rules=HVAC_RULES, weights=None, operators=ops.ZADEH):
+    degrees = fuzzify_inputs(in_temp, in_humid, in_co2)
+    return aggregate(firing_strengths(degrees, rules, operators), HVAC_SETS, rules, weights, operators)
+
+
+"""
+Crisp HVAC level for a batch of readings (centroid defuzzification).
+    The batch is processed in chunks so the (chunk, rules, grid) temporaries stay bounded.
+    Returns:
+        ndarray: Crisp HVAC levels, shape (N,).
+"""
+
+
+def hvac_batch(in_temp, in_humid, in_co2, rules=HVAC_RULES, weights=None, chunk_size=DEFAULT_CHUNK_SIZE,
+               operators=ops.ZADEH):
+    in_temp, in_humid, in_co2 = np.broadcast_arrays(
+        np.atleast_1d(np.asarray(in_temp, dtype=float)),
+        np.atleast_1d(np.asarray(in_humid, dtype=float)),
+        np.atleast_1d(np.asarray(in_co2, dtype=float)),
+    )
+    out = np.empty(in_temp.shape[0])
+    for start in range(0, out.shape[0], chunk_size):
+        sl = slice(start, start + chunk_size)
+        degrees = fuzzify_inputs(in_temp[sl], in_humid[sl], in_co2[sl])
+        strengths = firing_strengths(degrees, rules, operators)
+        out[sl] = centroid(strengths, HVAC_SETS, HVAC_UNIVERSE, rules, weights, operators)
+    return out
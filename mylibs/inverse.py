@@ -0,0 +1,121 @@
+# Inverse queries: which values of the free inputs drive the HVAC level into a target range.
+from dataclasses import dataclass
+
+import numpy as np
+
+import mylibs.hvac_batch as hb
+import mylibs.operators as ops
+
+INPUT_NAMES = ("temp", "humid", "co2")
+DEFAULT_BOUNDS = {name: (u[0], u[-1]) for name, u in zip(INPUT_NAMES, hb.INPUT_UNIVERSES)}
+
+
+"""
+Region of the free inputs whose HVAC level lies in the target range.
+    names: free input names, (x,) or (x, y).
+    axes: sampled values of each free input. The region is exact (to `tol`) along x and sampled along y.
+    mask: in-range flag on the sample grid, shape (len(y), len(x)) (a single row when only x is free).
+    rows, intervals: the region as x intervals, intervals[k] = (start, end) on the y sample axes[1][rows[k]],
+        sorted by row then start. Boundaries between samples are refined by bisection.
+"""
+
+
+@dataclass
+class InverseRegion:
+    names: tuple
+    axes: tuple
+    fixed: dict
+    target: tuple
+    mask: np.ndarray
+    rows: np.ndarray
+    intervals: np.ndarray
+
+    def intervals_at(self, row=0):
+        return self.intervals[self.rows == row]
+
+    """ Area of the region (length when only x is free), from the refined intervals. """
+
+    @property
+    def size(self):
+        lengths = np.bincount(self.rows, self.intervals[:, 1] - self.intervals[:, 0], minlength=len(self.mask))
+        if len(self.axes) == 1:
+            return float(lengths[0])
+        return float(np.trapezoid(lengths, self.axes[1]))
+
+    def contains(self, x, y=None):
+        x = np.asarray(x, dtype=float)
+        row = np.zeros(x.shape, dtype=np.intp) if y is None else _nearest(self.axes[1], y)
+        starts, ends = self.intervals[:, 0], self.intervals[:, 1]
+        hit = (self.rows == row[..., None]) & (starts <= x[..., None]) & (x[..., None] <= ends)
+        return hit.any(axis=-1)
+
+
+def _nearest(axis, y):
+    y = np.asarray(y, dtype=float)
+    return np.abs(axis - y[..., None]).argmin(axis=-1)
+
+
+"""
+Finds the values of the free inputs for which the HVAC level lies in target.
+    The free inputs are sampled on a grid and evaluated in one batched call; every grid cell whose ends fall on
+    different sides of the target range is then bisected along x, all cells at once, one batched call per step.
+    Features narrower than the grid spacing along x can be missed.
+    Parameters:
+        target (tuple): (low, high) HVAC level range; None for an open end, e.g. (70, None) for "above 70 %".
+        fixed (dict): Values of the fixed inputs, e.g. {"co2": 600}. One or two inputs must stay free.
+        bounds (dict): Optional (low, high) range per free input; defaults to its universe of discourse.
+        samples (int or tuple): Grid samples per free input.
+        tol (float): Bisection tolerance along x, as a fraction of the x range.
+    Returns:
+        InverseRegion
+"""
+
+
+def inverse_query(target, fixed, bounds=None, samples=200, tol=1e-6, rules=hb.HVAC_RULES, weights=None,
+                  operators=ops.ZADEH):
+    low, high = (-np.inf if target[0] is None else target[0]), (np.inf if target[1] is None else target[1])
+    unknown = set(fixed) - set(INPUT_NAMES)
+    if unknown:
+        raise ValueError(f"Unknown inputs {sorted(unknown)}, expected names from {INPUT_NAMES}")
+    names = tuple(name for name in INPUT_NAMES if name not in fixed)
+    if len(names) not in (1, 2):
+        raise ValueError("Inverse queries need one or two free inputs")
+    bounds = {**DEFAULT_BOUNDS, **(bounds or {})}
+    samples = np.broadcast_to(samples, len(names))
+    axes = tuple(np.linspace(*bounds[name], n) for name, n in zip(names, samples))
+    x = axes[0]
+    y = axes[1] if len(axes) == 2 else np.zeros(1)
+
+    def in_range(xs, ys):
+        values = dict(fixed)
+        values[names[0]] = xs
+        if len(names) == 2:
+            values[names[1]] = ys
+        out = hb.hvac_batch(*(values[name] for name in INPUT_NAMES), rules=rules, weights=weights,
+                            operators=operators)
+        return (out >= low) & (out <= high)
+
+    xx, yy = np.meshgrid(x, y)
+    mask = in_range(xx.ravel(), yy.ravel()).reshape(xx.shape)
+
+    # Vectorized bisection of every cell [x_i, x_i+1] whose ends disagree.
+    rows, cols = np.nonzero(mask[:, 1:] != mask[:, :-1])
+    a, b = x[cols], x[cols + 1]
+    a_inside = mask[rows, cols]
+    steps = int(np.ceil(np.log2(max((x[1] - x[0]) / (tol * (x[-1] - x[0])), 1)))) if len(x) > 1 else 0
+    for _ in range(steps if len(rows) else 0):
+        mid = (a + b) / 2
+        same = in_range(mid, y[rows]) == a_inside
+        a, b = np.where(same, mid, a), np.where(same, b, mid)
+    edges = (a + b) / 2
+
+    # Interval starts: rows that begin inside plus every entering edge; ends: leaving edges plus rows that end
+    # inside. Sorted by (row, x), starts and ends pair up one to one.
+    first, last = np.flatnonzero(mask[:, 0]), np.flatnonzero(mask[:, -1])
+    start_rows = np.concatenate([first, rows[~a_inside]])
+    starts = np.concatenate([np.full(len(first), x[0]), edges[~a_inside]])
+    end_rows = np.concatenate([rows[a_inside], last])
+    ends = np.concatenate([edges[a_inside], np.full(len(last), x[-1])])
+    start_order, end_order = np.lexsort((starts, start_rows)), np.lexsort((ends, end_rows))
+    intervals = np.column_stack([starts[start_order], ends[end_order]])
+    return InverseRegion(names, axes, dict(fixed), (low, high), mask, start_rows[start_order], intervals)
@@ -0,0 +1,180 @@
+# Generic Mamdani engine: any number of inputs, term tables and rules, evaluated on broadcast batches.
+from dataclasses import dataclass, field
+from functools import reduce
+
+import numpy as np
+
+import mylibs.hvac_batch as hb
+import mylibs.operators as ops
+
+"""
+Linguistic variable: its universe of discourse and (label, shape, parameters) terms (shapes of hvac_batch.SHAPES).
+"""
+
+
+@dataclass(frozen=True)
+class Variable:
+    name: str
+    universe: np.ndarray
+    terms: tuple
+
+    @property
+    def labels(self):
+        return tuple(label for label, _, _ in self.terms)
+
+
+"""
+Rule firing strengths, as hvac_batch.firing_strengths, but an antecedent may also be a list of term-index tuples:
+    the tuples are ANDed with the t-norm and the list is ORed with the s-norm, e.g. [(1, 2), (0, 0)] reads
+    "(input 0 is term 1 and input 1 is term 2) or (input 0 is term 0 and input 1 is term 0)".
+"""
+
+
+def rule_strengths(degrees, rules, operators=ops.ZADEH):
+    if all(isinstance(antecedent, tuple) for antecedent, _ in rules):
+        return hb.firing_strengths(degrees, rules, operators)
+    tnorm, snorm = ops.TNORMS[operators.tnorm], ops.SNORMS[operators.snorm]
+    strengths = []
+    for antecedent, _ in rules:
+        alternatives = antecedent if isinstance(antecedent, list) else [antecedent]
+        strengths.append(reduce(snorm, [
+            reduce(tnorm, [degrees[i][..., t] for i, t in enumerate(conjunction) if t is not None])
+            for conjunction in alternatives
+        ]))
+    return np.stack(strengths, axis=-1)
+
+
+"""
+Mamdani fuzzy inference system.
+    inputs (tuple): Input Variables, in the order of the rule antecedents.
+    output (Variable): Output Variable; its terms are sampled once over its universe.
+    rules (tuple): (antecedent, consequent term index) pairs, see rule_strengths.
+    weights (array-like): Optional per-rule weights scaling the firing strengths.
+    defuzzifier (str): "centroid" (discrete, as main.py) or "trap" (trapezoid integrals, as np.trapezoid).
+    Min implication with max aggregation defuzzifies from the clip heights (hvac_batch.height_centroid) and
+    product-sum from precomputed areas and moments, so neither builds the (..., G) aggregate.
+"""
+
+
+@dataclass
+class MamdaniEngine:
+    inputs: tuple
+    output: Variable
+    rules: tuple
+    weights: np.ndarray = None
+    operators: ops.Operators = ops.ZADEH
+    defuzzifier: str = "centroid"
+    sets: np.ndarray = field(init=False, repr=False)
+    _tables: tuple = field(init=False, repr=False)
+    _areas_moments: tuple = field(init=False, repr=False)
+
+    def __post_init__(self):
+        if self.defuzzifier not in hb.DEFUZZIFIER_WEIGHTS:
+            raise ValueError(f"Unknown defuzzifier '{self.defuzzifier}', expected one of {sorted(hb.DEFUZZIFIERS)}")
+        for antecedent, consequent in self.rules:
+            for conjunction in antecedent if isinstance(antecedent, list) else [antecedent]:
+                if len(conjunction) != len(self.inputs):
+                    raise ValueError(f"Rule antecedent {conjunction} does not have one entry per input")
+            if not 0 <= consequent < len(self.output.terms):
+                raise ValueError(f"Rule consequent {consequent} is not an output term index")
+        universe = np.asarray(self.output.universe, dtype=float)
+        point_weights = hb.DEFUZZIFIER_WEIGHTS[self.defuzzifier](universe)
+        self.sets = hb.output_sets(universe, self.output.terms)
+        self._tables = hb.clip_tables(self.sets, universe, point_weights)
+        self._areas_moments = (self.sets @ point_weights, self.sets @ (point_weights * universe))
+
+    def fuzzify(self, *inputs):
+        return [hb.fuzzify(x, variable.terms) for x, variable in zip(inputs, self.inputs)]
+
+    def strengths(self, *inputs):
+        strengths = rule_strengths(self.fuzzify(*inputs), self.rules, self.operators)
+        return strengths if self.weights is None else strengths * np.asarray(self.weights, dtype=float)
+
+    """ Aggregated output membership, shape (..., G), e.g. for plotting the fuzzy output region. """
+
+    def aggregate(self, *inputs):
+        return hb.aggregate(self.strengths(*inputs), self.sets, self.rules, operators=self.operators)
+
+    """ Crisp outputs from (weighted) firing strengths, shape (...). """
+
+    def defuzzify(self, strengths):
+        n_terms = len(self.output.terms)
+        if self.operators.implication == "min" and self.operators.snorm == "max":
+            return hb.height_centroid(hb.clip_heights(strengths, self.rules, n_terms), self._tables)
+        if self.operators.is_closed_form:
+            heights = hb.clip_heights(strengths, self.rules, n_terms, snorm="sum")
+            return ops.closed_form_centroid(heights, *self._areas_moments)
+        aggregated = hb.aggregate(strengths, self.sets, self.rules, operators=self.operators)
+        return hb.DEFUZZIFIERS[self.defuzzifier](self.output.universe, aggregated)
+
+    """
+    Crisp outputs for inputs of any broadcastable shapes (scalars, batches or meshgrids), in chunks of chunk_size
+        readings so temporaries stay bounded.
+        Returns:
+            ndarray: shape of the broadcast inputs (a 0-d array for scalar inputs).
+    """
+
+    def evaluate(self, *inputs, chunk_size=hb.DEFAULT_CHUNK_SIZE):
+        if len(inputs) != len(self.inputs):
+            raise ValueError(f"Expected {len(self.inputs)} inputs, got {len(inputs)}")
+        arrays = np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in inputs))
+        flat = [a.reshape(-1) for a in arrays]
+        out = np.empty(flat[0].shape)
+        for start in range(0, len(out), chunk_size):
+            sl = slice(start, start + chunk_size)
+            out[sl] = self.defuzzify(self.strengths(*(x[sl] for x in flat)))
+        return out.reshape(arrays[0].shape)
+
+    __call__ = evaluate
+
+
+""" HVAC controller (main.py, hvac_batch.hvac_batch) """
+HVAC = MamdaniEngine(
+    inputs=tuple(Variable(name, universe, terms) for name, universe, terms in
+                 zip(("temp", "humid", "co2"), hb.INPUT_UNIVERSES, hb.INPUT_TERMS)),
+    output=Variable("hvac", hb.HVAC_UNIVERSE, hb.HVAC_TERMS),
+    rules=hb.HVAC_RULES,
+)
+
+""" notebooks/samples/mamdani_washing_machine.ipynb: soiled level -> wash time """
+WASHING_MACHINE = MamdaniEngine(
+    inputs=(Variable("soiled", np.linspace(0, 100, 200), (
+        ("Less", "dec", (20, 80)),
+        ("More", "inc", (30, 90)),
+    )),),
+    output=Variable("wash_time", np.linspace(10, 80, 100), (
+        ("Less", "sigmoid", (-0.15, 50)),
+        ("More", "sigmoid", (0.2, 50)),
+    )),
+    rules=(
+        ((0,), 0),  # Rule 1: less soiled -> less time
+        ((1,), 1),  # Rule 2: more soiled -> more time
+    ),
+    defuzzifier="trap",
+)
+
+""" notebooks/samples/mamdani_alcohol_consumption.ipynb: water and alcohol consumption -> life span """
+ALCOHOL_CONSUMPTION = MamdaniEngine(
+    inputs=(
+        Variable("water", np.linspace(0, 10, 100), (
+            ("Less", "sigmoid", (-1, 5)),
+            ("More", "sigmoid", (1.2, 4.5)),
+        )),
+        Variable("alcohol", np.linspace(0, 100, 200), (
+            ("Less", "sigmoid", (-0.14, 30)),
+            ("Average", "tri", (20, 50, 65)),
+            ("More", "sigmoid", (0.1, 70)),
+        )),
+    ),
+    output=Variable("life", np.linspace(10, 50, 100), (
+        ("Good", "dec", (15, 28)),
+        ("Average", "gaussian", (30, 8)),
+        ("Poor", "inc", (32, 40)),
+    )),
+    rules=(
+        ((0, 2), 2),  # R1: less water and more alcohol -> poor
+        ((1, 0), 0),  # R2: more water and less alcohol -> good
+        ([(1, 1), (0, 0)], 1),  # R3: (more water and average alcohol) or (less water and less alcohol) -> average
+    ),
+    defuzzifier="trap",
+)
@@ -127,3 +127,69 @@ def defuzzify_trap(universe, r):
     if np.sum(r) == 0:
         return 0.0
     return np.trapezoid(r * universe, universe) / np.trapezoid(r, universe)
+
+
+"""
+Vectorized (batch) counterparts of inc, dec, tri and trap.
+    These follow the scalar branch order exactly (including the a == b corner cases and NaN handling),
+    so `tri_batch(xs, a, b, c)[i] == tri(xs[i], a, b, c)`. Parameters broadcast against x, which lets a
+    whole population of candidate parameters (shape (P, 1)) be evaluated over a batch of inputs (shape (N,)).
+"""
+
+
+def inc_batch(x, a, b):
+    x = np.asarray(x, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # Nested where is np.select with less per-call overhead, which dominates for small batches.
+        return np.where(x <= a, 0.0, np.where(x >= b, 1.0, (x - a) / (b - a)))
+
+
+def dec_batch(x, a, b):
+    return 1 - inc_batch(x, a, b)
+
+
+def tri_batch(x, a, b, c):
+    x = np.asarray(x, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # Each branch is only reached when the previous ones failed, so x > a (x > b) is already implied.
+        return np.where(x <= a, 0.0, np.where(x <= b, (x - a) / (b - a), np.where(x <= c, (c - x) / (c - b), 0.0)))
+
+
+def trap_batch(x, a, b, c, d):
+    x = np.asarray(x, dtype=float)
+    # NaN falls through to the decreasing branch, as in the scalar version.
+    return np.where(x <= c, inc_batch(x, a, b), dec_batch(x, c, d))
+
+
+"""
+Defuzzification using the Centroid method over a batch of aggregated outputs.
+    Parameters:
+        universe (array-like): Discrete universe of discourse, shape (G,).
+        aggregated (array-like): Aggregated membership values, shape (..., G).
+    Returns:
+        ndarray: Crisp outputs, shape (...). Rows with no firing rule return 0.0.
+"""
+
+
+def defuzzify_centroid_batch(universe, aggregated):
+    aggregated = np.asarray(aggregated, dtype=float)
+    area = np.sum(aggregated, axis=-1)
+    moment = aggregated @ np.asarray(universe, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(area == 0, 0.0, moment / area)
+
+
+"""
+Defuzzification using the Trapezoidal method over a batch of aggregated outputs.
+    Returns:
+        ndarray: Crisp outputs, shape (...). Rows with no firing rule return 0.0.
+"""
+
+
+def defuzzify_trap_batch(universe, aggregated):
+    aggregated = np.asarray(aggregated, dtype=float)
+    universe = np.asarray(universe, dtype=float)
+    area = np.trapezoid(aggregated, universe, axis=-1)
+    moment = np.trapezoid(aggregated * universe, universe, axis=-1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(np.sum(aggregated, axis=-1) == 0, 0.0, moment / area)
@@ -0,0 +1,194 @@
+# Memory profiling of the batch pipeline per stage (tracemalloc, which also sees NumPy's array buffers).
+import argparse
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+import numpy as np
+
+import mylibs.hvac_batch as hb
+import mylibs.operators as ops
+import mylibs.rule_analysis as ra
+
+STAGES = ("fuzzify", "firing_strengths", "aggregate", "defuzzify", "categories")
+
+
+"""
+Memory used by one pipeline stage, in bytes, over all its calls (one call per chunk).
+    peak: largest rise of traced memory above the start of a call, i.e. the stage's temporaries plus its output.
+    total: sum of the per-call peaks, a lower bound on the bytes the stage allocated over the run.
+    retained: net change of traced memory over the last call (its output less what it released).
+"""
+
+
+@dataclass
+class StageMemory:
+    name: str
+    calls: int = 0
+    peak: int = 0
+    total: int = 0
+    retained: int = 0
+
+
+"""
+Result of a profiled run.
+    peak: largest rise of traced memory above the start of the run, for the whole pipeline.
+"""
+
+
+@dataclass
+class MemoryReport:
+    rows: int
+    chunk_size: int
+    stages: list
+    peak: int
+
+    @property
+    def total(self):
+        return sum(s.total for s in self.stages)
+
+    def __str__(self):
+        lines = [f"{'stage':<18}{'calls':>7}{'peak KiB':>12}{'total KiB':>12}{'retained KiB':>14}"]
+        lines += [f"{s.name:<18}{s.calls:>7}{s.peak / 1024:>12.1f}{s.total / 1024:>12.1f}{s.retained / 1024:>14.1f}"
+                  for s in self.stages]
+        lines.append(f"pipeline peak {self.peak / 1024:.1f} KiB for {self.rows} rows in chunks of {self.chunk_size}")
+        return "\n".join(lines)
+
+
+""" Starts tracemalloc for the duration of the block unless it is already tracing. """
+
+
+@contextmanager
+def tracing():
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    try:
+        yield
+    finally:
+        if started:
+            tracemalloc.stop()
+
+
+"""
+Collects StageMemory per named stage while tracemalloc is tracing:
+    with tracker.stage("fuzzify"): degrees = hb.fuzzify_inputs(...)
+    Stages must not nest, as each one resets tracemalloc's peak.
+"""
+
+
+class StageTracker:
+    __slots__ = ("stages", "peak", "_base")
+
+    def __init__(self):
+        self.stages = {}
+        self.peak = 0
+        self._base = tracemalloc.get_traced_memory()[0]
+
+    @contextmanager
+    def stage(self, name):
+        tracemalloc.reset_peak()
+        start = tracemalloc.get_traced_memory()[0]
+        try:
+            yield
+        finally:
+            end, peak = tracemalloc.get_traced_memory()
+            s = self.stages.setdefault(name, StageMemory(name))
+            s.calls += 1
+            s.peak = max(s.peak, peak - start)
+            s.total += peak - start
+            s.retained = end - start
+            self.peak = max(self.peak, peak - self._base)
+
+
+"""
+Runs the chunked batch pipeline of main.infer_block (levels and categories) under tracemalloc and reports the
+    memory of every stage. A single reading gives the cost of one inference.
+    Parameters:
+        rules: Rule base; by default the minimized one that infer_block evaluates.
+        readings (array-like): shape (N, 3).
+        chunk_size (int): Rows per chunk, as in hvac_batch.hvac_batch.
+        defuzzifier (str): Key of hvac_batch.DEFUZZIFIERS.
+    Returns:
+        MemoryReport
+"""
+
+
+def profile_batch(readings, chunk_size=hb.DEFAULT_CHUNK_SIZE, rules=ra.HVAC_MINIMAL_RULES, weights=None,
+                  operators=ops.ZADEH, defuzzifier="centroid"):
+    readings = np.asarray(readings, dtype=float).reshape(-1, 3)
+    closed_form = operators.is_closed_form and defuzzifier == "centroid"
+    by_heights = operators.implication == "min" and operators.snorm == "max"
+    with tracing():
+        tracker = StageTracker()
+        levels = np.empty(len(readings))
+        categories = np.empty(len(readings), dtype=np.intp)
+        for start in range(0, len(readings), chunk_size):
+            sl = slice(start, start + chunk_size)
+            with tracker.stage("fuzzify"):
+                degrees = hb.fuzzify_inputs(*readings[sl].T)
+            with tracker.stage("firing_strengths"):
+                strengths = hb.firing_strengths(degrees, rules, operators)
+            del degrees
+            # Every operator set builds the aggregate: the closed-form centroid (product / sum) and the categories
+            # from clip heights (min / max) never apply together, so either the levels or the categories need it.
+            with tracker.stage("aggregate"):
+                aggregated = hb.aggregate(strengths, hb.HVAC_SETS, rules, weights, operators)
+            with tracker.stage("defuzzify"):
+                if closed_form:
+                    levels[sl] = hb.centroid(strengths, rules=rules, weights=weights, operators=operators)
+                else:
+                    levels[sl] = hb.DEFUZZIFIERS[defuzzifier](hb.HVAC_UNIVERSE, aggregated)
+            with tracker.stage("categories"):
+                if by_heights:
+                    weighted = strengths if weights is None else strengths * np.asarray(weights, dtype=float)
+                    categories[sl] = hb.height_categories(hb.clip_heights(weighted, rules))
+                else:
+                    categories[sl] = hb.dominant_categories(aggregated)
+            del strengths, aggregated
+    stages = [tracker.stages[name] for name in STAGES if name in tracker.stages]
+    return MemoryReport(len(readings), chunk_size, stages, tracker.peak)
+
+
+"""
+Largest chunk size whose pipeline peak stays within `ceiling` bytes.
+    The peak grows linearly with the chunk: it is measured for two probe sizes and the line is solved for the
+    ceiling. The result is rounded down to a multiple of 64 rows when above 64, and capped at max_rows. The rules
+    default to infer_block's, as for profile_batch.
+    Raises ValueError when not even one row fits.
+"""
+
+
+def recommend_chunk_size(ceiling, rules=ra.HVAC_MINIMAL_RULES, weights=None, operators=ops.ZADEH,
+                         defuzzifier="centroid", probes=(256, 2048), max_rows=1 << 20):
+    rng = np.random.default_rng(0)
+    low, high = np.array([(u[0], u[-1]) for u in hb.INPUT_UNIVERSES]).T
+    peaks = []
+    for n in probes:
+        readings = rng.uniform(low, high, (n, 3))
+        peaks.append(profile_batch(readings, n, rules, weights, operators, defuzzifier).peak)
+    per_row = max((peaks[1] - peaks[0]) / (probes[1] - probes[0]), 1.0)
+    fixed = max(peaks[0] - per_row * probes[0], 0.0)
+    rows = int((ceiling - fixed) // per_row)
+    if rows < 1:
+        raise ValueError(f"A memory ceiling of {ceiling} bytes is below the pipeline's fixed cost of "
+                         f"{fixed + per_row:.0f} bytes for one row")
+    if rows > 64:
+        rows -= rows % 64
+    return min(rows, max_rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-stage memory profile of the batch HVAC pipeline")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--chunk-size", type=int, default=hb.DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--defuzzifier", choices=sorted(hb.DEFUZZIFIERS), default="centroid")
+    parser.add_argument("--ceiling", type=float, help="memory ceiling in MiB: also print the largest chunk size")
+    args = parser.parse_args()
+
+    low, high = np.array([(u[0], u[-1]) for u in hb.INPUT_UNIVERSES]).T
+    data = np.random.default_rng(0).uniform(low, high, (args.rows, 3))
+    print(profile_batch(data, args.chunk_size, defuzzifier=args.defuzzifier))
+    if args.ceiling is not None:
+        size = recommend_chunk_size(args.ceiling * 2**20, defuzzifier=args.defuzzifier)
+        print(f"recommended chunk size for {args.ceiling:g} MiB: {size}")
@@ -0,0 +1,109 @@
+# Several actuators driven by the same temperature, humidity and CO2 inputs, sharing one fuzzification pass.
+from dataclasses import dataclass, field
+
+import numpy as np
+
+import mylibs.hvac_batch as hb
+import mylibs.operators as ops
+
+""" Fan Speed (%) """
+FAN_UNIVERSE = np.linspace(0, 100, 400)
+FAN_TERMS = (
+    ("Low", "trap", (0, 0, 15, 35)),
+    ("Medium", "tri", (25, 50, 75)),
+    ("High", "trap", (65, 85, 100, 100)),
+)
+FAN_RULES = (
+    ((1, 1, None), 0),  # comfortable, normal humidity -> low
+    ((0, None, None), 1),  # cold -> medium
+    ((2, None, None), 1),  # warm -> medium
+    ((None, 2, None), 2),  # high humidity -> high
+    ((None, None, 2), 2),  # high CO2 -> high
+)
+
+""" Fresh-air Damper Position (% open) """
+DAMPER_UNIVERSE = np.linspace(0, 100, 400)
+DAMPER_TERMS = (
+    ("Closed", "trap", (0, 0, 10, 25)),
+    ("Partial", "tri", (15, 45, 75)),
+    ("Open", "trap", (60, 80, 100, 100)),
+)
+DAMPER_RULES = (
+    ((None, None, 0), 0),  # low CO2 -> closed
+    ((None, None, 1), 1),  # medium CO2 -> partial
+    ((None, None, 2), 2),  # high CO2 -> open
+    ((None, 2, None), 1),  # high humidity -> partial
+)
+
+
+"""
+One output variable: its own universe, terms and rules over the shared inputs.
+"""
+
+
+@dataclass
+class OutputBlock:
+    name: str
+    universe: np.ndarray
+    terms: tuple
+    rules: tuple
+    sets: np.ndarray = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self.sets = hb.output_sets(self.universe, self.terms)
+
+
+HVAC_BLOCK = OutputBlock("hvac", hb.HVAC_UNIVERSE, hb.HVAC_TERMS, hb.HVAC_RULES)
+FAN_BLOCK = OutputBlock("fan", FAN_UNIVERSE, FAN_TERMS, FAN_RULES)
+DAMPER_BLOCK = OutputBlock("damper", DAMPER_UNIVERSE, DAMPER_TERMS, DAMPER_RULES)
+DEFAULT_BLOCKS = (HVAC_BLOCK, FAN_BLOCK, DAMPER_BLOCK)
+
+
+"""
+Crisp value of every output for a batch of readings.
+    The inputs are fuzzified once per chunk, and antecedents that appear in several blocks (e.g. "high CO2") are
+    evaluated once. When all output universes have the same number of points the aggregates are stacked and
+    defuzzified together in a single pass.
+    Returns:
+        dict: {block name: crisp outputs of shape (N,)}.
+"""
+
+
+def infer_outputs(in_temp, in_humid, in_co2, blocks=DEFAULT_BLOCKS, operators=ops.ZADEH,
+                  chunk_size=hb.DEFAULT_CHUNK_SIZE):
+    in_temp, in_humid, in_co2 = np.broadcast_arrays(
+        *(np.atleast_1d(np.asarray(x, dtype=float)) for x in (in_temp, in_humid, in_co2))
+    )
+    antecedents = list(dict.fromkeys(antecedent for block in blocks for antecedent, _ in block.rules))
+    shared_rules = tuple((antecedent, 0) for antecedent in antecedents)
+    columns = [[antecedents.index(antecedent) for antecedent, _ in block.rules] for block in blocks]
+
+    stacked = len({block.universe.shape for block in blocks}) == 1 and not operators.is_closed_form
+    universes = np.stack([block.universe for block in blocks]) if stacked else None
+
+    out = {block.name: np.empty(in_temp.shape[0]) for block in blocks}
+    for start in range(0, in_temp.shape[0], chunk_size):
+        sl = slice(start, start + chunk_size)
+        degrees = hb.fuzzify_inputs(in_temp[sl], in_humid[sl], in_co2[sl])
+        strengths = hb.firing_strengths(degrees, shared_rules, operators)
+        if stacked:
+            aggregated = np.stack(
+                [hb.aggregate(strengths[..., cols], block.sets, block.rules, operators=operators)
+                 for block, cols in zip(blocks, columns)],
+                axis=-2,
+            )
+            crisp = _centroid_per_block(universes, aggregated)
+            for b, block in enumerate(blocks):
+                out[block.name][sl] = crisp[..., b]
+        else:
+            for block, cols in zip(blocks, columns):
+                out[block.name][sl] = hb.centroid(strengths[..., cols], block.sets, block.universe, block.rules,
+                                                  operators=operators)
+    return out
+
+
+def _centroid_per_block(universes, aggregated):
+    area = aggregated.sum(axis=-1)
+    moment = np.einsum("...bg,bg->...b", aggregated, universes)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(area == 0, 0.0, moment / area)
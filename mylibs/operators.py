@@ -0,0 +1,108 @@
+# Vectorized fuzzy operators: t-norms (AND), s-norms (OR / aggregation) and implications.
+from dataclasses import dataclass
+
+import numpy as np
+
+""" T-norms """
+
+
+def lukasiewicz_tnorm(a, b):
+    return np.maximum(0.0, a + b - 1)
+
+
+"""
+Hamacher product: ab / (a + b - ab), defined as 0 when a = b = 0.
+"""
+
+
+def hamacher_tnorm(a, b):
+    a, b = np.asarray(a, dtype=float), np.asarray(b, dtype=float)
+    denominator = a + b - a * b
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(denominator == 0, 0.0, a * b / denominator)
+
+
+TNORMS = {
+    "min": np.minimum,
+    "product": np.multiply,
+    "lukasiewicz": lukasiewicz_tnorm,
+    "hamacher": hamacher_tnorm,
+}
+
+
+""" S-norms """
+
+
+def probabilistic_sum(a, b):
+    return a + b - a * b
+
+
+def bounded_sum(a, b):
+    return np.minimum(1.0, a + b)
+
+
+# "sum" is not a true s-norm (it is unbounded); it is the additive aggregation that, with product implication,
+# gives the closed-form centroid in closed_form_centroid().
+SNORMS = {
+    "max": np.maximum,
+    "probabilistic_sum": probabilistic_sum,
+    "bounded_sum": bounded_sum,
+    "sum": np.add,
+}
+
+
+""" Implications: clip (Mamdani, min) or scale (Larsen, product) the consequent by the firing strength """
+IMPLICATIONS = {
+    "min": np.minimum,
+    "product": np.multiply,
+}
+
+
+"""
+Operator selection for one controller. The defaults are the Zadeh operators hard-coded in main.py.
+"""
+
+
+@dataclass(frozen=True)
+class Operators:
+    tnorm: str = "min"
+    snorm: str = "max"
+    implication: str = "min"
+
+    def __post_init__(self):
+        for name, registry in (("tnorm", TNORMS), ("snorm", SNORMS), ("implication", IMPLICATIONS)):
+            if getattr(self, name) not in registry:
+                raise ValueError(f"Unknown {name} '{getattr(self, name)}', expected one of {sorted(registry)}")
+
+    @property
+    def is_closed_form(self):
+        return self.implication == "product" and self.snorm == "sum"
+
+
+ZADEH = Operators()
+LARSEN_SUM = Operators(tnorm="product", snorm="sum", implication="product")
+
+
+"""
+Centroid for product implication with sum aggregation, without sampling the aggregate.
+    The aggregate is sum_r s_r * set_c(r), so its area and moment are sum_c H_c * A_c and sum_c H_c * M_c, where
+    H_c is the summed firing strength of the rules concluding term c and A_c / M_c are the precomputed area and
+    moment of term c over the universe.
+    Parameters:
+        heights (ndarray): Summed firing strength per output term, shape (..., T).
+        areas (ndarray): sum(set_c) per term, shape (T,) or broadcastable (..., T).
+        moments (ndarray): sum(set_c * universe) per term, same shape as areas.
+    Returns:
+        ndarray: Crisp outputs, shape (...). Rows with no firing rule return 0.0.
+"""
+
+
+def closed_form_centroid(heights, areas, moments):
+    area = np.sum(heights * areas, axis=-1)
+    moment = np.sum(heights * moments, axis=-1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(area == 0, 0.0, moment / area)
+
+
+def set_areas_moments(universe, sets):
+    return sets.sum(axis=-1), sets @ universe
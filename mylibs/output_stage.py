@@ -0,0 +1,138 @@
+# Post-processing of crisp HVAC levels for many zones at once: smoothing, slew-rate limit and dwell times.
+from dataclasses import dataclass
+
+import numpy as np
+
+
+"""
+Smoothing and actuator protection settings, shared by all zones of one stage.
+    tau: exponential smoothing time constant in seconds (0 disables smoothing).
+    max_slew: largest change per second in output units (inf disables the limit).
+    min_on / min_off: minimum seconds the actuator stays on / off before it may switch.
+    off_level: outputs at or below this level count as "off". Smoothing only approaches a command
+        asymptotically, so an output that falls to off_level while the command is off is set to the command.
+"""
+
+
+@dataclass(frozen=True)
+class SmoothingParams:
+    tau: float = 60.0
+    max_slew: float = 1.0
+    min_on: float = 300.0
+    min_off: float = 300.0
+    off_level: float = 0.5
+
+
+"""
+One vectorized smoothing step for all given zones.
+    Parameters:
+        value, time, switch_time (ndarray): Last output, time of the last update and time of the last on/off
+            switch, per zone. time is NaN for a zone that has never been updated.
+        on (ndarray): bool, whether the actuator is currently on.
+        commanded (ndarray): New crisp output per zone.
+        now (float or ndarray): Current time in seconds.
+    Returns:
+        tuple: (value, time, switch_time, on) after the step; value is the output to send.
+"""
+
+
+def smooth_step(value, time, switch_time, on, commanded, now, params=SmoothingParams()):
+    commanded = np.asarray(commanded, dtype=float)
+    now = np.broadcast_to(np.asarray(now, dtype=float), commanded.shape)
+    fresh = np.isnan(time)
+    dt = np.where(fresh, 0.0, now - time)
+
+    # Exponential smoothing with the actual elapsed time, then the slew-rate limit.
+    alpha = 1.0 if params.tau <= 0 else -np.expm1(-dt / params.tau)
+    target = value + alpha * (commanded - value)
+    limit = np.inf if np.isinf(params.max_slew) else params.max_slew * dt
+    step = np.clip(target - value, -limit, limit)
+    out = np.where(fresh, commanded, value + step)
+    out = np.where((out <= params.off_level) & (commanded <= params.off_level), commanded, out)
+
+    # Dwell: an on/off change that comes too early is held back by keeping the previous output.
+    wants_on = out > params.off_level
+    dwell = np.where(on, params.min_on, params.min_off)
+    held = ~fresh & (wants_on != on) & (now - switch_time < dwell)
+    out = np.where(held, value, out)
+
+    new_on = out > params.off_level
+    switched = fresh | (new_on != on)
+    return out, now.copy(), np.where(switched, now, switch_time), new_on
+
+
+"""
+Per-zone smoothing state kept in flat NumPy arrays, so every cycle is one vectorized step over all zones.
+"""
+
+
+class ZoneSmoother:
+    __slots__ = ("params", "value", "time", "switch_time", "on")
+
+    def __init__(self, n_zones, params=SmoothingParams()):
+        self.params = params
+        self.value = np.zeros(n_zones)
+        self.time = np.full(n_zones, np.nan)
+        self.switch_time = np.full(n_zones, np.nan)
+        self.on = np.zeros(n_zones, dtype=bool)
+
+    """
+    Applies one cycle. zones selects which zones commanded belongs to (all zones when None).
+        Returns:
+            ndarray: Smoothed output for those zones.
+    """
+
+    def step(self, commanded, now, zones=None):
+        sel = slice(None) if zones is None else np.asarray(zones)
+        state = smooth_step(self.value[sel], self.time[sel], self.switch_time[sel], self.on[sel], commanded, now,
+                            self.params)
+        self.value[sel], self.time[sel], self.switch_time[sel], self.on[sel] = state
+        return state[0]
+
+
+"""
+Deadband change suppression for actuator writes.
+    A zone is emitted when it has never been sent, when its level moved by more than `deadband` from the last
+    value sent, or when its category code changed. Only emitted zones update the last-sent state, so slow drift
+    still gets written once it accumulates past the deadband.
+"""
+
+
+class DeadbandFilter:
+    __slots__ = ("deadband", "sent_level", "sent_category", "emitted", "suppressed")
+
+    def __init__(self, n_zones, deadband=1.0):
+        self.deadband = deadband
+        self.sent_level = np.full(n_zones, np.nan)
+        self.sent_category = np.full(n_zones, -1, dtype=np.int8)
+        self.emitted = 0
+        self.suppressed = 0
+
+    """
+    Filters one cycle of outputs.
+        Parameters:
+            levels (ndarray): New crisp level per zone.
+            categories (ndarray): New category code per zone (e.g. hvac_batch.level_categories(levels)).
+            zones (ndarray): Zone ids the values belong to (all zones when None).
+        Returns:
+            ndarray: int32 ids of the zones to write.
+    """
+
+    def update(self, levels, categories, zones=None):
+        levels = np.asarray(levels, dtype=float)
+        zones = np.arange(len(self.sent_level)) if zones is None else np.asarray(zones)
+        changed = np.abs(levels - self.sent_level[zones]) > self.deadband
+        changed |= np.isnan(self.sent_level[zones])
+        changed |= np.asarray(categories) != self.sent_category[zones]
+
+        emit = zones[changed].astype(np.int32)
+        self.sent_level[emit] = levels[changed]
+        self.sent_category[emit] = np.asarray(categories)[changed]
+        self.emitted += len(emit)
+        self.suppressed += len(zones) - len(emit)
+        return emit
+
+    @property
+    def suppression_ratio(self):
+        total = self.emitted + self.suppressed
+        return self.suppressed / total if total else 0.0
@@ -0,0 +1,158 @@
+# Reusable HVAC figures: a live dashboard updated by blitting and headless (Agg) PNG reports rendered in parallel.
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from matplotlib.patches import Polygon
+
+import mylibs.hvac_batch as hb
+import mylibs.membership_functions as mf
+
+COLORS = ("skyblue", "green", "red")
+HVAC_COLORS = ("skyblue", "green", "orange", "red")
+INPUT_TITLES = (
+    ("Temperature", "Input Temperature Fuzzification: {:.1f} °C"),
+    ("Humidity", "Input Humidity Fuzzification: {:.1f} %"),
+    ("CO2", "Input CO₂ Fuzzification: {:.1f} ppm"),
+)
+
+
+"""
+The figures drawn by hvac_control_app, laid out on one figure: the three input fuzzification plots on top and
+    the aggregated HVAC output below. The membership curves are drawn once; update() only moves the input
+    points, the aggregate fill, the output marker and the titles, and returns those artists.
+    With animated=True the dynamic artists are left out of normal draws so they can be blitted.
+"""
+
+
+class HvacPanels:
+    def __init__(self, figure, animated=False):
+        self.figure = figure
+        grid = figure.add_gridspec(2, 3)
+        self.input_axes = [figure.add_subplot(grid[0, i]) for i in range(3)]
+        self.hvac_axis = figure.add_subplot(grid[1, :])
+
+        self.points = []
+        self.titles = []
+        for ax, universe, terms, (xlabel, _) in zip(self.input_axes, hb.INPUT_UNIVERSES, hb.INPUT_TERMS,
+                                                   INPUT_TITLES):
+            degrees = hb.fuzzify(universe, terms)
+            for t, (label, _, _) in enumerate(terms):
+                ax.plot(universe, degrees[:, t], label=label, color=COLORS[t])
+            ax.set_xlabel(xlabel)
+            ax.set_ylim(-0.05, 1.05)
+            ax.legend(loc="upper right")
+            self.points.append(ax.scatter([], [], animated=animated))
+            self.titles.append(ax.set_title("", animated=animated))
+
+        ax = self.hvac_axis
+        for t, (label, _, _) in enumerate(hb.HVAC_TERMS):
+            ax.plot(hb.HVAC_UNIVERSE, hb.HVAC_SETS[t], label=label, color=HVAC_COLORS[t])
+        self.fill = ax.add_patch(Polygon(np.zeros((1, 2)), closed=True, color="orange", alpha=0.7,
+                                         animated=animated))
+        self.output = ax.scatter([], [], color="red", label="Defuzzified Output", animated=animated)
+        self.hvac_title = ax.set_title("", animated=animated)
+        ax.set_xlabel("HVAC Level")
+        ax.set_ylim(-0.05, 1.05)
+        ax.legend(loc="upper right")
+        figure.tight_layout()
+
+    @property
+    def artists(self):
+        return [*self.points, *self.titles, self.fill, self.output, self.hvac_title]
+
+    def update(self, in_temp, in_humid, in_co2):
+        readings = (in_temp, in_humid, in_co2)
+        degrees = hb.fuzzify_inputs(*readings)
+        aggregated = hb.aggregate(hb.firing_strengths(degrees))
+        res = float(mf.defuzzify_centroid_batch(hb.HVAC_UNIVERSE, aggregated))
+
+        for point, title, x, mu, (_, fmt) in zip(self.points, self.titles, readings, degrees, INPUT_TITLES):
+            point.set_offsets(np.column_stack([np.full(len(mu), x), mu]))
+            title.set_text(fmt.format(x))
+        self.fill.set_xy(np.column_stack([
+            np.concatenate([hb.HVAC_UNIVERSE, hb.HVAC_UNIVERSE[::-1]]),
+            np.concatenate([aggregated, np.zeros_like(aggregated)]),
+        ]))
+        self.output.set_offsets([[res, 0]])
+        self.hvac_title.set_text(f"Defuzzification using Centroid Method: {res:.2f} %")
+        return self.artists
+
+
+"""
+Live dashboard: the figure is built once and each update blits only the dynamic artists over a cached
+    background. The background is re-captured whenever the canvas is fully redrawn (e.g. after a resize).
+"""
+
+
+class LiveDashboard:
+    def __init__(self, figure=None):
+        if figure is None:
+            from matplotlib import pyplot as plt
+
+            figure = plt.figure(figsize=(12, 8))
+        self.figure = figure
+        self.canvas = figure.canvas
+        self.panels = HvacPanels(figure, animated=True)
+        self.background = None
+        self.canvas.mpl_connect("draw_event", self._capture_background)
+        self.canvas.draw()
+
+    def _capture_background(self, _event=None):
+        self.background = self.canvas.copy_from_bbox(self.figure.bbox)
+
+    def update(self, in_temp, in_humid, in_co2):
+        if self.background is None:
+            self.canvas.draw()
+        self.canvas.restore_region(self.background)
+        for artist in self.panels.update(in_temp, in_humid, in_co2):
+            self.figure.draw_artist(artist)
+        self.canvas.blit(self.figure.bbox)
+        self.canvas.flush_events()
+
+
+""" Headless PNG reports """
+_report_panels = {}  # (figsize, dpi) -> HvacPanels, one per worker process
+
+
+def _report_worker_panels(figsize, dpi):
+    key = (tuple(figsize), dpi)
+    if key not in _report_panels:
+        figure = Figure(figsize=figsize, dpi=dpi)
+        FigureCanvasAgg(figure)
+        _report_panels[key] = HvacPanels(figure)
+    return _report_panels[key]
+
+
+def _render(job):
+    path, reading, figsize, dpi = job
+    panels = _report_worker_panels(figsize, dpi)
+    panels.update(*reading)
+    panels.figure.savefig(path)
+    return path
+
+
+"""
+Renders one PNG report per reading with the Agg canvas (no GUI, no pyplot state).
+    Each worker process builds its figure once and reuses it for every report it renders.
+    Parameters:
+        readings (array-like): shape (N, 3) with temperature, humidity and CO2 columns.
+        out_dir (str): Output directory (created if missing).
+        names (sequence): Optional file stem per reading, e.g. zone ids; defaults to report_00000, ...
+        workers (int): Number of worker processes; 1 renders in this process.
+    Returns:
+        list: Paths of the written files, in reading order.
+"""
+
+
+def render_reports(readings, out_dir, names=None, workers=1, figsize=(12, 8), dpi=80):
+    os.makedirs(out_dir, exist_ok=True)
+    readings = np.asarray(readings, dtype=float)
+    names = names if names is not None else [f"report_{i:05d}" for i in range(len(readings))]
+    jobs = [(os.path.join(out_dir, f"{name}.png"), tuple(row), figsize, dpi) for name, row in zip(names, readings)]
+    if workers <= 1:
+        return [_render(job) for job in jobs]
+    with ProcessPoolExecutor(workers) as executor:
+        return list(executor.map(_render, jobs, chunksize=max(1, len(jobs) // (4 * workers))))
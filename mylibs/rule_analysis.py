@@ -0,0 +1,174 @@
+# Rule-base analysis: subsumed, unreachable and conflicting rules, and the minimized equivalent rule base.
+from dataclasses import dataclass
+
+import numpy as np
+
+import mylibs.hvac_batch as hb
+import mylibs.operators as ops
+
+
+def _conjunctions(antecedent):
+    return antecedent if isinstance(antecedent, list) else [antecedent]
+
+
+"""
+True when conjunction a constrains a subset of b's inputs, each to the same term: every t-norm is monotone and
+    below min, so the strength of b can never exceed the strength of a.
+"""
+
+
+def _covers(a, b):
+    return all(ta is None or ta == tb for ta, tb in zip(a, b))
+
+
+"""
+True when antecedent a fires at least as strongly as antecedent b for every input, with either the rule format of
+    hvac_batch (a tuple) or of mamdani.rule_strengths (a list of ORed tuples, where only the max s-norm makes the
+    disjunction monotone in its parts).
+"""
+
+
+def antecedent_covers(a, b, operators=ops.ZADEH):
+    if isinstance(a, list) or isinstance(b, list):
+        if operators.snorm != "max":
+            return a == b
+        return all(any(_covers(ca, cb) for ca in _conjunctions(a)) for cb in _conjunctions(b))
+    return _covers(a, b)
+
+
+""" Shapes whose breakpoints must be in ascending order. """
+ORDERED_SHAPES = ("inc", "dec", "tri", "trap")
+
+
+def is_ordered(shape, params):
+    return shape not in ORDERED_SHAPES or all(p <= q for p, q in zip(params, params[1:]))
+
+
+"""
+True when a term is provably 0 for every real input, from its parameters alone: a triangle or trapezoid whose
+    support has zero width under the branch order of membership_functions.tri / trap (no x with a < x <= c where
+    the rising edge is positive, nor one past c where the falling edge is). inc, dec, gaussian and sigmoid terms are
+    positive somewhere for any parameters. Terms with unordered breakpoints are never judged dead; analyze()
+    reports them as malformed instead.
+"""
+
+
+def never_fires(shape, params):
+    if not is_ordered(shape, params):
+        return False
+    if shape == "tri":
+        a, b, c = params
+        return a >= max(b, c)
+    if shape == "trap":
+        a, _, c, d = params
+        return a >= c and d <= c
+    return False
+
+
+"""
+Result of analyze(). Rule numbers are 0-based indices into the analysed rule base.
+    subsumed: (rule, by) pairs: `rule` shares its consequent with `by`, never fires more strongly (structure and
+        weights) and, under max aggregation, its clipped set lies inside that of `by`.
+    unreachable: rules that never contribute: zero weight, a term that is zero for every input (never_fires), or a
+        consequent set that is zero at every sampled output point.
+    out_of_universe: rules with a term that is zero over its sampled input universe but not everywhere (e.g. a
+        term beyond the universe's end); reported only, they stay in the minimized rule base.
+    malformed: (input, term) pairs of terms whose breakpoints are not in ascending order (is_ordered); reported
+        only, their rules are not judged unreachable.
+    conflicts: (i, j, kind) pairs with different consequents: "contradiction" when the antecedents are the same,
+        "specialization" when rule j is a special case of rule i (it fires only where i fires at least as strongly).
+    kept: indices of the rules in the minimized rule base `rules` (with their `weights`, None when unweighted).
+"""
+
+
+@dataclass(frozen=True)
+class RuleAnalysis:
+    subsumed: tuple
+    unreachable: tuple
+    conflicts: tuple
+    kept: tuple
+    rules: tuple
+    weights: np.ndarray = None
+    out_of_universe: tuple = ()
+    malformed: tuple = ()
+
+    @property
+    def removed(self):
+        return tuple(sorted({rule for rule, _ in self.subsumed} | set(self.unreachable)))
+
+    def __str__(self):
+        lines = [f"Rule {rule + 1} is subsumed by rule {by + 1}" for rule, by in self.subsumed]
+        lines += [f"Rule {rule + 1} is unreachable" for rule in self.unreachable]
+        lines += [f"Rule {rule + 1} is unreachable within the input universes" for rule in self.out_of_universe]
+        lines += [f"Input {i + 1} term {t + 1} has unordered breakpoints" for i, t in self.malformed]
+        lines += [f"Rules {i + 1} and {j + 1}: {kind}" for i, j, kind in self.conflicts]
+        lines.append(f"Minimized rule base: rules {', '.join(str(i + 1) for i in self.kept)} "
+                     f"({len(self.removed)} removed)")
+        return "\n".join(lines)
+
+
+"""
+Proves from the rule structure, the weights and the operators which rules can be removed without changing any
+    output, and which pairs conflict.
+    A rule is subsumed by another with the same consequent whose antecedent constrains a subset of its inputs to the
+    same terms, with at least its weight: its firing strength is then never larger, and max aggregation (an
+    idempotent s-norm) absorbs its output set into the other's, with min and product implication alike. Other
+    s-norms add up every rule's contribution, so nothing is subsumed under them. Of identical rules the first is
+    kept.
+    Parameters:
+        input_terms / input_universes: Term tables, checked for terms that never fire, and the universes on which
+            the remaining terms are sampled for out_of_universe.
+        sets: Sampled output sets, checked for consequents that are zero at every point (defuzzification only sees
+            those points).
+    Returns:
+        RuleAnalysis
+"""
+
+
+def analyze(rules=hb.HVAC_RULES, weights=None, operators=ops.ZADEH, input_terms=hb.INPUT_TERMS,
+            input_universes=hb.INPUT_UNIVERSES, sets=hb.HVAC_SETS):
+    n = len(rules)
+    w = np.ones(n) if weights is None else np.asarray(weights, dtype=float)
+    dead_terms = [np.array([never_fires(shape, params) for _, shape, params in terms]) for terms in input_terms]
+    malformed = tuple((i, t) for i, terms in enumerate(input_terms)
+                      for t, (_, shape, params) in enumerate(terms) if not is_ordered(shape, params))
+    unsampled_terms = [np.max(hb.fuzzify(u, terms), axis=0) == 0 for u, terms in zip(input_universes, input_terms)]
+    dead_sets = np.max(sets, axis=-1) == 0
+
+    def blocked(antecedent, dead):
+        return all(any(t is not None and dead[i][t] for i, t in enumerate(conjunction))
+                   for conjunction in _conjunctions(antecedent))
+
+    unreachable, out_of_universe = [], []
+    for r, (antecedent, consequent) in enumerate(rules):
+        if w[r] == 0 or blocked(antecedent, dead_terms) or dead_sets[consequent]:
+            unreachable.append(r)
+        elif blocked(antecedent, unsampled_terms):
+            out_of_universe.append(r)
+
+    subsumed, conflicts = [], []
+    for i, (a, ca) in enumerate(rules):
+        for j, (b, cb) in enumerate(rules):
+            if i == j or not antecedent_covers(a, b, operators):
+                continue
+            same = antecedent_covers(b, a, operators)
+            if ca != cb:
+                if not same:
+                    conflicts.append((i, j, "specialization"))
+                elif i < j:
+                    conflicts.append((i, j, "contradiction"))
+            elif (operators.snorm == "max" and w[i] >= w[j] and i not in unreachable and j not in unreachable
+                  and not (same and w[i] == w[j] and j < i)):
+                subsumed.append((j, i))
+
+    # A rule subsumed several times is reported once, against its first subsumer.
+    seen = set()
+    subsumed = tuple((rule, by) for rule, by in sorted(subsumed) if not (rule in seen or seen.add(rule)))
+    removed = seen | set(unreachable)
+    kept = tuple(r for r in range(n) if r not in removed)
+    return RuleAnalysis(subsumed, tuple(unreachable), tuple(conflicts), kept, tuple(rules[r] for r in kept),
+                        None if weights is None else w[list(kept)], tuple(out_of_universe), malformed)
+
+
+""" The HVAC rule base without its subsumed rules (rule 7 is subsumed by rule 6): the same outputs for less work """
+HVAC_MINIMAL_RULES = analyze().rules
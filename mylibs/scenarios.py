@@ -0,0 +1,136 @@
+# Declarative scenario runner: a table of readings with expectations, checked in one batch pass.
+import csv
+from dataclasses import dataclass
+
+import numpy as np
+
+import mylibs.hvac_batch as hb
+import mylibs.operators as ops
+
+HVAC_LABELS = tuple(label for label, _, _ in hb.HVAC_TERMS)
+
+
+"""
+One verification case. Every expectation is optional:
+    category: expected dominant HVAC category label ("Off", "Low", "Medium", "High").
+    output_range: (low, high) bounds of the crisp HVAC level, inclusive.
+    rule: number (1-based, as in main.py) of the rule expected to fire strongest, after rule weights.
+"""
+
+
+@dataclass(frozen=True)
+class Scenario:
+    name: str
+    temp: float
+    humid: float
+    co2: float
+    category: str = None
+    output_range: tuple = None
+    rule: int = None
+
+
+""" Cases of 6_hvac_verification.ipynb """
+VERIFICATION_SCENARIOS = (
+    Scenario("Rule 1: comfortable, normal, low CO2", 23.5, 55, 450, "Off", (5.76, 5.86), 1),
+    Scenario("Rule 2: comfortable, normal, medium CO2", 23.5, 55, 900, "Low", (24.95, 25.05), 2),
+    Scenario("Rule 3: cold, normal", 20, 55, 700, "Low", (24.95, 25.05), 3),
+    Scenario("Rule 4: warm, normal", 28, 55, 700, "Medium", (54.95, 55.05), 4),
+    Scenario("Rule 5: high humidity", 24, 75, 700, "Medium", (54.95, 55.05), 5),
+    Scenario("Rule 6: high CO2", 24, 55, 1400, "High", (88.35, 88.45), 6),
+    Scenario("Rule 7: warm, high humidity, high CO2", 28, 75, 1400, "High", (72.68, 72.78)),
+    Scenario("Spread inputs", 21, 63, 1000, "Medium", (46.10, 46.20), 5),
+    Scenario("Spread, weighted towards comfort", 21, 41.5, 550, "Off", (19.57, 19.67)),
+    Scenario("Spread across extreme zones", 26, 62, 1050, "Medium", (57.10, 57.20), 4),
+    Scenario("No rule fires", 19, 35, 1000, "Off", (0, 0)),
+)
+
+
+"""
+Outcome of a scenario run, one entry per scenario.
+    failures: per scenario, the list of failed expectations (empty when it passed).
+"""
+
+
+@dataclass
+class ScenarioReport:
+    names: list
+    outputs: np.ndarray
+    categories: list
+    strongest_rules: np.ndarray
+    passed: np.ndarray
+    failures: list
+
+    @property
+    def all_passed(self):
+        return bool(self.passed.all())
+
+    def __str__(self):
+        lines = [
+            f"{'PASS' if ok else 'FAIL'} {name}: {output:.2f} % ({category}), rule {rule}"
+            + (f" -- {'; '.join(failed)}" if failed else "")
+            for name, output, category, rule, ok, failed in zip(self.names, self.outputs, self.categories,
+                                                                 self.strongest_rules, self.passed, self.failures)
+        ]
+        lines.append(f"{int(self.passed.sum())}/{len(self.passed)} scenarios passed")
+        return "\n".join(lines)
+
+
+"""
+Evaluates all scenarios in one batch pass and checks their expectations with array comparisons.
+    Returns:
+        ScenarioReport
+"""
+
+
+def run_scenarios(scenarios=VERIFICATION_SCENARIOS, rules=hb.HVAC_RULES, weights=None, operators=ops.ZADEH):
+    readings = np.array([(s.temp, s.humid, s.co2) for s in scenarios], dtype=float).reshape(-1, 3)
+    strengths = hb.firing_strengths(hb.fuzzify_inputs(*readings.T), rules, operators)
+    outputs = hb.centroid(strengths, rules=rules, weights=weights, operators=operators)
+    weighted = strengths if weights is None else strengths * np.asarray(weights, dtype=float)
+    if operators.implication == "min" and operators.snorm == "max":
+        codes = hb.height_categories(hb.clip_heights(weighted, rules))
+    else:
+        codes = hb.dominant_categories(hb.aggregate(strengths, rules=rules, weights=weights, operators=operators))
+    # Rule numbers are 1-based; 0 when no rule fires. Weighted, like the categories beside them.
+    strongest = np.where(weighted.max(axis=-1) > 0, np.argmax(weighted, axis=-1) + 1, 0)
+
+    expected_codes = np.array([-1 if s.category is None else HVAC_LABELS.index(s.category) for s in scenarios])
+    ranges = np.array([(-np.inf, np.inf) if s.output_range is None else s.output_range for s in scenarios],
+                      dtype=float).reshape(-1, 2)
+    expected_rules = np.array([-1 if s.rule is None else s.rule for s in scenarios])
+
+    category_ok = (expected_codes < 0) | (codes == expected_codes)
+    range_ok = (outputs >= ranges[:, 0]) & (outputs <= ranges[:, 1])
+    rule_ok = (expected_rules < 0) | (strongest == expected_rules)
+    passed = category_ok & range_ok & rule_ok
+
+    failures = [[] for _ in scenarios]
+    for i in np.flatnonzero(~passed):
+        s = scenarios[i]
+        if not category_ok[i]:
+            failures[i].append(f"category {HVAC_LABELS[codes[i]]}, expected {s.category}")
+        if not range_ok[i]:
+            failures[i].append(f"output {outputs[i]:.2f} outside {tuple(s.output_range)}")
+        if not rule_ok[i]:
+            failures[i].append(f"strongest rule {strongest[i]}, expected {s.rule}")
+    return ScenarioReport([s.name for s in scenarios], outputs, [HVAC_LABELS[c] for c in codes], strongest, passed,
+                          failures)
+
+
+"""
+Reads scenarios from a CSV file with columns name, temp, humid, co2 and the optional columns category,
+    min_output, max_output and rule (empty cells mean "not checked").
+"""
+
+
+def load_scenarios(path):
+    scenarios = []
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            low, high = row.get("min_output") or "", row.get("max_output") or ""
+            output_range = None if not (low or high) else (float(low or "-inf"), float(high or "inf"))
+            scenarios.append(Scenario(
+                row["name"], float(row["temp"]), float(row["humid"]), float(row["co2"]),
+                row.get("category") or None, output_range, int(row["rule"]) if row.get("rule") else None,
+            ))
+    return tuple(scenarios)
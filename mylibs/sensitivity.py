@@ -0,0 +1,201 @@
+# Sensitivity of the crisp HVAC output to the inputs: analytic gradient with a finite-difference fallback.
+from dataclasses import dataclass
+
+import numpy as np
+
+import mylibs.hvac_batch as hb
+import mylibs.operators as ops
+from mylibs.term_index import INDEXABLE_SHAPES, as_trap
+
+# Rows per chunk: the analytic pass keeps a few (rows, grid) temporaries.
+SENSITIVITY_CHUNK_SIZE = 2048
+# Central-difference step per input, as a fraction of the input universe span.
+RELATIVE_STEP = 1e-4
+
+
+"""
+Crisp output and its gradient for a batch of readings.
+    output: crisp HVAC level, shape (N,).
+    gradient: d output / d (temperature, humidity, CO2), shape (N, 3).
+    exact: True where the gradient is analytic; False where the reading sits on a kink (a breakpoint, a tie in a
+        rule's min, a tie between rules or output terms) or a set is not piecewise linear, and central
+        differences were used instead.
+"""
+
+
+@dataclass
+class Sensitivity:
+    output: np.ndarray
+    gradient: np.ndarray
+    exact: np.ndarray
+
+
+"""
+Slope of every term at x, plus a flag where x is on one of the term's breakpoints (where the slope is undefined).
+    Returns:
+        tuple: (slopes, on_breakpoint), both shape (..., T).
+"""
+
+
+def term_slopes(x, terms):
+    x = np.asarray(x, dtype=float)[..., None]
+    a, b, c, d = np.array([as_trap(shape, params) for _, shape, params in terms], dtype=float).T
+    with np.errstate(divide="ignore", invalid="ignore"):
+        slopes = np.select([(x > a) & (x < b), (x > c) & (x < d)], [1 / (b - a), -1 / (d - c)], default=0.0)
+    on_breakpoint = (x == a) | (x == b) | (x == c) | (x == d)
+    return slopes, on_breakpoint
+
+
+def is_piecewise_linear(input_terms):
+    return all(shape in INDEXABLE_SHAPES for terms in input_terms for _, shape, _ in terms)
+
+
+"""
+Crisp outputs for (N, 3) readings with any input term tables (hvac_batch.hvac_batch uses the default ones).
+"""
+
+
+def crisp_outputs(readings, input_terms=hb.INPUT_TERMS, rules=hb.HVAC_RULES, weights=None, operators=ops.ZADEH,
+                  chunk_size=hb.DEFAULT_CHUNK_SIZE):
+    readings = np.asarray(readings, dtype=float).reshape(-1, 3)
+    out = np.empty(len(readings))
+    for start in range(0, len(readings), chunk_size):
+        sl = slice(start, start + chunk_size)
+        degrees = hb.fuzzify_inputs(*readings[sl].T, input_terms=input_terms)
+        out[sl] = hb.centroid(hb.firing_strengths(degrees, rules, operators), rules=rules, weights=weights,
+                              operators=operators)
+    return out
+
+
+"""
+Central differences for all readings at once: the 6 shifted copies of the batch go through one batched call.
+    Parameters:
+        readings (ndarray): shape (N, 3).
+        steps (sequence): Step per input; defaults to RELATIVE_STEP of each input universe span.
+    Returns:
+        tuple: (output (N,), gradient (N, 3)).
+"""
+
+
+def finite_difference(readings, input_terms=hb.INPUT_TERMS, rules=hb.HVAC_RULES, weights=None,
+                      operators=ops.ZADEH, steps=None):
+    readings = np.asarray(readings, dtype=float).reshape(-1, 3)
+    if steps is None:
+        steps = [RELATIVE_STEP * (u[-1] - u[0]) for u in hb.INPUT_UNIVERSES]
+    offsets = np.concatenate([np.zeros((1, 3)), np.diag(steps), -np.diag(steps)])  # (7, 3)
+    shifted = (readings[None, :, :] + offsets[:, None, :]).reshape(-1, 3)
+    values = crisp_outputs(shifted, input_terms, rules, weights, operators).reshape(7, -1)
+    gradient = (values[1:4] - values[4:7]).T / (2 * np.asarray(steps, dtype=float))
+    return values[0], gradient
+
+
+"""
+Crisp output and gradient in one batched pass.
+    With min/max/min operators and piecewise-linear input sets the output is piecewise smooth: a rule's strength
+    follows the slope of its weakest antecedent, a clip height follows its strongest rule, and every grid point
+    of the aggregate follows the clip height of the term that owns it, when clipped. Differentiating the discrete
+    centroid y = sum(u A) / sum(A) gives dy/dx = sum_g (u_g - y) dA_g/dx / sum(A). Readings on a kink, and all
+    readings for other operators or non-linear sets (gaussian, sigmoid), use finite_difference.
+    Returns:
+        Sensitivity
+"""
+
+
+def sensitivity(in_temp, in_humid, in_co2, input_terms=hb.INPUT_TERMS, rules=hb.HVAC_RULES, weights=None,
+                operators=ops.ZADEH, steps=None, chunk_size=SENSITIVITY_CHUNK_SIZE):
+    readings = np.column_stack(np.broadcast_arrays(
+        *(np.atleast_1d(np.asarray(x, dtype=float)) for x in (in_temp, in_humid, in_co2))
+    ))
+    n = len(readings)
+    output, gradient, exact = np.empty(n), np.empty((n, 3)), np.zeros(n, dtype=bool)
+    if operators == ops.ZADEH and is_piecewise_linear(input_terms):
+        for start in range(0, n, chunk_size):
+            sl = slice(start, start + chunk_size)
+            output[sl], gradient[sl], exact[sl] = _analytic(readings[sl], input_terms, rules, weights)
+
+    fallback = np.flatnonzero(~exact)
+    if len(fallback):
+        output[fallback], gradient[fallback] = finite_difference(readings[fallback], input_terms, rules, weights,
+                                                                 operators, steps)
+    return Sensitivity(output, gradient, exact)
+
+
+def _analytic(readings, input_terms, rules, weights):
+    n = len(readings)
+    degrees = hb.fuzzify_inputs(*readings.T, input_terms=input_terms)
+    slopes, breaks = zip(*(term_slopes(x, terms) for x, terms in zip(readings.T, input_terms)))
+    kink = np.isnan(readings).any(axis=1)
+
+    # Rule strengths (min over the used antecedents) and their gradients: the slope of the weakest antecedent.
+    w = np.ones(len(rules)) if weights is None else np.asarray(weights, dtype=float)
+    strengths = np.empty((n, len(rules)))
+    d_strengths = np.zeros((n, len(rules), 3))
+    for r, (antecedent, _) in enumerate(rules):
+        used = [(i, t) for i, t in enumerate(antecedent) if t is not None]
+        values = np.stack([degrees[i][:, t] for i, t in used], axis=-1)
+        weakest = np.argmin(values, axis=-1)
+        strengths[:, r] = w[r] * values[np.arange(n), weakest]
+        minimum = values[np.arange(n), weakest, None]
+        for k, (i, t) in enumerate(used):
+            d_strengths[:, r, i] = np.where(weakest == k, w[r] * slopes[i][:, t], 0.0)
+            # A breakpoint only matters for an antecedent that sets the strength (including the edge of its
+            # support, where the rule starts firing).
+            kink |= (values[:, k] == minimum[:, 0]) & breaks[i][:, t]
+        tied = values == minimum
+        slope_of = np.stack([slopes[i][:, t] for i, t in used], axis=-1)
+        # Tied antecedents read different inputs, so a tie is a kink unless all but one tied slope are zero.
+        kink |= (tied.sum(axis=-1) > 1) & ((tied & (slope_of != 0)).sum(axis=-1) > 0) & (strengths[:, r] > 0)
+
+    # Clip heights (max over the rules of each term) and their gradients.
+    n_terms = hb.HVAC_SETS.shape[-2]
+    heights = np.zeros((n, n_terms))
+    d_heights = np.zeros((n, n_terms, 3))
+    for c in range(n_terms):
+        members = [r for r, (_, cons) in enumerate(rules) if cons == c]
+        if not members:
+            continue
+        s = strengths[:, members]
+        best = np.argmax(s, axis=-1)
+        heights[:, c] = s[np.arange(n), best]
+        d_heights[:, c] = d_strengths[:, members][np.arange(n), best]
+        tied = (s == heights[:, c, None]) & (np.arange(len(members)) != best[:, None])
+        d_tied = np.abs(d_strengths[:, members] - d_heights[:, c, None]).max(axis=-1) > 0
+        kink |= (tied & d_tied).any(axis=-1) & (heights[:, c] > 0)
+
+    # Aggregate: each grid point is owned by the term with the largest clipped value (the first one on a tie, as
+    # argmax) and moves with that term's clip height where the clip is below the set (h < S).
+    sets = hb.HVAC_SETS
+    aggregated = np.minimum(heights[:, 0, None], sets[0])
+    owner = np.zeros(aggregated.shape, dtype=np.int8)
+    clipped = np.empty_like(aggregated)
+    for c in range(1, n_terms):
+        np.minimum(heights[:, c, None], sets[c], out=clipped)
+        owner[clipped > aggregated] = c
+        np.maximum(aggregated, clipped, out=aggregated)
+    # min(h, S) has a kink where a clip height equals a sampled set value, and tied clip heights move the same
+    # grid points in different directions when their gradients differ.
+    inner = (heights > 0) & (heights < 1)
+    kink |= (inner & np.isin(heights, _set_levels(sets))).any(axis=-1)
+    for c1 in range(n_terms):
+        for c2 in range(c1 + 1, n_terms):
+            differ = np.any(d_heights[:, c1] != d_heights[:, c2], axis=-1)
+            kink |= (heights[:, c1] == heights[:, c2]) & (heights[:, c1] > 0) & differ
+
+    area = aggregated.sum(axis=-1)
+    output = hb.height_centroid(heights)  # the controller's own summation, so outputs match hvac_batch exactly
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # Lever arm sum of the points each term moves (min(h, S) < S, i.e. the aggregate is below that term's set),
+        # then combined with that term's clip-height gradient.
+        per_term = np.empty((len(readings), n_terms))
+        for c in range(n_terms):
+            moved = (owner == c) & (aggregated < sets[c])
+            per_term[:, c] = moved @ hb.HVAC_UNIVERSE - output * moved.sum(axis=-1)
+        gradient = np.where(area[:, None] == 0, 0.0, np.einsum("nc,nci->ni", per_term, d_heights) / area[:, None])
+    return output, gradient, ~kink
+
+
+def _set_levels(sets):
+    return _HVAC_SET_LEVELS if sets is hb.HVAC_SETS else np.unique(sets)
+
+
+_HVAC_SET_LEVELS = np.unique(hb.HVAC_SETS)
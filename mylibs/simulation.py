@@ -0,0 +1,199 @@
+# Closed-loop simulation: lumped zone models (temperature, humidity, CO2) driven by the fuzzy controller.
+from dataclasses import dataclass
+
+import numpy as np
+
+import mylibs.hvac_batch as hb
+import mylibs.operators as ops
+import mylibs.telemetry as tm
+import mylibs.validation as va
+
+INPUT_NAMES = ("temp", "humid", "co2")
+
+""" Comfort Band per input: (low, high) """
+COMFORT_LIMITS = ((20.0, 26.0), (30.0, 65.0), (0.0, 1000.0))
+
+
+"""
+Lumped zone model. Every field may be a scalar or a per-zone array.
+    The HVAC supplies conditioned air at supply_temp / supply_humid; at level 100 % it moves hvac_ach room
+    volumes per hour, of which fresh_air_fraction is outdoor air (diluting CO2). The room's thermal mass follows
+    the supply air at hvac_thermal_share of that rate and the outdoor temperature with time constant
+    envelope_hours; humidity and CO2 also exchange with outdoor air through infiltration_ach.
+    occupant_heat / occupant_moisture / occupant_co2: rise per hour per occupant in K, % and ppm.
+    rated_power: electrical power at level 100 %, in kW (the draw is taken as proportional to the level).
+"""
+
+
+@dataclass(frozen=True)
+class ZoneModel:
+    envelope_hours: float = 10.0
+    infiltration_ach: float = 0.3
+    hvac_ach: float = 6.0
+    hvac_thermal_share: float = 0.25
+    fresh_air_fraction: float = 0.3
+    supply_temp: float = 23.5
+    supply_humid: float = 50.0
+    occupant_heat: float = 0.06
+    occupant_moisture: float = 0.1
+    occupant_co2: float = 30.0
+    rated_power: float = 3.0
+
+
+"""
+Outdoor conditions: daily sinusoids (warmest mid-afternoon, most humid before dawn) around seasonal means, plus
+    a random offset per day drawn from the simulation seed.
+"""
+
+
+@dataclass(frozen=True)
+class Weather:
+    mean_temp: float = 27.0
+    temp_swing: float = 5.0
+    mean_humid: float = 70.0
+    humid_swing: float = 15.0
+    day_to_day: float = 2.0
+
+
+def outdoor_conditions(time, weather=Weather(), seed=0):
+    time = np.asarray(time, dtype=float)
+    days = (time // 86400).astype(np.int64)
+    offsets = np.random.default_rng([seed, 2]).normal(0, weather.day_to_day, days.max(initial=0) + 1)
+    diurnal = np.sin(2 * np.pi * ((time / 3600.0) % 24 - 9) / 24)
+    temp = weather.mean_temp + weather.temp_swing * diurnal + offsets[days]
+    humid = np.clip(weather.mean_humid - weather.humid_swing * diurnal - 2 * offsets[days], 5, 100)
+    return temp, humid
+
+
+"""
+Controller for the simulation: (N, 3) readings to HVAC levels in %, with any input term tables, rules, weights
+    and operators (the defaults reproduce hvac_batch.hvac_batch). A centroid_cache.CentroidCache trades a
+    quantization error for speed (min / max operators only).
+"""
+
+
+def fuzzy_controller(input_terms=hb.INPUT_TERMS, rules=hb.HVAC_RULES, weights=None, operators=ops.ZADEH,
+                     cache=None):
+    if cache is not None and (operators.implication, operators.snorm) != ("min", "max"):
+        raise ValueError("A centroid cache needs min implication and max aggregation")
+
+    def control(readings):
+        strengths = hb.firing_strengths(hb.fuzzify_inputs(*readings.T, input_terms=input_terms), rules, operators)
+        if cache is not None:
+            return cache.centroid(strengths, rules, weights)
+        return hb.centroid(strengths, rules=rules, weights=weights, operators=operators)
+
+    return control
+
+
+"""
+Outcome of a simulation, per zone.
+    energy: electrical energy in kWh.
+    violation_hours: hours outside COMFORT_LIMITS, per input, shape (N, 3).
+    violation_degree_hours: integral of the distance outside the band (K h, % h, ppm h), shape (N, 3).
+    mean_level: average HVAC level in %.
+    trace: when recorded, (time (K,), states (K, N, 3), levels (K, N)) every record_every steps; otherwise None.
+"""
+
+
+@dataclass
+class SimulationResult:
+    hours: float
+    energy: np.ndarray
+    violation_hours: np.ndarray
+    violation_degree_hours: np.ndarray
+    mean_level: np.ndarray
+    trace: tuple = None
+
+    def summary(self):
+        return {
+            "zones": len(self.energy),
+            "hours": self.hours,
+            "energy_kwh": float(self.energy.sum()),
+            "kwh_per_zone_day": float(self.energy.mean() * 24 / self.hours),
+            "mean_level": float(self.mean_level.mean()),
+            **{f"{name}_violation_share": float(self.violation_hours[:, i].mean() / self.hours)
+               for i, name in enumerate(INPUT_NAMES)},
+        }
+
+    def __str__(self):
+        s = self.summary()
+        return (f"{s['zones']} zones, {s['hours'] / 24:g} days: {s['energy_kwh']:,.0f} kWh "
+                f"({s['kwh_per_zone_day']:.2f} kWh per zone-day, mean level {s['mean_level']:.1f} %); "
+                f"outside comfort: temp {s['temp_violation_share']:.1%}, humid {s['humid_violation_share']:.1%}, "
+                f"CO2 {s['co2_violation_share']:.1%} of the time")
+
+
+"""
+Simulates n_zones zones closed-loop for `days` days, all zones at once per time step.
+    Each step the controller reads the zone states (clamped to the term ranges, as a saturating sensor would
+    report them), its level is held for dt seconds and every state moves exactly along the first-order response
+    to that level, the occupancy (telemetry.occupancy_schedule, peak occupants per zone drawn from the seed unless
+    given) and the outdoor conditions.
+    Parameters:
+        controller (callable): (N, 3) readings -> levels in %; fuzzy_controller() by default.
+        initial (array-like): Starting (temperature, humidity, CO2), (3,) or (N, 3).
+        record_every (int): Keep a trace of states and levels every this many steps; None keeps none.
+    Returns:
+        SimulationResult
+"""
+
+
+def simulate(n_zones=1000, days=7, dt=600.0, controller=None, model=ZoneModel(), weather=Weather(), seed=0,
+             occupants=None, initial=(23.5, 50.0, tm.OUTDOOR_CO2), start_time=0.0, record_every=None):
+    controller = fuzzy_controller() if controller is None else controller
+    if occupants is None:
+        occupants = tm.zone_profiles(n_zones, np.random.default_rng([seed, 0])).occupants
+    steps = int(round(days * 86400 / dt))
+    times = start_time + np.arange(steps) * dt
+    outdoor_temp, outdoor_humid = outdoor_conditions(times, weather, seed)
+    occupancy = tm.occupancy_schedule(times)
+
+    m = model
+    low, high = np.array(va.FIRING_RANGES, dtype=float).T
+    comfort_low, comfort_high = np.array(COMFORT_LIMITS).T
+    state = np.array(np.broadcast_to(np.asarray(initial, dtype=float), (n_zones, 3)))
+    envelope = 1 / (3600.0 * np.asarray(m.envelope_hours, dtype=float))
+    infiltration = np.asarray(m.infiltration_ach, dtype=float) / 3600.0
+    supply = np.asarray(m.hvac_ach, dtype=float) / 3600.0  # room volumes per second at level 100 %
+
+    energy = np.zeros(n_zones)
+    level_sum = np.zeros(n_zones)
+    outside = np.zeros((n_zones, 3))
+    distance = np.zeros((n_zones, 3))
+    trace = None
+    if record_every:
+        kept = range(0, steps, record_every)
+        trace = (times[::record_every], np.empty((len(kept), n_zones, 3)), np.empty((len(kept), n_zones)))
+
+    for k in range(steps):
+        level = controller(np.clip(state, low, high))
+        u = level / 100.0
+        people = occupancy[k] * occupants
+        if trace is not None and k % record_every == 0:
+            trace[1][k // record_every], trace[2][k // record_every] = state, level
+
+        # Each state x follows dx/dt = sum_i a_i (target_i - x) + source: over a step with constant inputs it
+        # relaxes exactly towards x* = (sum_i a_i target_i + source) / sum_i a_i at rate sum_i a_i.
+        rates = np.stack([
+            envelope + supply * u * m.hvac_thermal_share,
+            infiltration + supply * u,
+            infiltration + supply * u * m.fresh_air_fraction,
+        ], axis=-1)
+        drive = np.stack([
+            envelope * outdoor_temp[k] + supply * u * m.hvac_thermal_share * m.supply_temp
+            + m.occupant_heat * people / 3600.0,
+            infiltration * outdoor_humid[k] + supply * u * m.supply_humid + m.occupant_moisture * people / 3600.0,
+            (infiltration + supply * u * m.fresh_air_fraction) * tm.OUTDOOR_CO2 + m.occupant_co2 * people / 3600.0,
+        ], axis=-1)
+        target = drive / rates
+        state = target + (state - target) * np.exp(-rates * dt)
+
+        energy += m.rated_power * u * dt / 3600.0
+        level_sum += level
+        below, above = comfort_low - state, state - comfort_high
+        gap = np.maximum(np.maximum(below, above), 0)
+        outside += (gap > 0) * (dt / 3600.0)
+        distance += gap * (dt / 3600.0)
+
+    return SimulationResult(steps * dt / 3600.0, energy, outside, distance, level_sum / max(steps, 1), trace)
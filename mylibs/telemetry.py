@@ -0,0 +1,243 @@
+# Seedable synthetic multi-zone telemetry (temperature, humidity, CO2) streamed in blocks, with sensor faults.
+import argparse
+import json
+import sys
+from dataclasses import dataclass
+
+import numpy as np
+
+import mylibs.hvac_batch as hb
+
+""" Record Layout """
+# temp, humid and co2 come first so CSV output feeds `python main.py --input` directly.
+TELEMETRY_DTYPE = np.dtype([
+    ("temp", "<f4"),
+    ("humid", "<f4"),
+    ("co2", "<f4"),
+    ("zone", "<i4"),
+    ("time", "<f8"),
+    ("fault", "i1"),
+])
+FAULT_NONE, FAULT_DROPOUT, FAULT_STUCK, FAULT_SPIKE = 0, 1, 2, 3
+
+OUTDOOR_CO2 = 420.0  # ppm
+
+
+"""
+Generator settings.
+    n_zones: zones reporting at every time step; interval: seconds between steps; block_steps: time steps per
+        generated block (the random stream is drawn per block, so a seed gives the same rows for the same
+        block_steps).
+    noise: sensor noise standard deviation per input (°C, %, ppm).
+    dropout_rate / spike_rate: per-reading probability of a NaN reading / a spike.
+    stuck_rate: per-reading probability that a sensor freezes; stuck_steps: mean length of a freeze.
+"""
+
+
+@dataclass(frozen=True)
+class TelemetryConfig:
+    n_zones: int = 100
+    interval: float = 60.0
+    start_time: float = 0.0
+    block_steps: int = 256
+    noise: tuple = (0.1, 0.5, 10.0)
+    dropout_rate: float = 1e-3
+    spike_rate: float = 5e-4
+    stuck_rate: float = 2e-4
+    stuck_steps: float = 30.0
+
+
+"""
+Per-zone building characteristics, drawn once from the seed.
+"""
+
+
+@dataclass
+class ZoneProfile:
+    base_temp: np.ndarray  # °C at night
+    temp_swing: np.ndarray  # diurnal amplitude, °C
+    base_humid: np.ndarray  # %
+    occupants: np.ndarray  # peak occupants
+    air_changes: np.ndarray  # fresh-air changes per hour
+    co2_per_occupant: np.ndarray  # ppm per hour per occupant at zero ventilation
+
+
+def zone_profiles(n_zones, rng):
+    return ZoneProfile(
+        base_temp=rng.uniform(19.5, 23.5, n_zones),
+        temp_swing=rng.uniform(0.5, 2.5, n_zones),
+        base_humid=rng.uniform(38, 62, n_zones),
+        occupants=rng.integers(2, 40, n_zones).astype(float),
+        air_changes=rng.uniform(0.5, 3.0, n_zones),
+        co2_per_occupant=rng.uniform(25, 60, n_zones),
+    )
+
+
+""" Fraction of the peak occupancy by hour of day: ramps 7-9 h up, 17-19 h down, empty at weekends. """
+
+
+def occupancy_schedule(time):
+    hour = (time / 3600.0) % 24
+    weekday = (time // 86400) % 7 < 5
+    return np.clip(np.minimum(hour - 7, 19 - hour) / 2, 0, 1) * weekday
+
+
+"""
+Streams telemetry blocks (structured arrays with TELEMETRY_DTYPE, one row per zone and time step, time-major).
+    Parameters:
+        rows (int): Total rows to produce; None streams forever.
+        seed (int): Seed; the same seed and config always give the same rows.
+    Yields:
+        ndarray: Blocks of at most block_steps * n_zones rows.
+"""
+
+
+def generate(rows=None, seed=0, config=TelemetryConfig()):
+    n = config.n_zones
+    profiles = zone_profiles(n, np.random.default_rng([seed, 0]))
+    co2 = np.full(n, OUTDOOR_CO2)
+    held = np.full((3, n), np.nan)  # value a stuck sensor keeps repeating
+    stuck_left = np.zeros((3, n), dtype=np.int64)
+    produced, block = 0, 0
+    while rows is None or produced < rows:
+        rng = np.random.default_rng([seed, 1, block])
+        m = config.block_steps
+        time = config.start_time + (block * m + np.arange(m)) * config.interval
+        occupancy = occupancy_schedule(time)[:, None] * profiles.occupants * rng.uniform(0.7, 1.0, (m, n))
+
+        # Diurnal temperature (peak mid-afternoon) plus heat from occupants; humidity moves against temperature.
+        diurnal = np.sin(2 * np.pi * ((time / 3600.0) % 24 - 9) / 24)[:, None]
+        temp = profiles.base_temp + profiles.temp_swing * diurnal + 0.05 * occupancy
+        humid = profiles.base_humid - 4 * profiles.temp_swing * diurnal + 0.3 * occupancy
+        co2_values, co2 = _co2_response(co2, occupancy, profiles, config.interval)
+
+        values = np.stack([temp, humid, co2_values])  # (3, m, n)
+        values += np.asarray(config.noise, dtype=float)[:, None, None] * rng.standard_normal(values.shape)
+        for i, universe in enumerate(hb.INPUT_UNIVERSES):
+            np.clip(values[i], universe[0], universe[-1], out=values[i])
+        fault = _inject_faults(values, held, stuck_left, rng, config)
+
+        out = np.empty(m * n, dtype=TELEMETRY_DTYPE)
+        out["temp"], out["humid"], out["co2"] = (v.ravel() for v in values)
+        out["zone"] = np.tile(np.arange(n), m)
+        out["time"] = np.repeat(time, n)
+        out["fault"] = fault.ravel()
+        if rows is not None and produced + len(out) > rows:
+            out = out[:rows - produced]
+        produced += len(out)
+        block += 1
+        yield out
+
+
+def _co2_response(co2, occupancy, profiles, interval, sub_steps=64):
+    # First-order mixing model dC/dt = g * occupants - k (C - C_out), solved exactly per step:
+    # C[t+1] = C_out + r (C[t] - C_out) + u[t] with r = exp(-k dt). Within sub-blocks of the block the
+    # recursion is a cumulative sum scaled by powers of r (kept short so r^-k stays well conditioned).
+    k = profiles.air_changes / 3600.0
+    r = np.exp(-k * interval)
+    gain = profiles.co2_per_occupant / 3600.0 * (1 - r) / k
+    out = np.empty_like(occupancy)
+    excess = co2 - OUTDOOR_CO2
+    for start in range(0, len(occupancy), sub_steps):
+        u = occupancy[start:start + sub_steps] * gain
+        powers = r ** np.arange(1, len(u) + 1)[:, None]
+        excess_k = powers * (excess + np.cumsum(u * r / powers, axis=0))
+        out[start:start + sub_steps] = OUTDOOR_CO2 + excess_k
+        excess = excess_k[-1]
+    return out, OUTDOOR_CO2 + excess
+
+
+def _inject_faults(values, held, stuck_left, rng, config):
+    # values: (3, m, n), modified in place. Returns the fault code per row (the last fault that hit the row).
+    _, m, n = values.shape
+    fault = np.zeros((m, n), dtype=np.int8)
+    spike = rng.random(values.shape) < config.spike_rate
+    values[spike] *= rng.choice([0.5, 1.6], spike.sum())
+    fault[spike.any(axis=0)] = FAULT_SPIKE
+
+    # Stuck sensors: a freeze starts with stuck_rate and lasts a geometric number of steps, carried across blocks.
+    starts = rng.random(values.shape) < config.stuck_rate
+    lengths = rng.geometric(1 / config.stuck_steps, values.shape)
+    for step in range(m):
+        active = stuck_left > 0
+        values[:, step][active] = held[active]
+        stuck_left[active] -= 1
+        begin = ~active & starts[:, step]
+        held[begin] = values[:, step][begin]
+        stuck_left[begin] = lengths[:, step][begin]
+        fault[step, active.any(axis=0)] = FAULT_STUCK
+
+    dropout = rng.random(values.shape) < config.dropout_rate
+    values[dropout] = np.nan
+    fault[dropout.any(axis=0)] = FAULT_DROPOUT
+    return fault
+
+
+""" Writers: each consumes a block stream and returns the number of rows written. """
+
+
+def write_csv(blocks, f):
+    f.write("temp,humid,co2,zone,time,fault\n")
+    rows = 0
+    for block in blocks:
+        np.savetxt(f, np.column_stack([block[name] for name in TELEMETRY_DTYPE.names]),
+                   fmt=["%.2f", "%.2f", "%.1f", "%d", "%.0f", "%d"], delimiter=",")
+        rows += len(block)
+    return rows
+
+
+def write_jsonl(blocks, f):
+    rows = 0
+    for block in blocks:
+        columns = []
+        for name, digits in (("temp", 2), ("humid", 2), ("co2", 1)):
+            values = np.round(block[name].astype(float), digits)
+            # Dropouts are written as null: json.dumps would write a bare NaN token, which is not JSON.
+            columns.append(np.where(np.isfinite(values), values, None).tolist())
+        columns += [block["zone"].tolist(), block["time"].tolist(), block["fault"].tolist()]
+        f.write("".join(
+            json.dumps(dict(zip(TELEMETRY_DTYPE.names, row)), allow_nan=False) + "\n" for row in zip(*columns)
+        ))
+        rows += len(block)
+    return rows
+
+
+def write_binary(blocks, f):
+    rows = 0
+    for block in blocks:
+        f.write(block.tobytes())
+        rows += len(block)
+    return rows
+
+
+"""
+Streams a binary telemetry file back in blocks of block_rows records.
+"""
+
+
+def read_binary(path, block_rows=65536):
+    with open(path, "rb") as f:
+        while True:
+            block = np.fromfile(f, dtype=TELEMETRY_DTYPE, count=block_rows)
+            if not len(block):
+                return
+            yield block
+
+
+WRITERS = {"csv": write_csv, "jsonl": write_jsonl, "bin": write_binary}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Synthetic HVAC telemetry generator")
+    parser.add_argument("--rows", type=int, required=True)
+    parser.add_argument("--zones", type=int, default=TelemetryConfig.n_zones)
+    parser.add_argument("--interval", type=float, default=TelemetryConfig.interval)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--format", choices=sorted(WRITERS), default="csv")
+    args = parser.parse_args()
+
+    stream = generate(args.rows, args.seed, TelemetryConfig(n_zones=args.zones, interval=args.interval))
+    if args.format == "bin":
+        WRITERS["bin"](stream, sys.stdout.buffer)
+    else:
+        WRITERS[args.format](stream, sys.stdout)
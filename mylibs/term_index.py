@@ -0,0 +1,120 @@
+# Active-term index: evaluates only the terms whose support contains a reading.
+import numpy as np
+
+import mylibs.membership_functions as mf
+
+INDEXABLE_SHAPES = ("inc", "dec", "tri", "trap")
+
+
+"""
+Piecewise-linear term as trapezoid parameters (a, b, c, d).
+    tri(a, b, c) == trap(a, b, b, c), inc(a, b) == trap(a, b, inf, inf) and dec(a, b) == trap(-inf, -inf, a, b)
+    for every x, including the breakpoints, so one vectorized formula evaluates any mix of active terms.
+"""
+
+
+def as_trap(shape, params):
+    if shape == "trap":
+        return tuple(params)
+    if shape == "tri":
+        a, b, c = params
+        return a, b, b, c
+    if shape == "inc":
+        return (*params, np.inf, np.inf)
+    if shape == "dec":
+        return (-np.inf, -np.inf, *params)
+    raise ValueError(f"Shape '{shape}' has no bounded support, expected one of {INDEXABLE_SHAPES}")
+
+
+"""
+Uniform partition of [lo, hi] into n overlapping terms: shoulders at both ends and triangles in between.
+"""
+
+
+def uniform_partition(lo, hi, n_terms, labels=None):
+    p = np.linspace(lo, hi, n_terms).tolist()
+    labels = labels or [f"T{i}" for i in range(n_terms)]
+    terms = [(labels[0], "trap", (lo, lo, lo, p[1]))]
+    terms += [(labels[i], "tri", (p[i - 1], p[i], p[i + 1])) for i in range(1, n_terms - 1)]
+    terms.append((labels[-1], "trap", (p[-2], hi, hi, hi)))
+    return tuple(terms)
+
+
+"""
+Membership degrees kept sparse: the indices of the active terms and their degrees, both shape (N, K).
+    Indexing with [..., t] returns the dense degree of term t, so hvac_batch.firing_strengths consumes it directly
+    and the full (N, T) matrix is never built.
+"""
+
+
+class SparseDegrees:
+    __slots__ = ("indices", "values", "n_terms")
+
+    def __init__(self, indices, values, n_terms):
+        self.indices = indices
+        self.values = values
+        self.n_terms = n_terms
+
+    def __getitem__(self, key):
+        t = key[-1] if isinstance(key, tuple) else key
+        return np.where(self.indices == t, self.values, 0.0).max(axis=-1)
+
+    def dense(self):
+        out = np.zeros((*self.indices.shape[:-1], self.n_terms + 1))
+        np.put_along_axis(out, np.where(self.indices < 0, self.n_terms, self.indices), self.values, axis=-1)
+        return out[..., :-1]
+
+
+"""
+Sorted breakpoint index over the supports of one variable's terms.
+    The breakpoints split the line into segments on which the set of (possibly) active terms is constant; each
+    segment's terms are stored in a (segments, K) table padded with -1, where K is the largest overlap (2 for a
+    partition of overlapping neighbours, whatever the number of terms). A reading is located with np.searchsorted
+    and only its K terms are evaluated. NaN readings activate no term.
+"""
+
+
+class TermIndex:
+    def __init__(self, terms):
+        self.terms = terms
+        self.params = np.array([as_trap(shape, params) for _, shape, params in terms], dtype=float)
+        lo, hi = self.params[:, 0], self.params[:, 3]
+        finite = np.concatenate([lo, hi])
+        self.boundaries = np.unique(finite[np.isfinite(finite)])
+
+        # Segment j covers (B[j-1], B[j]]. Every shape is 0 at x <= a, so a support is (a, d] and a term is
+        # active on the segment exactly when a < B[j] and d > B[j-1].
+        left = np.concatenate([[-np.inf], self.boundaries])
+        right = np.concatenate([self.boundaries, [np.inf]])
+        active = [np.flatnonzero((lo < r) & (hi > l)) for l, r in zip(left, right)]
+        width = max(1, max(len(a) for a in active))
+        self.table = np.full((len(active) + 1, width), -1, dtype=np.intp)
+        for j, a in enumerate(active):
+            self.table[j, :len(a)] = a  # the extra last row (all -1) is used for NaN readings
+
+    @property
+    def width(self):
+        return self.table.shape[1]
+
+    """
+    Segment of every reading. With assume_sorted=True (x ascending, NaN last) the boundaries are searched in x
+    instead, O(S log N + N) rather than O(N log S).
+    """
+
+    def locate(self, x, assume_sorted=False):
+        x = np.asarray(x, dtype=float)
+        if assume_sorted:
+            starts = np.searchsorted(x, self.boundaries, side="right")
+            n_valid = len(x) - int(np.count_nonzero(np.isnan(x)))
+            counts = np.diff(np.concatenate([[0], np.minimum(starts, n_valid), [n_valid]]))
+            segments = np.repeat(np.arange(len(self.boundaries) + 1), counts)
+            return np.concatenate([segments, np.full(len(x) - n_valid, len(self.table) - 1)])
+        segments = np.searchsorted(self.boundaries, x, side="left")
+        return np.where(np.isnan(x), len(self.table) - 1, segments)
+
+    def fuzzify(self, x, assume_sorted=False):
+        x = np.asarray(x, dtype=float)
+        indices = self.table[self.locate(x, assume_sorted)]
+        a, b, c, d = np.moveaxis(self.params[indices], -1, 0)
+        values = np.where(indices >= 0, mf.trap_batch(x[..., None], a, b, c, d), 0.0)
+        return SparseDegrees(indices, values, len(self.terms))
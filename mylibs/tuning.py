@@ -0,0 +1,202 @@
+# Fits the HVAC membership parameters (and optional rule weights) to recorded (inputs, desired HVAC level) data.
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+import numpy as np
+
+import mylibs.hvac_batch as hb
+import mylibs.operators as ops
+
+# Piecewise-linear shapes are tuned; their parameters must stay ordered (a <= b <= c <= d).
+TUNABLE_SHAPES = ("inc", "dec", "tri", "trap")
+
+# Candidate-rows per chunk, i.e. population size x dataset rows scored at once.
+DEFAULT_CHUNK_SIZE = hb.DEFAULT_CHUNK_SIZE
+
+
+@dataclass
+class TuningResult:
+    input_terms: tuple
+    output_terms: tuple
+    weights: np.ndarray
+    loss: float
+    initial_loss: float
+    history: list = field(default_factory=list)
+
+
+"""
+Parameter vector layout.
+    Returns:
+        list: (variable index, term index, offset, size, lower, upper) per tunable term, where variables are the
+        input term sets followed by the output term set and the bounds are the universe range of that variable.
+"""
+
+
+def parameter_layout(variables, universes):
+    layout = []
+    offset = 0
+    for v, (terms, universe) in enumerate(zip(variables, universes)):
+        for t, (_, shape, params) in enumerate(terms):
+            if shape in TUNABLE_SHAPES:
+                layout.append((v, t, offset, len(params), float(np.min(universe)), float(np.max(universe))))
+                offset += len(params)
+    return layout
+
+
+def pack(variables, layout):
+    return np.array([p for v, t, *_ in layout for p in variables[v][t][2]], dtype=float)
+
+
+"""
+Rebuilds the term tuples from parameter vectors.
+    vector may hold a whole population, shape (P, D); each parameter then becomes a (P, 1) column that
+    broadcasts against a batch of readings, so one fuzzify call scores every candidate at once.
+"""
+
+
+def unpack(vector, variables, layout):
+    vector = np.asarray(vector, dtype=float)
+    rebuilt = [list(terms) for terms in variables]
+    for v, t, offset, size, _, _ in layout:
+        label, shape, _ = rebuilt[v][t]
+        params = tuple(vector[..., k, None] if vector.ndim > 1 else vector[k] for k in range(offset, offset + size))
+        rebuilt[v][t] = (label, shape, params)
+    return tuple(tuple(terms) for terms in rebuilt)
+
+
+def bounds(layout, n_weights=0):
+    lower = [lo for *_, size, lo, hi in layout for _ in range(size)] + [0.0] * n_weights
+    upper = [hi for *_, size, lo, hi in layout for _ in range(size)] + [1.0] * n_weights
+    return np.array(lower), np.array(upper)
+
+
+"""
+Clips candidates into bounds and sorts each term's parameters so every candidate is a valid design.
+"""
+
+
+def repair(population, layout, lower, upper):
+    population = np.clip(population, lower, upper)
+    for *_, offset, size, _, _ in layout:
+        population[..., offset:offset + size] = np.sort(population[..., offset:offset + size], axis=-1)
+    return population
+
+
+"""
+Mean squared error of every candidate over the whole dataset.
+    Parameters:
+        population (ndarray): Candidates, shape (P, D) (membership parameters then optional rule weights).
+        readings (ndarray): Inputs, shape (N, 3) with temperature, humidity and CO2 columns.
+        target (ndarray): Desired HVAC level, shape (N,).
+    Returns:
+        ndarray: Loss per candidate, shape (P,).
+"""
+
+
+def score_population(population, readings, target, variables=None, layout=None, rules=hb.HVAC_RULES,
+                     tune_weights=False, chunk_size=DEFAULT_CHUNK_SIZE, operators=ops.ZADEH):
+    variables = (*hb.INPUT_TERMS, hb.HVAC_TERMS) if variables is None else variables
+    layout = parameter_layout(variables, (*hb.INPUT_UNIVERSES, hb.HVAC_UNIVERSE)) if layout is None else layout
+    population = np.atleast_2d(np.asarray(population, dtype=float))
+    n_params = sum(size for *_, size, _, _ in layout)
+    terms = unpack(population[:, :n_params], variables, layout)
+    weights = population[:, None, n_params:] if tune_weights else None
+
+    # (P, 1, T, G): one set of output functions per candidate, shared by all rows.
+    sets = hb.output_sets(hb.HVAC_UNIVERSE, terms[-1])
+    sets = np.broadcast_to(sets, (len(population), *sets.shape[-2:]))[:, None]
+
+    readings = np.asarray(readings, dtype=float)
+    target = np.asarray(target, dtype=float)
+    rows = max(1, chunk_size // len(population))
+    sse = np.zeros(len(population))
+    for start in range(0, len(target), rows):
+        sl = slice(start, start + rows)
+        degrees = [hb.fuzzify(readings[sl, i], terms[i]) for i in range(len(terms) - 1)]
+        strengths = hb.firing_strengths(degrees, rules, operators)
+        crisp = hb.centroid(strengths, sets, hb.HVAC_UNIVERSE, rules, weights, operators)
+        sse += np.sum((crisp - target[sl]) ** 2, axis=-1)
+    return sse / len(target)
+
+
+_worker_args = None
+
+
+def _init_worker(*args):
+    global _worker_args
+    _worker_args = args
+
+
+def _score_slice(population):
+    return score_population(population, *_worker_args)
+
+
+"""
+Differential evolution (DE/best/1/bin) over membership parameters and, optionally, rule weights.
+    The hand-picked design from main.py is always a member of the initial population, so the result is
+    never worse than the starting point. With workers > 1 the population is split across processes (at most
+    one per member); each process keeps its own copy of the dataset and scores its slice in one batched evaluation.
+    Parameters:
+        readings (array-like): Inputs, shape (N, 3) with temperature, humidity and CO2 columns.
+        target (array-like): Desired HVAC level, shape (N,).
+        population_size (int): At least 4, so every member has two donors distinct from each other and itself.
+        tune_weights (bool): Also fit one weight in [0, 1] per rule.
+        seed (int): Seed for reproducible runs.
+    Returns:
+        TuningResult: Best terms, weights and loss.
+"""
+
+
+def tune(readings, target, generations=50, population_size=24, mutation=0.6, crossover=0.3, tune_weights=False,
+         seed=None, workers=1, rules=hb.HVAC_RULES, chunk_size=DEFAULT_CHUNK_SIZE, operators=ops.ZADEH):
+    if population_size < 4:
+        raise ValueError(f"population_size must be at least 4, got {population_size}")
+    workers = min(workers, population_size)  # no process without a slice to score
+    variables = (*hb.INPUT_TERMS, hb.HVAC_TERMS)
+    layout = parameter_layout(variables, (*hb.INPUT_UNIVERSES, hb.HVAC_UNIVERSE))
+    n_weights = len(rules) if tune_weights else 0
+    lower, upper = bounds(layout, n_weights)
+    x0 = np.concatenate([pack(variables, layout), np.ones(n_weights)])
+
+    rng = np.random.default_rng(seed)
+    pop = x0 + rng.normal(scale=0.01, size=(population_size, len(x0))) * (upper - lower)
+    pop[0] = x0
+    pop = repair(pop, layout, lower, upper)
+
+    args = (np.asarray(readings, dtype=float), np.asarray(target, dtype=float), variables, layout, rules,
+            tune_weights, chunk_size, operators)
+    executor = ProcessPoolExecutor(workers, initializer=_init_worker, initargs=args) if workers > 1 else None
+
+    def evaluate(candidates):
+        if executor is None:
+            return score_population(candidates, *args)
+        return np.concatenate(list(executor.map(_score_slice, np.array_split(candidates, workers))))
+
+    try:
+        fitness = evaluate(pop)
+        initial_loss = float(fitness[0])
+        history = [float(fitness.min())]
+        arange = np.arange(population_size)
+        for _ in range(generations):
+            # Two distinct donors per member, none equal to the member itself.
+            keys = rng.random((population_size, population_size))
+            keys[arange, arange] = np.inf
+            r1, r2 = np.argsort(keys, axis=1)[:, :2].T
+            mutant = pop[np.argmin(fitness)] + mutation * (pop[r1] - pop[r2])
+            cross = rng.random(pop.shape) < crossover
+            cross[arange, rng.integers(len(x0), size=population_size)] = True
+            trial = repair(np.where(cross, mutant, pop), layout, lower, upper)
+            trial_fitness = evaluate(trial)
+            better = trial_fitness <= fitness
+            pop[better] = trial[better]
+            fitness[better] = trial_fitness[better]
+            history.append(float(fitness.min()))
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    best = pop[np.argmin(fitness)]
+    n_params = len(x0) - n_weights
+    terms = unpack(best[:n_params], variables, layout)
+    weights = best[n_params:] if tune_weights else np.ones(len(rules))
+    return TuningResult(terms[:-1], terms[-1], weights, float(fitness.min()), initial_loss, history)
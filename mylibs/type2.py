@@ -0,0 +1,176 @@
+# Interval type-2 variant of the main.py controller: upper and lower membership functions per term.
+from dataclasses import dataclass
+
+import numpy as np
+
+import mylibs.hvac_batch as hb
+import mylibs.membership_functions as mf
+import mylibs.operators as ops
+
+# Footprint of uncertainty per input, in input units: temperature °C, humidity %RH, CO2 ppm.
+DEFAULT_SPREADS = (0.5, 3.0, 50.0)
+# Footprint of uncertainty of the HVAC output terms, in %.
+DEFAULT_OUTPUT_SPREAD = 2.5
+
+TYPE_REDUCERS = ("km", "nie_tan")
+
+
+@dataclass
+class IntervalType2Tables:
+    input_upper: tuple  # one term table per input, hb.TEMP_TERMS format
+    input_lower: tuple
+    sets_upper: np.ndarray  # (T, G) over hb.HVAC_UNIVERSE
+    sets_lower: np.ndarray
+    rules: tuple = hb.HVAC_RULES
+
+
+"""
+Upper and lower membership functions of one term, blurred by spread.
+    Slopes move outward (upper) or inward (lower) by spread while the core stays put, so lower <= type-1 <= upper
+    everywhere and spread = 0 gives back the type-1 term.
+"""
+
+
+def blur_term(shape, params, spread):
+    if shape == "tri":
+        a, b, c = params
+        return (a - spread, b, c + spread), (min(a + spread, b), b, max(c - spread, b))
+    if shape == "trap":
+        a, b, c, d = params
+        return (a - spread, b, c, d + spread), (min(a + spread, b), b, c, max(d - spread, c))
+    if shape == "inc":
+        a, b = params
+        return (a - spread, b), (min(a + spread, b), b)
+    if shape == "dec":
+        a, b = params
+        return (a, b + spread), (a, max(b - spread, a))
+    if shape == "gaussian":
+        m, s = params
+        return (m, s + spread), (m, max(s - spread, np.finfo(float).eps))
+    if shape == "sigmoid":
+        a, b = params
+        direction = np.sign(a)
+        return (a, b - direction * spread), (a, b + direction * spread)
+    raise ValueError(f"Unknown shape '{shape}'")
+
+
+def blur_terms(terms, spread):
+    upper, lower = [], []
+    for label, shape, params in terms:
+        up, low = blur_term(shape, params, spread)
+        upper.append((label, shape, up))
+        lower.append((label, shape, low))
+    return tuple(upper), tuple(lower)
+
+
+"""
+Builds the interval type-2 controller from the type-1 design in hvac_batch.
+    Parameters:
+        spreads (tuple): Footprint of uncertainty per input variable.
+        output_spread (float): Footprint of uncertainty of the output terms (0 keeps them type-1).
+    Returns:
+        IntervalType2Tables
+"""
+
+
+def build_tables(spreads=DEFAULT_SPREADS, output_spread=DEFAULT_OUTPUT_SPREAD, rules=hb.HVAC_RULES):
+    blurred = [blur_terms(terms, spread) for terms, spread in zip(hb.INPUT_TERMS, spreads)]
+    out_upper, out_lower = blur_terms(hb.HVAC_TERMS, output_spread)
+    return IntervalType2Tables(
+        tuple(up for up, _ in blurred),
+        tuple(low for _, low in blurred),
+        hb.output_sets(hb.HVAC_UNIVERSE, out_upper),
+        hb.output_sets(hb.HVAC_UNIVERSE, out_lower),
+        rules,
+    )
+
+
+"""
+Lower and upper aggregated output membership (the footprint of the aggregate) for a batch of readings.
+    Returns:
+        tuple: (lower, upper), each of shape (N, G).
+"""
+
+
+def aggregate_interval(tables, in_temp, in_humid, in_co2, operators=ops.ZADEH):
+    bounds = []
+    for input_terms, sets in ((tables.input_lower, tables.sets_lower), (tables.input_upper, tables.sets_upper)):
+        degrees = hb.fuzzify_inputs(in_temp, in_humid, in_co2, input_terms)
+        strengths = hb.firing_strengths(degrees, tables.rules, operators)
+        bounds.append(hb.aggregate(strengths, sets, tables.rules, operators=operators))
+    return tuple(bounds)
+
+
+"""
+Karnik-Mendel type reduction, vectorized over a batch.
+    KM looks for the switch point k where the embedded set changes from upper to lower membership (y_l) or from
+    lower to upper (y_r). Instead of iterating towards k row by row, every switch point is evaluated at once from
+    cumulative sums over the (sorted) universe, so the result is the exact KM / EKM centroid interval in one pass.
+    Parameters:
+        universe (ndarray): Sorted output universe, shape (G,).
+        lower, upper (ndarray): Lower and upper aggregated membership, shape (..., G).
+    Returns:
+        tuple: (y_l, y_r), each of shape (...). Rows where nothing fires return 0.0.
+"""
+
+
+def karnik_mendel(universe, lower, upper):
+    lower = np.asarray(lower, dtype=float)
+    upper = np.asarray(upper, dtype=float)
+    y_l = _switch_point_extreme(universe, upper, lower, np.min)
+    y_r = _switch_point_extreme(universe, lower, upper, np.max)
+    return y_l, y_r
+
+
+def _cumsum_from_zero(values):
+    return np.concatenate([np.zeros((*values.shape[:-1], 1)), np.cumsum(values, axis=-1)], axis=-1)
+
+
+def _switch_point_extreme(universe, first, second, reduce):
+    # Embedded set uses `first` for i <= k and `second` for i > k, for every switch point k in -1..G-1.
+    num = _cumsum_from_zero(first * universe)
+    num += np.sum(second * universe, axis=-1, keepdims=True) - _cumsum_from_zero(second * universe)
+    den = _cumsum_from_zero(first)
+    den += np.sum(second, axis=-1, keepdims=True) - _cumsum_from_zero(second)
+    fill = np.inf if reduce is np.min else -np.inf
+    with np.errstate(divide="ignore", invalid="ignore"):
+        y = np.where(den > 0, num / den, fill)
+    return np.where(np.any(den > 0, axis=-1), reduce(y, axis=-1), 0.0)
+
+
+"""
+Nie-Tan type reduction: centroid of the average of lower and upper membership. Closed form, no switch points.
+"""
+
+
+def nie_tan(universe, lower, upper):
+    return mf.defuzzify_centroid_batch(universe, (np.asarray(lower) + np.asarray(upper)) / 2)
+
+
+"""
+Crisp HVAC level from the interval type-2 controller for a batch of readings.
+    Parameters:
+        reducer (str): "km" (exact Karnik-Mendel, output (y_l + y_r) / 2) or "nie_tan".
+    Returns:
+        ndarray: Crisp HVAC levels, shape (N,).
+"""
+
+
+def hvac_type2_batch(in_temp, in_humid, in_co2, tables=None, reducer="km", operators=ops.ZADEH,
+                     chunk_size=hb.DEFAULT_CHUNK_SIZE):
+    if reducer not in TYPE_REDUCERS:
+        raise ValueError(f"Unknown type reducer '{reducer}', expected one of {TYPE_REDUCERS}")
+    tables = build_tables() if tables is None else tables
+    in_temp, in_humid, in_co2 = np.broadcast_arrays(
+        *(np.atleast_1d(np.asarray(x, dtype=float)) for x in (in_temp, in_humid, in_co2))
+    )
+    out = np.empty(in_temp.shape[0])
+    for start in range(0, out.shape[0], chunk_size):
+        sl = slice(start, start + chunk_size)
+        lower, upper = aggregate_interval(tables, in_temp[sl], in_humid[sl], in_co2[sl], operators)
+        if reducer == "km":
+            y_l, y_r = karnik_mendel(hb.HVAC_UNIVERSE, lower, upper)
+            out[sl] = (y_l + y_r) / 2
+        else:
+            out[sl] = nie_tan(hb.HVAC_UNIVERSE, lower, upper)
+    return out
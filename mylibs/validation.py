@@ -0,0 +1,167 @@
+# Vectorized validation of incoming readings: NaN, out-of-range and stale values are flagged and handled by masks.
+from dataclasses import dataclass
+
+import numpy as np
+
+import mylibs.hvac_batch as hb
+
+""" Reasons (bit flags per value) and actions """
+NAN, OUT_OF_RANGE, STALE = 1, 2, 4
+REASONS = {"nan": NAN, "out_of_range": OUT_OF_RANGE, "stale": STALE}
+ACTIONS = ("clamp", "last_good", "fallback")
+
+"""
+Span of an input's terms: outside it every membership is 0, e.g. humidity above 80 % or CO2 below 400 ppm. The
+    bounds sit in the outer shoulders' cores (b and c of a trapezoid) and are valid readings themselves.
+"""
+
+
+def term_span(terms):
+    _, left_shape, left = min(terms, key=lambda term: term[2][0])
+    _, right_shape, right = max(terms, key=lambda term: term[2][-1])
+    low = left[1] if left_shape == "trap" else left[0]
+    high = right[2] if right_shape == "trap" else right[-1]
+    return float(low), float(high)
+
+
+"""
+Closest points to the bounds of `span` (term_span by default) where a term fires: a bound where every membership
+    is 0 (Cold is trap(18, 18, 20, 22), 0 at 18 °C) steps one float inward, so a reading clamped onto it still
+    fires the nearest shoulder.
+"""
+
+
+def firing_range(terms, span=None):
+    low, high = term_span(terms) if span is None else span
+    if hb.fuzzify(low, terms).max() == 0:
+        low = np.nextafter(low, high)
+    if hb.fuzzify(high, terms).max() == 0:
+        high = np.nextafter(high, low)
+    return float(low), float(high)
+
+
+DEFAULT_RANGES = tuple(term_span(terms) for terms in hb.INPUT_TERMS)
+FIRING_RANGES = tuple(firing_range(terms) for terms in hb.INPUT_TERMS)
+
+
+"""
+How each kind of invalid value is handled.
+    ranges: (low, high) per input (temperature, humidity, CO2), both valid. Values outside are clamped onto the
+        firing_range of the bounds.
+    max_age: readings older than this many seconds are stale.
+    on_nan / on_out_of_range / on_stale: "clamp" to the range, substitute the zone's "last_good" value, or send
+        the whole reading to "fallback", whose output is fallback_output instead of the controller's.
+    A substitution without a last good value also falls back.
+"""
+
+
+@dataclass(frozen=True)
+class ValidationPolicy:
+    ranges: tuple = DEFAULT_RANGES
+    max_age: float = np.inf
+    on_nan: str = "last_good"
+    on_out_of_range: str = "clamp"
+    on_stale: str = "fallback"
+    fallback_output: float = 0.0
+
+    def __post_init__(self):
+        for action in (self.on_nan, self.on_out_of_range, self.on_stale):
+            if action not in ACTIONS:
+                raise ValueError(f"Unknown action '{action}', expected one of {ACTIONS}")
+        if self.on_nan == "clamp":
+            raise ValueError("NaN readings cannot be clamped")
+
+
+"""
+Validated batch.
+    readings: cleaned readings, shape (N, 3).
+    flags: reason bits (NAN | OUT_OF_RANGE | STALE) of every original value, shape (N, 3) uint8.
+    fallback: rows whose output must be the policy's fallback_output, shape (N,).
+"""
+
+
+@dataclass
+class ValidationResult:
+    readings: np.ndarray
+    flags: np.ndarray
+    fallback: np.ndarray
+
+
+"""
+Validation stage with per-zone last good values and per-reason counters.
+    counts holds the number of flagged values per reason ("nan", "out_of_range"), of stale rows ("stale"), and the
+    number of values "clamped" and "substituted" and of rows sent to "fallback", accumulated over all batches.
+"""
+
+
+class InputValidator:
+    __slots__ = ("policy", "clamp_ranges", "last_good", "counts")
+
+    def __init__(self, n_zones, policy=ValidationPolicy()):
+        self.policy = policy
+        self.clamp_ranges = np.array([firing_range(terms, span) for terms, span in zip(hb.INPUT_TERMS, policy.ranges)])
+        self.last_good = np.full((n_zones, 3), np.nan)
+        self.counts = dict.fromkeys((*REASONS, "clamped", "substituted", "fallback"), 0)
+
+    """
+    Flags and handles a batch of readings.
+        Parameters:
+            readings (array-like): shape (N, 3).
+            zones (array-like): Zone index of every row (0 .. n_zones - 1); rows are zones 0 .. N - 1 when None.
+            timestamps (array-like): Time of every reading, checked against now - max_age; None skips the check.
+        Returns:
+            ValidationResult
+    """
+
+    def validate(self, readings, zones=None, timestamps=None, now=None):
+        x = np.array(readings, dtype=float).reshape(-1, 3)
+        zones = np.arange(len(x)) if zones is None else np.asarray(zones)
+        low, high = np.array(self.policy.ranges, dtype=float).T
+
+        nan = np.isnan(x)
+        out_of_range = ~nan & ((x < low) | (x > high))
+        stale = np.zeros_like(nan)
+        if timestamps is not None:
+            age = now - np.asarray(timestamps, dtype=float)
+            stale |= ~(age <= self.policy.max_age)[..., None]  # unknown (NaN) times are stale too
+        flags = (nan * NAN | out_of_range * OUT_OF_RANGE | stale * STALE).astype(np.uint8)
+        self.counts["nan"] += int(np.count_nonzero(nan))
+        self.counts["out_of_range"] += int(np.count_nonzero(out_of_range))
+        self.counts["stale"] += int(np.count_nonzero(stale.any(axis=-1)))
+
+        # Actions in increasing precedence: a NaN that is also stale is handled as NaN.
+        fallback = np.zeros(len(x), dtype=bool)
+        last_good = self.last_good[zones]
+        for mask, action in ((out_of_range, self.policy.on_out_of_range), (stale, self.policy.on_stale),
+                             (nan, self.policy.on_nan)):
+            if action == "clamp":
+                x = np.where(mask, np.clip(x, *self.clamp_ranges.T), x)
+                self.counts["clamped"] += int(np.count_nonzero(mask))
+            elif action == "last_good":
+                x = np.where(mask, last_good, x)
+                self.counts["substituted"] += int(np.count_nonzero(mask & ~np.isnan(last_good)))
+            else:
+                fallback |= mask.any(axis=-1)
+        fallback |= np.isnan(x).any(axis=-1)  # substitution without a last good value
+        self.counts["fallback"] += int(np.count_nonzero(fallback))
+
+        valid = flags == 0
+        rows, cols = np.nonzero(valid)
+        self.last_good[zones[rows], cols] = x[rows, cols]
+        return ValidationResult(x, flags, fallback)
+
+
+"""
+Validation followed by the batch controller: fallback rows get the policy's fallback_output, every other row the
+    crisp HVAC level of its cleaned reading.
+    Returns:
+        tuple: (outputs (N,), ValidationResult).
+"""
+
+
+def hvac_validated(validator, readings, zones=None, timestamps=None, now=None, **kwargs):
+    result = validator.validate(readings, zones, timestamps, now)
+    out = np.full(len(result.readings), float(validator.policy.fallback_output))
+    ok = ~result.fallback
+    out[ok] = hb.hvac_batch(*result.readings[ok].T, **kwargs)
+    return out, result
@@ -0,0 +1,129 @@
+# Fleet zone registry: one NumPy structured array row per zone, updated and inferred in bulk.
+from dataclasses import astuple
+
+import numpy as np
+
+import mylibs.hvac_batch as hb
+from mylibs.output_stage import SmoothingParams, smooth_step
+
+""" Zone Record Layout (57 bytes per zone) """
+ZONE_DTYPE = np.dtype([
+    ("zone_id", "<i8"),
+    # latest readings and when they arrived (NaN: never)
+    ("temp", "<f4"),
+    ("humid", "<f4"),
+    ("co2", "<f4"),
+    ("reading_time", "<f8"),
+    # last inference: crisp level, HVAC category and input category codes (term indices, -1: none yet)
+    ("output", "<f4"),
+    ("category", "i1"),
+    ("temp_category", "i1"),
+    ("humid_category", "i1"),
+    ("co2_category", "i1"),
+    ("output_time", "<f8"),
+    # smoothing state, see output_stage.smooth_step
+    ("value", "<f4"),
+    ("on", "?"),
+    ("switch_time", "<f8"),
+])
+
+
+"""
+Zone registry kept as a structured array sorted by zone id, so a batch of ids is located with one searchsorted.
+    Readings are written in bulk with update(); infer() runs the main.py controller over every stale zone (a
+    reading newer than its last output, or an output older than max_age) and applies the smoothing stage.
+"""
+
+
+class ZoneStore:
+    __slots__ = ("records", "params")
+
+    def __init__(self, zone_ids, params=SmoothingParams()):
+        zone_ids = np.unique(np.asarray(zone_ids, dtype=np.int64))
+        self.records = np.zeros(len(zone_ids), dtype=ZONE_DTYPE)
+        self.records["zone_id"] = zone_ids
+        for name in ("temp", "humid", "co2", "reading_time", "output", "output_time", "value", "switch_time"):
+            self.records[name] = np.nan
+        for name in ("category", "temp_category", "humid_category", "co2_category"):
+            self.records[name] = -1
+        self.params = params
+
+    def __len__(self):
+        return len(self.records)
+
+    @property
+    def nbytes(self):
+        return self.records.nbytes
+
+    """ Row index of every zone id; raises KeyError for ids not in the registry. """
+
+    def index(self, zone_ids):
+        zone_ids = np.asarray(zone_ids, dtype=np.int64)
+        rows = np.searchsorted(self.records["zone_id"], zone_ids)
+        rows = np.minimum(rows, len(self.records) - 1)
+        unknown = self.records["zone_id"][rows] != zone_ids
+        if unknown.any():
+            raise KeyError(f"Unknown zone ids: {zone_ids[unknown][:10].tolist()}")
+        return rows
+
+    """
+    Bulk write of incoming readings. When a zone appears more than once in the batch, its last reading is kept.
+    """
+
+    def update(self, zone_ids, in_temp, in_humid, in_co2, now):
+        rows = self.index(zone_ids)
+        self.records["temp"][rows] = in_temp
+        self.records["humid"][rows] = in_humid
+        self.records["co2"][rows] = in_co2
+        self.records["reading_time"][rows] = now
+
+    """ Row indices of zones with a reading newer than their output, or an output older than max_age seconds. """
+
+    def stale(self, now=None, max_age=None):
+        r = self.records
+        # NaN output_time (never inferred) compares False, so such zones are caught by the ~(<=) form.
+        stale = ~(r["reading_time"] <= r["output_time"]) & ~np.isnan(r["reading_time"])
+        if max_age is not None:
+            stale |= ~(now - r["output_time"] <= max_age) & ~np.isnan(r["reading_time"])
+        return np.flatnonzero(stale)
+
+    """
+    Runs the controller over the stale zones and stores outputs, categories and smoothing state. Each inference
+        is also logged to `audit` (an audit_log.AuditLog) when given.
+        Returns:
+            ndarray: Row indices of the zones that were updated.
+    """
+
+    def infer(self, now, max_age=None, chunk_size=hb.DEFAULT_CHUNK_SIZE, audit=None):
+        rows = self.stale(now, max_age)
+        r = self.records
+        for start in range(0, len(rows), chunk_size):
+            sel = rows[start:start + chunk_size]
+            degrees = hb.fuzzify_inputs(r["temp"][sel], r["humid"][sel], r["co2"][sel])
+            strengths = hb.firing_strengths(degrees)
+            r["output"][sel] = hb.centroid(strengths)
+            r["category"][sel] = hb.height_categories(hb.clip_heights(strengths))
+            for name, d in zip(("temp_category", "humid_category", "co2_category"), degrees):
+                r[name][sel] = np.argmax(d, axis=-1)
+            value, _, switch_time, on = smooth_step(r["value"][sel], r["output_time"][sel], r["switch_time"][sel],
+                                                    r["on"][sel], r["output"][sel], now, self.params)
+            r["value"][sel], r["switch_time"][sel], r["on"][sel] = value, switch_time, on
+            r["output_time"][sel] = now
+            if audit is not None:
+                audit.append(now, r["zone_id"][sel], np.column_stack([r["temp"][sel], r["humid"][sel], r["co2"][sel]]),
+                             strengths, r["output"][sel], r["category"][sel])
+        return rows
+
+    """ Writes the registry (records and smoothing parameters) to a single .npz file. """
+
+    def snapshot(self, path):
+        with open(path, "wb") as f:
+            np.savez(f, records=self.records, params=np.array(astuple(self.params), dtype=float))
+
+    @classmethod
+    def restore(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            store = cls.__new__(cls)
+            store.records = data["records"]
+            store.params = SmoothingParams(*data["params"].tolist())
+        return store
@@ -0,0 +1,124 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+import mylibs.audit_log as al
+import mylibs.hvac_batch as hb
+import mylibs.output_stage as output_stage
+import mylibs.zone_store as zone_store
+
+
+def inference_batch(n, seed):
+    rng = np.random.default_rng(seed)
+    readings = np.column_stack([rng.uniform(18, 30, n), rng.uniform(25, 85, n), rng.uniform(300, 1600, n)])
+    strengths = hb.firing_strengths(hb.fuzzify_inputs(*readings.T))
+    return readings, strengths, hb.centroid(strengths), hb.height_categories(hb.clip_heights(strengths))
+
+
+class TestAuditLog(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "audit.log")
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def write_steps(self, log, steps, zones=50, first_step=0):
+        for t in range(first_step, first_step + steps):
+            log.append(float(t), np.arange(zones), *inference_batch(zones, t))
+
+    def test_records_round_trip(self):
+        readings, strengths, outputs, categories = inference_batch(300, 0)
+        with al.AuditLog(self.path, block_rows=64) as log:
+            log.append(12.5, np.arange(300) + 1000, readings, strengths, outputs, categories)
+        records = al.AuditReader(self.path).query()
+        self.assertEqual(al.AUDIT_DTYPE.itemsize, 61)
+        np.testing.assert_array_equal(records["zone"], np.arange(300) + 1000)
+        np.testing.assert_array_equal(records["time"], 12.5)
+        np.testing.assert_array_equal(records["co2"], readings[:, 2].astype(np.float32))
+        np.testing.assert_array_equal(records["strengths"], strengths.astype(np.float32))
+        np.testing.assert_array_equal(records["output"], outputs.astype(np.float32))
+        np.testing.assert_array_equal(records["category"], categories)
+
+    def test_zone_and_time_queries_match_a_full_scan(self):
+        with al.AuditLog(self.path, block_rows=128) as log:
+            self.write_steps(log, 40)
+        reader = al.AuditReader(self.path)
+        everything = reader.query()
+        self.assertEqual(len(everything), len(reader))
+        self.assertEqual(len(everything), 40 * 50)
+        for zones, start, end in ((7, 10, 20), ([3, 4, 49], None, 5), (None, 35, None), (99, None, None)):
+            expected = everything[(everything["time"] >= (start if start is not None else -np.inf))
+                                  & (everything["time"] < (end if end is not None else np.inf))]
+            if zones is not None:
+                expected = expected[np.isin(expected["zone"], zones)]
+            np.testing.assert_array_equal(reader.query(zones, start, end), expected)
+        # The index only selects the blocks overlapping the time range.
+        candidates = (reader.index["t_max"] >= 35) & (reader.index["first"] >= 0)
+        self.assertLessEqual(candidates.sum(), len(reader.index) // 5)
+
+    def test_ring_buffer_bounds_the_file_and_keeps_the_latest_records(self):
+        with al.AuditLog(self.path, capacity=1000, block_rows=100) as log:
+            self.write_steps(log, 30, zones=70)  # 2100 records
+        self.assertEqual(os.path.getsize(self.path), al.HEADER_BYTES + 1000 * al.AUDIT_DTYPE.itemsize)
+        records = al.AuditReader(self.path).query()
+        self.assertGreaterEqual(len(records), 1000 - 100)
+        self.assertEqual(records["time"][-1], 29)
+        # Retained records are the most recent ones, in order.
+        seq = np.arange(2100)[-len(records):]
+        np.testing.assert_array_equal(records["zone"], seq % 70)
+        np.testing.assert_array_equal(records["time"], seq // 70)
+        # A batch larger than the ring keeps its tail.
+        with al.AuditLog(self.path) as log:
+            log.append(100.0, np.arange(2500), *inference_batch(2500, 1))
+        records = al.AuditReader(self.path).query()
+        np.testing.assert_array_equal(records["zone"], np.arange(2500)[-len(records):])
+
+    def test_first_write_overflowing_the_ring(self):
+        for capacity, block_rows, rows in ((120, 30, 220), (100, 100, 5000), (1000, 64, 1001)):
+            with al.AuditLog(self.path, capacity=capacity, block_rows=block_rows) as log:
+                log.append(1.0, np.arange(rows), *inference_batch(rows, 2))
+            records = al.AuditReader(self.path).query()
+            self.assertGreater(len(records), 0)
+            np.testing.assert_array_equal(records["zone"], np.arange(rows)[-len(records):])
+            os.remove(self.path)
+            os.remove(self.path + ".idx")
+
+    def test_reopen_appends_and_background_matches_synchronous(self):
+        with al.AuditLog(self.path, block_rows=32, background=False) as log:
+            self.write_steps(log, 5)
+        with al.AuditLog(self.path, block_rows=999) as log:  # the file's block size wins
+            self.assertEqual(log.block_rows, 32)
+            self.write_steps(log, 5, first_step=5)
+        other = os.path.join(self.dir.name, "other.log")
+        with al.AuditLog(other, block_rows=32) as log:
+            self.write_steps(log, 10)
+        np.testing.assert_array_equal(al.AuditReader(self.path).query(), al.AuditReader(other).query())
+        with open(self.path, "rb") as a, open(other, "rb") as b:
+            self.assertEqual(a.read(), b.read())
+
+    def test_zone_store_logs_its_inferences(self):
+        params = output_stage.SmoothingParams(tau=0, max_slew=np.inf, min_on=0, min_off=0)
+        store = zone_store.ZoneStore([4, 8, 15], params)
+        store.update([4, 8, 15], [21, 24, 28], [40, 55, 75], [500, 1400, 900], now=0)
+        with al.AuditLog(self.path) as log:
+            store.infer(now=60, audit=log)
+            log.flush()
+            records = al.AuditReader(self.path).query(zones=8)
+        self.assertEqual(len(records), 1)
+        self.assertEqual(records["time"][0], 60)
+        self.assertAlmostEqual(records["output"][0], store.records["output"][1], places=5)
+        self.assertEqual(records["category"][0], store.records["category"][1])
+
+    def test_rejects_other_files(self):
+        with open(self.path, "wb") as f:
+            f.write(b"\0" * 128)
+        with self.assertRaises(ValueError):
+            al.AuditReader(self.path)
+
+
+if __name__ == "__main__":
+    unittest.main()
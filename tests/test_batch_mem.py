@@ -0,0 +1,80 @@
+import unittest
+
+import numpy as np
+
+import mylibs.membership_functions as mf
+
+
+class TestBatchMembershipFunctions(unittest.TestCase):
+
+    def setUp(self):
+        # Grid that hits every breakpoint plus points outside the supports.
+        self.xs = np.concatenate([np.linspace(-5, 35, 401), [10, 15, 20, 25, 30]])
+
+    def assert_matches_scalar(self, batch, scalar, *params):
+        expected = np.array([scalar(x, *params) for x in self.xs], dtype=float)
+        np.testing.assert_allclose(batch(self.xs, *params), expected)
+
+    def test_inc_matches_scalar(self):
+        self.assert_matches_scalar(mf.inc_batch, mf.inc, 10, 20)
+        self.assert_matches_scalar(mf.inc_batch, mf.inc, 10, 10)
+
+    def test_dec_matches_scalar(self):
+        self.assert_matches_scalar(mf.dec_batch, mf.dec, 10, 20)
+
+    def test_tri_matches_scalar(self):
+        self.assert_matches_scalar(mf.tri_batch, mf.tri, 10, 15, 25)
+        self.assert_matches_scalar(mf.tri_batch, mf.tri, 10, 10, 25)
+        self.assert_matches_scalar(mf.tri_batch, mf.tri, 10, 25, 25)
+
+    def test_trap_matches_scalar(self):
+        self.assert_matches_scalar(mf.trap_batch, mf.trap, 10, 15, 20, 25)
+        self.assert_matches_scalar(mf.trap_batch, mf.trap, 10, 10, 20, 25)
+        self.assert_matches_scalar(mf.trap_batch, mf.trap, 10, 15, 30, 30)
+
+    def test_nested_where_kernels_match_np_select(self):
+        # inc_batch / tri_batch branch with nested np.where; np.select is the reference formulation.
+        xs = np.concatenate([self.xs, [np.nan, np.inf, -np.inf]])
+        with np.errstate(divide="ignore", invalid="ignore"):
+            for a, b in ((10, 20), (10, 10)):
+                expected = np.select([xs <= a, xs >= b], [0.0, 1.0], default=(xs - a) / (b - a))
+                np.testing.assert_array_equal(mf.inc_batch(xs, a, b), expected)
+            for a, b, c in ((10, 15, 25), (10, 10, 25), (10, 25, 25), (10, 10, 10)):
+                expected = np.select([xs <= a, (a <= xs) & (xs <= b), (b <= xs) & (xs <= c)],
+                                     [0.0, (xs - a) / (b - a), (c - xs) / (c - b)], default=0.0)
+                np.testing.assert_array_equal(mf.tri_batch(xs, a, b, c), expected)
+
+    def test_nan_follows_scalar_branches(self):
+        self.assertEqual(mf.tri_batch(np.array([np.nan]), 10, 15, 25)[0], 0)
+        self.assertTrue(np.isnan(mf.trap_batch(np.array([np.nan]), 10, 15, 20, 25)[0]))
+
+    def test_parameters_broadcast_over_population(self):
+        a = np.array([[10.0], [12.0]])
+        result = mf.tri_batch(self.xs, a, 15, 25)
+        self.assertEqual(result.shape, (2, len(self.xs)))
+        np.testing.assert_allclose(result[1], mf.tri_batch(self.xs, 12, 15, 25))
+
+
+class TestCentroidBatch(unittest.TestCase):
+
+    def test_matches_scalar_centroid(self):
+        universe = np.linspace(0, 100, 400)
+        aggregated = np.random.default_rng(0).random((5, 400))
+        expected = [mf.defuzzify_centroid(universe, row) for row in aggregated]
+        np.testing.assert_allclose(mf.defuzzify_centroid_batch(universe, aggregated), expected)
+
+    def test_returns_zero_when_nothing_fires(self):
+        universe = np.linspace(0, 100, 400)
+        result = mf.defuzzify_centroid_batch(universe, np.zeros((3, 400)))
+        np.testing.assert_array_equal(result, np.zeros(3))
+
+    def test_trap_matches_scalar(self):
+        universe = np.linspace(0, 100, 400)
+        aggregated = np.random.default_rng(0).random((5, 400))
+        aggregated[0] = 0
+        expected = [mf.defuzzify_trap(universe, row) for row in aggregated]
+        np.testing.assert_allclose(mf.defuzzify_trap_batch(universe, aggregated), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
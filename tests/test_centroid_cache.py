@@ -0,0 +1,80 @@
+import unittest
+
+import numpy as np
+
+import mylibs.centroid_cache as cc
+import mylibs.hvac_batch as hb
+
+
+def random_strengths(n, seed=0):
+    readings = np.random.default_rng(seed).uniform([18, 25, 300], [30, 85, 1600], (n, 3))
+    return hb.firing_strengths(hb.fuzzify_inputs(*readings.T))
+
+
+class TestCentroidCache(unittest.TestCase):
+
+    def test_keys_round_trip_on_the_grid(self):
+        cache = cc.CentroidCache(levels=8)
+        grid = np.square(np.array([[0, 1, 3, 7], [7, 0, 0, 2]]) / 7)
+        np.testing.assert_allclose(cache.heights(cache.keys(grid)), grid)
+        # Firing terms never quantize to "not firing".
+        np.testing.assert_allclose(cache.heights(cache.keys(np.array([1e-9, 0, 0, 0])))[0], 1 / 49)
+
+    def test_lookup_fills_then_hits(self):
+        cache = cc.CentroidCache()
+        heights = hb.clip_heights(random_strengths(2000))
+        first = cache.lookup(heights)
+        np.testing.assert_array_equal(first, hb.height_centroid(cache.heights(cache.keys(heights))))
+        self.assertEqual(cache.hits + cache.misses, 2000)
+        self.assertEqual(len(cache), len(np.unique(cache.keys(heights))))
+        self.assertGreater(cache.hits, 0)  # readings sharing a key within the batch
+        misses = cache.misses
+        np.testing.assert_array_equal(cache.lookup(heights), first)
+        self.assertEqual(cache.misses, misses)
+        self.assertEqual(cache.hits + cache.misses, 4000)
+        self.assertEqual(cache.lookup(np.zeros((3, 4))).tolist(), [0.0, 0.0, 0.0])
+
+    def test_quantization_error_is_small(self):
+        strengths = random_strengths(20000, seed=1)
+        cache = cc.CentroidCache()
+        cached = cache.centroid(strengths)
+        error = np.abs(cached - hb.centroid(strengths))
+        self.assertLess(error.mean(), 0.1)
+        self.assertLess(np.percentile(error, 99.9), 1.5)
+        self.assertLess(error.max(), 2.5)
+        self.assertGreater(cache.hit_rate, 0.7)
+        counters = cache.stats()
+        np.testing.assert_allclose(cache.quantization_error(hb.clip_heights(strengths)), error, atol=1e-9)
+        self.assertEqual(cache.stats(), counters)
+        # More levels, less error.
+        finer = cc.CentroidCache(levels=64, max_entries=1 << 25)
+        self.assertLess(finer.quantization_error(hb.clip_heights(strengths)).mean(), error.mean())
+
+    def test_non_finite_heights_give_nan_without_counting(self):
+        cache = cc.CentroidCache()
+        heights = np.array([[0.2, 0.5, 0, 0], [np.nan, 0.5, 0, 0], [0.2, np.inf, 0, 0]])
+        self.assertEqual(cache.keys(heights)[1:].tolist(), [-1, -1])
+        out = cache.lookup(heights)
+        self.assertFalse(np.isnan(out[0]))
+        self.assertTrue(np.isnan(out[1:]).all())
+        self.assertEqual((cache.hits, cache.misses), (0, 1))
+        self.assertTrue(np.isnan(cache.quantization_error(heights)[1:]).all())
+        strengths = random_strengths(3)
+        strengths[1, 0] = np.nan
+        self.assertTrue(np.isnan(hb.centroid(strengths)[1]))
+        self.assertTrue(np.isnan(cache.centroid(strengths)[1]))
+
+    def test_weights(self):
+        strengths = random_strengths(500, seed=2)
+        weights = [1, 1, 0.5, 1, 1, 0.8, 1]
+        cache = cc.CentroidCache(levels=64, max_entries=1 << 25)
+        np.testing.assert_allclose(cache.centroid(strengths, weights=weights),
+                                   hb.centroid(strengths, weights=weights), atol=3)
+
+    def test_table_size_limit(self):
+        with self.assertRaises(ValueError):
+            cc.CentroidCache(levels=256)
+
+
+if __name__ == "__main__":
+    unittest.main()
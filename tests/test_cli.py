@@ -0,0 +1,121 @@
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import numpy as np
+
+import main as app
+import mylibs.audit_log as al
+import mylibs.hvac_batch as hb
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+READINGS = [(21.5, 55, 600), (28, 75, 1300), (19, 50, 450), (26, 62, 1050), (23.5, 52.5, 800)]
+
+
+def csv_input(header=True):
+    lines = ["temp,humid,co2\n"] if header else []
+    return io.StringIO("".join(lines + [f"{t},{h},{c}\n" for t, h, c in READINGS]))
+
+
+class TestBatchCli(unittest.TestCase):
+
+    def test_parse_csv_with_and_without_header(self):
+        for header in (True, False):
+            np.testing.assert_array_equal(app.parse_lines(csv_input(header).readlines()), READINGS)
+
+    def test_parse_json_lines(self):
+        lines = [json.dumps({"temp": t, "humid": h, "co2": c}) + "\n" for t, h, c in READINGS[:2]]
+        lines += [json.dumps(list(r)) + "\n" for r in READINGS[2:]]
+        np.testing.assert_array_equal(app.parse_lines(lines), READINGS)
+
+    def test_csv_output_matches_batch_controller(self):
+        out = io.StringIO()
+        rows, _ = app.run_batch(csv_input(), out, block_size=2)
+        self.assertEqual(rows, len(READINGS))
+        lines = out.getvalue().splitlines()
+        self.assertEqual(lines[0], "temp,humid,co2,hvac,category")
+        levels = [float(line.split(",")[3]) for line in lines[1:]]
+        np.testing.assert_allclose(levels, hb.hvac_batch(*np.array(READINGS).T), atol=1e-4)
+
+    def test_jsonl_output_and_workers(self):
+        serial, parallel = io.StringIO(), io.StringIO()
+        app.run_batch(csv_input(), serial, fmt="jsonl", block_size=2)
+        app.run_batch(csv_input(), parallel, fmt="jsonl", workers=2, block_size=2)
+        self.assertEqual(serial.getvalue(), parallel.getvalue())
+        first = json.loads(serial.getvalue().splitlines()[0])
+        self.assertEqual(first["category"], "Low")
+
+    def test_jsonl_output_is_strict_json(self):
+        out = io.StringIO()
+        app.run_batch(io.StringIO("nan,55,600\n21.5,55,inf\n"), out, fmt="jsonl")
+
+        def reject(token):
+            raise ValueError(f"non-JSON token {token}")
+
+        rows = [json.loads(line, parse_constant=reject) for line in out.getvalue().splitlines()]
+        self.assertIsNone(rows[0]["temp"])
+        self.assertIsNone(rows[1]["co2"])
+
+    def test_header_is_skipped_once_per_stream(self):
+        # Only the stream's first line may be a header; a non-numeric line at the start of a later block is an
+        # error, not a silently dropped reading.
+        text = "\ntemp,humid,co2\n" + "".join(f"{t},{h},{c}\n" for t, h, c in READINGS[:2])
+        out = io.StringIO()
+        self.assertEqual(app.run_batch(io.StringIO(text), out, block_size=2)[0], 2)
+        with self.assertRaises(ValueError):
+            app.run_batch(io.StringIO(text + "temp,humid,co2\n21.5,55,600\n"), io.StringIO(), block_size=2)
+        np.testing.assert_array_equal(app.parse_lines(csv_input(False).readlines(), skip_header=False), READINGS)
+
+    def test_batch_inferences_are_audited(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            for workers in (1, 2):
+                path = os.path.join(tmp, f"audit{workers}.log")
+                with al.AuditLog(path) as log:
+                    app.run_batch(csv_input(), io.StringIO(), workers=workers, block_size=2, audit=log, zone=7)
+                records = al.AuditReader(path).query(zones=7)
+                _, levels, categories = app.infer_block(READINGS)
+                np.testing.assert_array_equal(records["temp"], np.float32([t for t, _, _ in READINGS]))
+                np.testing.assert_allclose(records["output"], levels, atol=1e-4)
+                np.testing.assert_array_equal(records["category"], categories)
+                np.testing.assert_allclose(records["strengths"], hb.firing_strengths(
+                    hb.fuzzify_inputs(*np.array(READINGS).T)), atol=1e-6)
+            # And from the command line.
+            path = os.path.join(tmp, "cli.log")
+            subprocess.run([sys.executable, "main.py", "--input", "-", "--audit-log", path, "--zone", "3"], cwd=ROOT,
+                           input=csv_input().getvalue(), capture_output=True, text=True, check=True)
+            self.assertEqual(len(al.AuditReader(path).query(zones=3)), len(READINGS))
+
+    def test_trap_defuzzifier(self):
+        _, levels, _ = app.infer_block(READINGS, defuzzifier="trap")
+        aggregated = hb.evaluate_rules_batch(*np.array(READINGS).T)
+        expected = [app.mf.defuzzify_trap(hb.HVAC_UNIVERSE, r) for r in aggregated]
+        np.testing.assert_allclose(levels, expected)
+
+    def test_stdin_and_summary_line(self):
+        proc = subprocess.run([sys.executable, "main.py", "--input", "-", "--format", "jsonl"], cwd=ROOT,
+                              input=csv_input().getvalue(), capture_output=True, text=True, check=True)
+        self.assertEqual(len(proc.stdout.splitlines()), len(READINGS))
+        self.assertIn(f"Processed {len(READINGS)} readings", proc.stderr)
+
+    def test_single_reading_form(self):
+        proc = subprocess.run([sys.executable, "main.py", "21.5", "55", "600", "--no-plot"], cwd=ROOT,
+                              capture_output=True, text=True, check=True, env={**os.environ, "MPLBACKEND": "Agg"})
+        self.assertIn("Received arguments: 21.5, 55, 600", proc.stdout)
+        self.assertIn("Recommended HVAC Level: 25.00 % (Low)", proc.stdout)
+
+    def test_wrong_argument_count_exits(self):
+        proc = subprocess.run([sys.executable, "main.py", "21.5", "55"], cwd=ROOT, capture_output=True, text=True)
+        self.assertEqual(proc.returncode, 1)
+        self.assertIn("Usage:", proc.stdout)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,159 @@
+import contextlib
+import socket
+import threading
+import unittest
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import numpy as np
+
+import main as app
+import mylibs.cluster as cluster
+
+
+def start_thread_worker(infer=app.infer_block, address=("127.0.0.1", 0)):
+    server = cluster.WorkerServer(address, infer)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def drop_connection(link):
+    with contextlib.suppress(OSError):
+        link.sock.shutdown(socket.SHUT_RDWR)
+
+
+def random_readings(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return np.column_stack([rng.uniform(16, 32, n), rng.uniform(20, 90, n), rng.uniform(250, 1700, n)])
+
+
+class TestCluster(unittest.TestCase):
+
+    def setUp(self):
+        self.servers = [start_thread_worker() for _ in range(3)]
+        self.addresses = [s.server_address for s in self.servers]
+
+    def tearDown(self):
+        for server in self.servers:
+            server.shutdown()
+            server.server_close()
+
+    def test_protocol_round_trip(self):
+        a, b = socket.socketpair()
+        with a, b:
+            zones, readings = cluster.encode_readings([3, 9], random_readings(2))
+            cluster.send_message(a, cluster.READINGS, 42, zones, readings, flags=1)
+            kind, flags, request_id, payload = cluster.recv_message(b)
+            self.assertEqual((kind, flags, request_id, len(payload)), (cluster.READINGS, 1, 42, 2 * 32))
+            got_zones, got_readings = cluster.decode_readings(payload)
+            np.testing.assert_array_equal(got_zones, [3, 9])
+            np.testing.assert_array_equal(got_readings, readings)
+
+    def test_results_match_infer_block_in_input_order(self):
+        readings = random_readings(5000)
+        zones = np.random.default_rng(1).integers(0, 400, len(readings))
+        _, levels, categories = app.infer_block(readings)
+        with cluster.Coordinator(self.addresses, batch_rows=300, max_in_flight=2) as coordinator:
+            got_levels, got_categories = coordinator.infer(zones, readings)
+            np.testing.assert_allclose(got_levels, levels, rtol=0, atol=1e-9)
+            np.testing.assert_array_equal(got_categories, categories)
+            # Every worker got a share, in messages of at most batch_rows readings.
+            self.assertTrue(all(link.rows > 0 for link in coordinator.links))
+            self.assertGreaterEqual(coordinator.stats["messages"], len(readings) // 300)
+            _, trap, _ = app.infer_block(readings[:100], "trap")
+        with cluster.Coordinator(self.addresses, defuzzifier="trap") as coordinator:
+            np.testing.assert_allclose(coordinator.infer(zones[:100], readings[:100])[0], trap, rtol=0, atol=1e-9)
+
+    def test_zones_are_sharded_evenly_and_stably(self):
+        with cluster.Coordinator(self.addresses, n_shards=64) as coordinator:
+            owned = coordinator.assignment(np.arange(6400))
+            self.assertEqual(sorted(len(z) for z in owned.values()), [2100, 2100, 2200])
+            self.assertEqual(len(np.unique(np.concatenate(list(owned.values())))), 6400)
+            # A zone always belongs to the same worker.
+            again = coordinator.assignment(np.arange(6400))
+            for address in owned:
+                np.testing.assert_array_equal(owned[address], again[address])
+
+    def test_dropped_worker_is_rebalanced_and_its_rows_resent(self):
+        readings = random_readings(3000, seed=2)
+        zones = np.arange(len(readings))
+        _, levels, _ = app.infer_block(readings)
+        with cluster.Coordinator(self.addresses, batch_rows=200, timeout=5) as coordinator:
+            before = coordinator.assignment(zones)
+            self.servers[1].shutdown()
+            self.servers[1].server_close()
+            drop_connection(coordinator.links[1])  # as if the worker host went away
+            np.testing.assert_allclose(coordinator.infer(zones, readings)[0], levels, rtol=0, atol=1e-9)
+            self.assertEqual(coordinator.stats["dropped"], 1)
+            self.assertGreater(coordinator.stats["resent_rows"], 0)
+            after = coordinator.assignment(zones)
+            self.assertNotIn(self.addresses[1], after)
+            self.assertEqual([len(z) for z in coordinator.assignment(np.arange(6400)).values()], [3200, 3200])
+            # Zones of the surviving workers stay where they were.
+            for address in after:
+                self.assertTrue(np.isin(before[address], after[address]).all())
+
+            # The worker comes back on the same address and rejoins at the next health check.
+            self.servers[1] = start_thread_worker(address=self.addresses[1])
+            health = coordinator.health_check()
+            self.assertTrue(all(latency is not None for latency in health.values()))
+            self.assertEqual(coordinator.stats["rejoined"], 1)
+            self.assertEqual(len(coordinator.assignment(zones)), 3)
+            np.testing.assert_allclose(coordinator.infer(zones, readings)[0], levels, rtol=0, atol=1e-9)
+
+    def test_health_check_reports_silent_workers(self):
+        with cluster.Coordinator(self.addresses) as coordinator:
+            self.servers[0].shutdown()
+            self.servers[0].server_close()
+            drop_connection(coordinator.links[0])
+            health = coordinator.health_check()
+            self.assertIsNone(health[self.addresses[0]])
+            self.assertEqual(len(coordinator.live), 2)
+            for address in self.addresses[1:]:
+                self.assertIsNotNone(health[address])
+            self.servers[0] = start_thread_worker()  # keeps tearDown simple
+
+    def test_worker_errors_are_raised(self):
+        failed = threading.Event()
+
+        def fails_once(readings, defuzzifier):
+            if not failed.is_set():
+                failed.set()
+                raise ValueError("bad batch")
+            return app.infer_block(readings, defuzzifier)
+
+        server = start_thread_worker(fails_once)
+        try:
+            with cluster.Coordinator([server.server_address, self.addresses[0]], batch_rows=200) as coordinator:
+                with self.assertRaisesRegex(RuntimeError, "bad batch"):
+                    coordinator.infer(np.arange(40000), random_readings(40000))
+                # Nothing of the failed batch is left queued or in flight for the next call.
+                self.assertTrue(all(not link.queue and not link.pending for link in coordinator.links))
+                self.assertEqual(len(coordinator.live), 2)
+                readings = random_readings(10, seed=4)
+                np.testing.assert_allclose(coordinator.infer(np.arange(10), readings)[0],
+                                           app.infer_block(readings)[1], rtol=0, atol=1e-9)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def test_local_worker_processes(self):
+        processes, addresses = cluster.start_local_workers(2, app.infer_block)
+        try:
+            readings = random_readings(1000, seed=3)
+            with cluster.Coordinator(addresses) as coordinator:
+                np.testing.assert_allclose(coordinator.infer(np.arange(1000), readings)[0],
+                                           app.infer_block(readings)[1], rtol=0, atol=1e-9)
+                coordinator.shutdown_workers()
+            for p in processes:
+                p.join(timeout=10)
+                self.assertFalse(p.is_alive())
+        finally:
+            for p in processes:
+                p.kill()
+
+
+if __name__ == "__main__":
+    unittest.main()
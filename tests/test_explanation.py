@@ -0,0 +1,87 @@
+import unittest
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import numpy as np
+from matplotlib import pyplot as plt
+
+import main as app
+import mylibs.explanation as ex
+import mylibs.hvac_batch as hb
+import mylibs.membership_functions as mf
+import mylibs.operators as ops
+
+READINGS = np.array([
+    [21.5, 55, 600],
+    [19, 50, 450],
+    [28, 75, 1300],
+    [23.5, 52.5, 800],
+    [26, 62, 1050],
+])
+
+
+class TestHvacResult(unittest.TestCase):
+
+    def test_slots_only(self):
+        result = ex.explain(21.5, 55, 600)
+        self.assertFalse(hasattr(result, "__dict__"))
+
+    def test_matches_main_controller(self):
+        batch = ex.explain(*READINGS.T)
+        for i, row in enumerate(READINGS):
+            app.fuzzify_temp(row[0])
+            app.fuzzify_humid(row[1])
+            app.fuzzify_co2(row[2])
+            r = app.evaluate_rules()
+            self.assertAlmostEqual(float(batch[i]), mf.defuzzify_centroid(app.hvac, r))
+            hvac = {"Off": app.off_hvac, "Low": app.low_hvac, "Medium": app.medium_hvac, "High": app.high_hvac}
+            memberships = {k: np.max(np.minimum(r, s)) for k, s in hvac.items()}
+            self.assertEqual(batch.hvac_category[i], max(memberships, key=memberships.get))
+            temp = {"Cold": app.in_cold_temp, "Comfortable": app.in_comfortable_temp, "Warm": app.in_warm_temp}
+            self.assertEqual(batch.input_categories[0][i], max(temp, key=temp.get))
+
+    def test_aggregate_is_lazy_for_batches(self):
+        batch = ex.explain(*READINGS.T)
+        self.assertIsNone(batch._aggregated)
+        batch.hvac_category
+        self.assertEqual(batch._aggregated.shape, (len(READINGS), len(hb.HVAC_UNIVERSE)))
+
+    def test_degrees_by_label(self):
+        temp, humid, co2 = ex.explain(21.5, 55, 600).degrees
+        self.assertAlmostEqual(float(temp["Cold"]), 0.25)
+        self.assertAlmostEqual(float(humid["Normal"]), 0.8)
+        self.assertEqual(list(co2), ["Low", "Medium", "High"])
+
+    def test_rule_trace(self):
+        trace = ex.explain(21.5, 55, 600).rule_trace
+        self.assertEqual(len(trace), len(hb.HVAC_RULES))
+        self.assertEqual(trace[2], "Rule 3: Temperature is Cold AND Humidity is Normal -> HVAC is Low (0.25)")
+        with self.assertRaises(ValueError):
+            ex.explain(*READINGS.T).rule_trace
+
+    def test_summary_text(self):
+        text = str(ex.explain(21.5, 55, 600))
+        self.assertIn("Temperature Category: Comfortable (μ=0.43)", text)
+        self.assertTrue(text.endswith("Recommended HVAC Level: 25.00 % (Low)"))
+        self.assertEqual(str(ex.explain(*READINGS.T)).count("Input Summary:"), len(READINGS))
+
+    def test_closed_form_operators(self):
+        result = ex.explain(*READINGS.T, operators=ops.LARSEN_SUM)
+        np.testing.assert_allclose(result.output, hb.hvac_batch(*READINGS.T, operators=ops.LARSEN_SUM))
+
+    def test_app_quiet_mode(self):
+        result = app.hvac_control_app(21.5, 55, 600, verbose=False, plot=False)
+        self.assertAlmostEqual(float(result), 25.0, places=2)
+
+    def test_plot_title_names_the_defuzzifier(self):
+        self.addCleanup(plt.close, "all")
+        for defuzzifier, method in (("centroid", "Centroid"), ("trap", "Trap")):
+            app.hvac_control_app(21.5, 55, 600, verbose=False, defuzzifier=defuzzifier)
+            self.assertEqual(plt.figure(1).axes[-1].get_title(), f"Defuzzification using {method} Method")
+            plt.close("all")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+import mylibs.fixed_point as fp
+import mylibs.hvac_batch as hb
+
+
+class TestFixedPoint(unittest.TestCase):
+
+    def test_tables_use_requested_integer_type(self):
+        for dtype in (np.uint8, np.uint16):
+            tables = fp.compile_tables(dtype, input_steps=(16, 16, 16))
+            self.assertTrue(all(lut.dtype == dtype for lut in tables.input_luts))
+            self.assertEqual(tables.output_sets.dtype, dtype)
+            self.assertEqual(tables.output_sets.max(), np.iinfo(dtype).max)
+
+    def test_inference_stays_integer(self):
+        tables = fp.compile_tables(np.uint8)
+        codes = fp.quantize_inputs(tables, [23.5, 28], [55, 75], [450, 1400])
+        numerator, denominator, code = fp.infer_fixed(tables, codes)
+        for result in (numerator, denominator, code):
+            self.assertTrue(np.issubdtype(result.dtype, np.integer))
+
+    def test_no_firing_returns_zero(self):
+        tables = fp.compile_tables(np.uint8)
+        codes = fp.quantize_inputs(tables, 19, 35, 1000)
+        _, denominator, code = fp.infer_fixed(tables, codes)
+        self.assertEqual(denominator, 0)
+        self.assertEqual(code, 0)
+        self.assertEqual(hb.hvac_batch(19, 35, 1000)[0], 0)
+
+    def test_quantize_clamps_to_universe(self):
+        tables = fp.compile_tables(np.uint8)
+        codes = fp.quantize_inputs(tables, [10, 40], [0, 100], [0, 5000])
+        np.testing.assert_array_equal(codes, [[0, 0, 0], [255, 255, 255]])
+
+    def test_validation_report_bounds_deviation(self):
+        coarse = fp.validation_report(fp.compile_tables(np.uint8, input_steps=(20, 20, 20)))
+        fine = fp.validation_report(fp.compile_tables(np.uint16, input_steps=(20, 20, 20)))
+        self.assertEqual(coarse.points, 8000)
+        self.assertLess(coarse.max_abs_deviation, 1.0)
+        self.assertLess(fine.max_abs_deviation, coarse.max_abs_deviation)
+        self.assertLess(fine.max_abs_deviation, 0.05)
+        self.assertLessEqual(fine.mean_abs_deviation, fine.max_abs_deviation)
+
+    def test_save_tables_round_trip(self):
+        tables = fp.compile_tables(np.uint16, input_steps=(8, 8, 8))
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "tables.npz")
+            fp.save_tables(tables, path)
+            with np.load(path) as saved:
+                np.testing.assert_array_equal(saved["input_0"], tables.input_luts[0])
+                np.testing.assert_array_equal(saved["output_sets"], tables.output_sets)
+                self.assertEqual(saved["rules"].shape, (len(hb.HVAC_RULES), 4))
+
+
+if __name__ == "__main__":
+    unittest.main()
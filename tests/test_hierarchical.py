@@ -0,0 +1,48 @@
+import unittest
+
+import numpy as np
+
+import mylibs.hierarchical as hc
+import mylibs.hvac_batch as hb
+import mylibs.operators as ops
+
+
+class TestHierarchical(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(9)
+        n = 500
+        self.readings = {
+            "temp": rng.uniform(18, 30, n),
+            "humid": rng.uniform(25, 85, n),
+            "co2": rng.uniform(300, 1600, n),
+            "occupancy": rng.uniform(0, 100, n),
+            "outdoor": rng.uniform(-10, 40, n),
+            "time": rng.uniform(0, 24, n),
+        }
+
+    def test_flat_baseline_reproduces_main_controller(self):
+        expected = hb.hvac_batch(self.readings["temp"], self.readings["humid"], self.readings["co2"])
+        np.testing.assert_allclose(hc.infer(hc.FLAT_HVAC, self.readings, chunk_size=128), expected)
+
+    def test_rule_count_grows_linearly(self):
+        self.assertEqual(hc.FLAT_HVAC.rule_count, 7)
+        self.assertEqual(hc.SIX_INPUT_HVAC.rule_count, 9 + 9 + 9 + 18)
+        self.assertLess(hc.SIX_INPUT_HVAC.rule_count, 3 ** 6)
+
+    def test_six_input_output_in_universe(self):
+        for operators in (ops.ZADEH, ops.LARSEN_SUM):
+            with self.subTest(operators):
+                result = hc.infer(hc.SIX_INPUT_HVAC, self.readings, operators)
+                self.assertEqual(result.shape, (500,))
+                self.assertTrue(np.all((result >= 0) & (result <= 100)))
+
+    def test_intermediate_variables_drive_output(self):
+        calm = {"temp": 23.5, "humid": 52.5, "co2": 450, "occupancy": 2, "outdoor": 18, "time": 3}
+        busy = dict(calm, co2=1400, occupancy=90, outdoor=35, time=12)
+        self.assertLess(hc.infer(hc.SIX_INPUT_HVAC, calm)[0], 15)
+        self.assertGreater(hc.infer(hc.SIX_INPUT_HVAC, busy)[0], 70)
+
+
+if __name__ == "__main__":
+    unittest.main()
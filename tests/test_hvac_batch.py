@@ -0,0 +1,114 @@
+import unittest
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import numpy as np
+
+import main as app
+import mylibs.hvac_batch as hb
+import mylibs.membership_functions as mf
+
+
+def scalar_hvac(in_temp, in_humid, in_co2):
+    app.fuzzify_temp(in_temp)
+    app.fuzzify_humid(in_humid)
+    app.fuzzify_co2(in_co2)
+    return mf.defuzzify_centroid(app.hvac, app.evaluate_rules())
+
+
+class TestHvacBatch(unittest.TestCase):
+
+    def test_output_sets_match_main(self):
+        expected = np.array([app.off_hvac, app.low_hvac, app.medium_hvac, app.high_hvac])
+        np.testing.assert_array_equal(hb.HVAC_SETS, expected)
+
+    def test_verification_scenarios_match_main(self):
+        # The rule scenarios from 6_hvac_verification.ipynb.
+        scenarios = np.array([
+            (23.5, 55, 450), (23.5, 55, 900), (20, 55, 700), (28, 55, 700), (24, 75, 700),
+            (24, 55, 1400), (28, 75, 1400), (21, 63, 1000), (21, 41.5, 550), (26, 62, 1050),
+            (19, 35, 1000),
+        ])
+        expected = [scalar_hvac(*row) for row in scenarios]
+        np.testing.assert_allclose(hb.hvac_batch(*scenarios.T), expected, atol=1e-9)
+
+    def test_random_readings_match_main_across_chunks(self):
+        rng = np.random.default_rng(7)
+        readings = np.column_stack([
+            rng.uniform(16, 32, 300), rng.uniform(20, 90, 300), rng.uniform(250, 1700, 300)
+        ])
+        expected = [scalar_hvac(*row) for row in readings]
+        np.testing.assert_allclose(hb.hvac_batch(*readings.T, chunk_size=64), expected, atol=1e-9)
+
+    def test_zero_weights_silence_rules(self):
+        weights = np.ones(len(hb.HVAC_RULES))
+        weights[5] = 0  # Rule 6: high CO2 -> high
+        self.assertGreater(hb.hvac_batch(24, 55, 1400)[0], 70)
+        self.assertEqual(hb.hvac_batch(24, 55, 1400, weights=weights)[0], 0)
+
+
+class TestHvacCategories(unittest.TestCase):
+
+    def test_dominant_categories_match_main(self):
+        scenarios = np.array([(23.5, 55, 450), (20, 55, 700), (28, 55, 700), (24, 55, 1400), (21, 63, 1000)])
+        codes = hb.dominant_categories(hb.evaluate_rules_batch(*scenarios.T))
+        labels = [label for label, _, _ in hb.HVAC_TERMS]
+        for row, code in zip(scenarios, codes):
+            app.fuzzify_temp(row[0])
+            app.fuzzify_humid(row[1])
+            app.fuzzify_co2(row[2])
+            r = app.evaluate_rules()
+            memberships = {
+                "Off": np.max(np.minimum(r, app.off_hvac)),
+                "Low": np.max(np.minimum(r, app.low_hvac)),
+                "Medium": np.max(np.minimum(r, app.medium_hvac)),
+                "High": np.max(np.minimum(r, app.high_hvac)),
+            }
+            self.assertEqual(labels[code], max(memberships, key=memberships.get))
+
+    def test_height_categories_match_aggregate(self):
+        rng = np.random.default_rng(3)
+        readings = np.column_stack([rng.uniform(18, 30, 2000), rng.uniform(25, 85, 2000), rng.uniform(300, 1600, 2000)])
+        strengths = hb.firing_strengths(hb.fuzzify_inputs(*readings.T))
+        np.testing.assert_array_equal(hb.height_categories(hb.clip_heights(strengths)),
+                                      hb.dominant_categories(hb.aggregate(strengths)))
+
+    def test_height_centroid_matches_sampled_aggregate(self):
+        rng = np.random.default_rng(4)
+        heights = rng.random((5000, 4))
+        heights[rng.random(heights.shape) < 0.5] = 0
+        heights[:10] = 0
+        heights[10:20] = hb.HVAC_SETS[:, 37]  # clip heights equal to sampled set values
+        one_per_term = tuple(((None, None, None), t) for t in range(4))
+        expected = mf.defuzzify_centroid_batch(hb.HVAC_UNIVERSE, hb.aggregate(heights, rules=one_per_term))
+        np.testing.assert_allclose(hb.height_centroid(heights), expected, rtol=0, atol=1e-9)
+        np.testing.assert_array_equal(hb.height_centroid(heights[:10]), 0.0)
+        # Custom sets go through their own tables.
+        sets = hb.output_sets(np.linspace(0, 10, 50), (("a", "tri", (0, 2, 6)), ("b", "trap", (4, 7, 10, 10))))
+        expected = mf.defuzzify_centroid_batch(np.linspace(0, 10, 50), hb.aggregate(
+            heights[:, :2], sets, rules=one_per_term[:2]))
+        tables = hb.clip_tables(sets, np.linspace(0, 10, 50))
+        np.testing.assert_allclose(hb.height_centroid(heights[:, :2], tables), expected, rtol=0, atol=1e-9)
+
+    def test_min_max_centroid_matches_sampled_aggregate(self):
+        # centroid() takes the min / max path through height_centroid; sampling the aggregate is the reference.
+        rng = np.random.default_rng(5)
+        readings = np.column_stack([rng.uniform(16, 32, 5000), rng.uniform(20, 90, 5000), rng.uniform(250, 1700, 5000)])
+        strengths = hb.firing_strengths(hb.fuzzify_inputs(*readings.T))
+        weights = rng.uniform(0, 1, len(hb.HVAC_RULES))
+        for w in (None, weights):
+            expected = mf.defuzzify_centroid_batch(hb.HVAC_UNIVERSE, hb.aggregate(strengths, weights=w))
+            np.testing.assert_allclose(hb.centroid(strengths, weights=w), expected, rtol=0, atol=1e-9)
+        universe = np.linspace(0, 100, 137)
+        sets = hb.output_sets(universe, hb.HVAC_TERMS)
+        expected = mf.defuzzify_centroid_batch(universe, hb.aggregate(strengths, sets))
+        np.testing.assert_allclose(hb.centroid(strengths, sets, universe), expected, rtol=0, atol=1e-9)
+
+    def test_level_categories(self):
+        np.testing.assert_array_equal(hb.level_categories([2, 25, 55, 90]), [0, 1, 2, 3])
+
+
+if __name__ == "__main__":
+    unittest.main()
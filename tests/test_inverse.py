@@ -0,0 +1,53 @@
+import unittest
+
+import numpy as np
+
+import mylibs.hvac_batch as hb
+import mylibs.inverse as inv
+
+
+class TestInverseQuery(unittest.TestCase):
+
+    def test_two_free_inputs_match_forward_evaluation(self):
+        region = inv.inverse_query((40, None), {"co2": 600}, samples=(120, 60))
+        self.assertEqual(region.names, ("temp", "humid"))
+        rng = np.random.default_rng(0)
+        temps = rng.uniform(18, 30, 5000)
+        rows = rng.integers(0, 60, 5000)
+        humids = region.axes[1][rows]
+        expected = hb.hvac_batch(temps, humids, 600) >= 40
+        # Points within the bisection tolerance of an edge may go either way.
+        edges = region.intervals.ravel()
+        clear = np.abs(temps[:, None] - edges).min(axis=-1) > 1e-4
+        np.testing.assert_array_equal(region.contains(temps, humids)[clear], expected[clear])
+
+    def test_edges_sit_on_the_target_level(self):
+        region = inv.inverse_query((70, None), {"temp": 24, "humid": 55})
+        self.assertEqual(region.names, ("co2",))
+        (start, end), = region.intervals
+        below, above = hb.hvac_batch(24, 55, [start - 1e-3, start + 1e-3])
+        self.assertLess(below, 70)
+        self.assertGreaterEqual(above, 70)
+        self.assertAlmostEqual(region.size, end - start)
+
+    def test_bounded_range_and_custom_bounds(self):
+        region = inv.inverse_query((20, 30), {"humid": 55, "co2": 600}, bounds={"temp": (19, 25)})
+        self.assertEqual(region.axes[0][0], 19)
+        levels = hb.hvac_batch(region.intervals.mean(axis=-1), 55, 600)
+        self.assertTrue(np.all((levels >= 20) & (levels <= 30)))
+
+    def test_unreachable_target_is_empty(self):
+        # Without high CO2 no rule concludes "High".
+        region = inv.inverse_query((90, None), {"co2": 600}, samples=40)
+        self.assertEqual(len(region.intervals), 0)
+        self.assertEqual(region.size, 0)
+
+    def test_free_input_count(self):
+        with self.assertRaises(ValueError):
+            inv.inverse_query((0, 50), {})
+        with self.assertRaises(ValueError):
+            inv.inverse_query((0, 50), {"pressure": 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
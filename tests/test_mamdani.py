@@ -0,0 +1,89 @@
+import unittest
+
+import numpy as np
+
+import mylibs.hvac_batch as hb
+import mylibs.mamdani as md
+import mylibs.membership_functions as mf
+import mylibs.operators as ops
+
+
+def washing_notebook(in_soiled):
+    # Hand-written pipeline of notebooks/samples/mamdani_washing_machine.ipynb.
+    wash = np.linspace(10, 80, 100)
+    less_t = np.array([mf.sigmoid(x, -0.15, 50) for x in wash])
+    more_t = np.array([mf.sigmoid(x, 0.2, 50) for x in wash])
+    r = np.fmax(np.fmin(mf.dec(in_soiled, 20, 80), less_t), np.fmin(mf.inc(in_soiled, 30, 90), more_t))
+    return np.trapezoid(r * wash, wash) / np.trapezoid(r, wash)
+
+
+def alcohol_notebook(in_water, in_alc):
+    # Hand-written pipeline of notebooks/samples/mamdani_alcohol_consumption.ipynb.
+    life = np.linspace(10, 50, 100)
+    good = np.array([mf.dec(x, 15, 28) for x in life])
+    avg = np.array([mf.gaussian(x, 30, 8) for x in life])
+    poor = np.array([mf.inc(x, 32, 40) for x in life])
+    less_w, more_w = mf.sigmoid(in_water, -1, 5), mf.sigmoid(in_water, 1.2, 4.5)
+    less_a, avg_a, more_a = mf.sigmoid(in_alc, -0.14, 30), mf.tri(in_alc, 20, 50, 65), mf.sigmoid(in_alc, 0.1, 70)
+    r1 = np.fmin(min(less_w, more_a), poor)
+    r2 = np.fmin(min(more_w, less_a), good)
+    r3 = np.fmin(max(min(more_w, avg_a), min(less_w, less_a)), avg)
+    r = np.maximum(np.maximum(r1, r2), r3)
+    return np.trapezoid(r * life, life) / np.trapezoid(r, life)
+
+
+class TestMamdaniEngine(unittest.TestCase):
+
+    def test_washing_machine_matches_notebook(self):
+        soiled = np.linspace(0, 100, 41)
+        expected = [washing_notebook(s) for s in soiled]
+        np.testing.assert_allclose(md.WASHING_MACHINE(soiled), expected, rtol=1e-12)
+        self.assertAlmostEqual(float(md.WASHING_MACHINE(40)), washing_notebook(40), places=10)
+
+    def test_alcohol_consumption_matches_notebook(self):
+        water, alc = np.meshgrid(np.linspace(0, 10, 15), np.linspace(0, 100, 21))
+        expected = np.vectorize(alcohol_notebook)(water, alc)
+        result = md.ALCOHOL_CONSUMPTION(water, alc)
+        self.assertEqual(result.shape, water.shape)
+        np.testing.assert_allclose(result, expected, rtol=1e-12)
+
+    def test_or_rule_is_the_snorm_of_its_alternatives(self):
+        degrees = md.ALCOHOL_CONSUMPTION.fuzzify(np.array([2.0, 7.0]), np.array([10.0, 45.0]))
+        strengths = md.rule_strengths(degrees, md.ALCOHOL_CONSUMPTION.rules)
+        expected = np.maximum(np.minimum(degrees[0][:, 1], degrees[1][:, 1]),
+                              np.minimum(degrees[0][:, 0], degrees[1][:, 0]))
+        np.testing.assert_array_equal(strengths[:, 2], expected)
+
+    def test_hvac_configuration_matches_batch_controller(self):
+        readings = np.random.default_rng(0).uniform([18, 25, 300], [30, 85, 1600], (3000, 3))
+        np.testing.assert_array_equal(md.HVAC(*readings.T, chunk_size=700), hb.hvac_batch(*readings.T))
+
+    def test_broadcasting(self):
+        result = md.HVAC(np.linspace(18, 30, 5)[:, None], np.linspace(30, 80, 4), 800)
+        self.assertEqual(result.shape, (5, 4))
+        self.assertEqual(md.HVAC(23.5, 55, 450).shape, ())
+        np.testing.assert_array_equal(result[2], hb.hvac_batch(np.linspace(18, 30, 5)[2], np.linspace(30, 80, 4), 800))
+
+    def test_fast_paths_match_sampled_aggregate(self):
+        readings = np.random.default_rng(1).uniform([18, 25, 300], [30, 85, 1600], (2000, 3))
+        weights = [1, 1, 1, 0.5, 1, 1, 1]
+        for operators in (ops.ZADEH, ops.LARSEN_SUM, ops.Operators(tnorm="product")):
+            for defuzzifier in ("centroid", "trap"):
+                engine = md.MamdaniEngine(md.HVAC.inputs, md.HVAC.output, hb.HVAC_RULES, weights=weights,
+                                          operators=operators, defuzzifier=defuzzifier)
+                expected = hb.DEFUZZIFIERS[defuzzifier](hb.HVAC_UNIVERSE, engine.aggregate(*readings.T))
+                np.testing.assert_allclose(engine(*readings.T), expected, rtol=0, atol=1e-9)
+
+    def test_invalid_configurations(self):
+        with self.assertRaises(ValueError):
+            md.MamdaniEngine(md.HVAC.inputs, md.HVAC.output, (((1, 1), 0),))
+        with self.assertRaises(ValueError):
+            md.MamdaniEngine(md.HVAC.inputs, md.HVAC.output, (((1, 1, 1), 4),))
+        with self.assertRaises(ValueError):
+            md.MamdaniEngine(md.HVAC.inputs, md.HVAC.output, hb.HVAC_RULES, defuzzifier="bisector")
+        with self.assertRaises(ValueError):
+            md.HVAC(20, 50)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+import io
+import tracemalloc
+import unittest
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import numpy as np
+
+import main as app
+import mylibs.hvac_batch as hb
+import mylibs.memory_profile as mp
+import mylibs.operators as ops
+import mylibs.rule_analysis as ra
+
+
+def readings(n, seed=0):
+    low, high = np.array([(u[0], u[-1]) for u in hb.INPUT_UNIVERSES]).T
+    return np.random.default_rng(seed).uniform(low, high, (n, 3))
+
+
+class TestMemoryProfile(unittest.TestCase):
+
+    def test_reports_every_stage_per_chunk(self):
+        report = mp.profile_batch(readings(1000), chunk_size=300)
+        self.assertEqual([s.name for s in report.stages], list(mp.STAGES))
+        self.assertTrue(all(s.calls == 4 for s in report.stages))
+        for s in report.stages:
+            self.assertGreaterEqual(s.total, s.peak)
+            self.assertGreaterEqual(s.peak, 0)
+        # The (chunk, grid) aggregate dominates: at least one float64 row of the grid per reading.
+        aggregate = report.stages[mp.STAGES.index("aggregate")]
+        self.assertGreaterEqual(aggregate.peak, 300 * len(hb.HVAC_UNIVERSE) * 8)
+        self.assertGreaterEqual(report.peak, aggregate.peak)
+        self.assertIn("pipeline peak", str(report))
+
+    def test_profiles_the_rules_infer_block_evaluates(self):
+        # Strengths are (chunk, rules) float64: the minimized rule base has one rule less than HVAC_RULES.
+        strengths = mp.profile_batch(readings(1000), chunk_size=1000).stages[mp.STAGES.index("firing_strengths")]
+        self.assertGreaterEqual(strengths.retained, 1000 * len(ra.HVAC_MINIMAL_RULES) * 8)
+        self.assertLess(strengths.retained, 1000 * len(hb.HVAC_RULES) * 8)
+
+    def test_peak_grows_with_the_chunk_not_the_batch(self):
+        small = mp.profile_batch(readings(4096), chunk_size=256).peak
+        large = mp.profile_batch(readings(4096), chunk_size=2048).peak
+        longer = mp.profile_batch(readings(8192), chunk_size=256).peak
+        self.assertGreater(large, 4 * small)
+        self.assertLess(longer, 2 * small)
+
+    def test_closed_form_defuzzifies_without_the_grid(self):
+        report = mp.profile_batch(readings(500), operators=ops.LARSEN_SUM)
+        self.assertIn("aggregate", [s.name for s in report.stages])  # still needed for the categories
+        self.assertLess(report.stages[mp.STAGES.index("defuzzify")].peak, 500 * len(hb.HVAC_UNIVERSE) * 8)
+
+    def test_tracing_is_restored(self):
+        mp.profile_batch(readings(10))
+        self.assertFalse(tracemalloc.is_tracing())
+        tracemalloc.start()
+        try:
+            mp.profile_batch(readings(10))
+            self.assertTrue(tracemalloc.is_tracing())
+        finally:
+            tracemalloc.stop()
+
+    def test_recommended_chunk_stays_under_the_ceiling(self):
+        for mib in (4, 32):
+            ceiling = mib * 2**20
+            size = mp.recommend_chunk_size(ceiling)
+            self.assertGreater(size, 64)
+            self.assertLessEqual(mp.profile_batch(readings(size), chunk_size=size).peak, ceiling)
+            self.assertGreater(mp.profile_batch(readings(2 * size), chunk_size=2 * size).peak, ceiling)
+        with self.assertRaises(ValueError):
+            mp.recommend_chunk_size(1024)
+
+    def test_cli_chunk_size_does_not_change_results(self):
+        text = "".join(f"{t},{h},{c}\n" for t, h, c in readings(700))
+        outputs = []
+        for chunk_size in (64, hb.DEFAULT_CHUNK_SIZE):
+            out = io.StringIO()
+            app.run_batch(io.StringIO(text), out, chunk_size=chunk_size)
+            outputs.append(out.getvalue())
+        self.assertEqual(outputs[0], outputs[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
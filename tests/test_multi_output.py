@@ -0,0 +1,46 @@
+import unittest
+
+import numpy as np
+
+import mylibs.hvac_batch as hb
+import mylibs.multi_output as mo
+import mylibs.operators as ops
+
+
+def single_output(block, readings, operators=ops.ZADEH):
+    degrees = hb.fuzzify_inputs(*readings)
+    strengths = hb.firing_strengths(degrees, block.rules, operators)
+    return hb.centroid(strengths, block.sets, block.universe, block.rules, operators=operators)
+
+
+class TestMultiOutput(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(3)
+        self.readings = (rng.uniform(18, 30, 400), rng.uniform(25, 85, 400), rng.uniform(300, 1600, 400))
+
+    def test_hvac_output_matches_single_output_controller(self):
+        result = mo.infer_outputs(*self.readings, chunk_size=128)
+        np.testing.assert_allclose(result["hvac"], hb.hvac_batch(*self.readings))
+
+    def test_every_block_matches_its_own_pipeline(self):
+        for operators in (ops.ZADEH, ops.LARSEN_SUM):
+            result = mo.infer_outputs(*self.readings, operators=operators)
+            for block in mo.DEFAULT_BLOCKS:
+                with self.subTest(block=block.name, operators=operators):
+                    np.testing.assert_allclose(result[block.name], single_output(block, self.readings, operators))
+
+    def test_blocks_with_different_universes(self):
+        coarse = mo.OutputBlock("fan", np.linspace(0, 100, 101), mo.FAN_TERMS, mo.FAN_RULES)
+        result = mo.infer_outputs(*self.readings, blocks=(mo.HVAC_BLOCK, coarse))
+        np.testing.assert_allclose(result["fan"], single_output(coarse, self.readings))
+
+    def test_high_co2_opens_damper(self):
+        result = mo.infer_outputs([24, 24], [55, 55], [450, 1400])
+        self.assertLess(result["damper"][0], 25)
+        self.assertGreater(result["damper"][1], 70)
+        self.assertGreater(result["fan"][1], result["fan"][0])
+
+
+if __name__ == "__main__":
+    unittest.main()
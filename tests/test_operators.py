@@ -0,0 +1,80 @@
+import unittest
+
+import numpy as np
+
+import mylibs.hvac_batch as hb
+import mylibs.membership_functions as mf
+import mylibs.operators as ops
+
+
+class TestOperatorKernels(unittest.TestCase):
+
+    def setUp(self):
+        self.a = np.linspace(0, 1, 11)
+
+    def test_tnorms_have_one_as_identity_and_zero_as_absorbing(self):
+        for name, tnorm in ops.TNORMS.items():
+            with self.subTest(name):
+                np.testing.assert_allclose(tnorm(self.a, np.ones_like(self.a)), self.a)
+                np.testing.assert_allclose(tnorm(self.a, np.zeros_like(self.a)), 0)
+
+    def test_tnorms_are_bounded_by_min(self):
+        b = self.a[::-1]
+        for name, tnorm in ops.TNORMS.items():
+            with self.subTest(name):
+                self.assertTrue(np.all(tnorm(self.a, b) <= np.minimum(self.a, b) + 1e-12))
+
+    def test_snorms_have_zero_as_identity(self):
+        for name, snorm in ops.SNORMS.items():
+            with self.subTest(name):
+                np.testing.assert_allclose(snorm(self.a, np.zeros_like(self.a)), self.a)
+
+    def test_known_values(self):
+        self.assertAlmostEqual(ops.lukasiewicz_tnorm(0.6, 0.7), 0.3)
+        self.assertAlmostEqual(ops.hamacher_tnorm(0.5, 0.5), 1 / 3)
+        self.assertEqual(ops.hamacher_tnorm(0.0, 0.0), 0)
+        self.assertAlmostEqual(ops.probabilistic_sum(0.5, 0.5), 0.75)
+        self.assertAlmostEqual(ops.bounded_sum(0.6, 0.7), 1.0)
+
+    def test_unknown_operator_is_rejected(self):
+        with self.assertRaises(ValueError):
+            ops.Operators(tnorm="drastic")
+
+
+class TestOperatorSelection(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(5)
+        self.readings = (rng.uniform(18, 30, 500), rng.uniform(25, 85, 500), rng.uniform(300, 1600, 500))
+
+    def test_zadeh_is_the_default(self):
+        np.testing.assert_array_equal(
+            hb.hvac_batch(*self.readings), hb.hvac_batch(*self.readings, operators=ops.ZADEH)
+        )
+
+    def test_closed_form_matches_sampled_aggregate(self):
+        aggregated = hb.evaluate_rules_batch(*self.readings, operators=ops.LARSEN_SUM)
+        expected = mf.defuzzify_centroid_batch(hb.HVAC_UNIVERSE, aggregated)
+        np.testing.assert_allclose(hb.hvac_batch(*self.readings, operators=ops.LARSEN_SUM), expected)
+
+    def test_max_aggregation_shortcut_matches_per_rule_aggregation(self):
+        for implication in ops.IMPLICATIONS:
+            with self.subTest(implication):
+                operators = ops.Operators(implication=implication)
+                degrees = [hb.fuzzify(x, terms) for x, terms in zip(self.readings, hb.INPUT_TERMS)]
+                strengths = hb.firing_strengths(degrees, operators=operators)
+                consequents = [c for _, c in hb.HVAC_RULES]
+                implied = ops.IMPLICATIONS[implication](strengths[..., None], hb.HVAC_SETS[consequents])
+                np.testing.assert_allclose(hb.aggregate(strengths, operators=operators), implied.max(axis=-2))
+
+    def test_operators_change_the_output(self):
+        zadeh = hb.hvac_batch(*self.readings)
+        for operators in (ops.LARSEN_SUM, ops.Operators(tnorm="lukasiewicz", snorm="bounded_sum")):
+            with self.subTest(operators):
+                result = hb.hvac_batch(*self.readings, operators=operators)
+                self.assertTrue(np.all((result >= 0) & (result <= 100)))
+                self.assertFalse(np.allclose(result, zadeh))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+import unittest
+
+import numpy as np
+
+import mylibs.output_stage as output_stage
+
+
+class TestZoneSmoother(unittest.TestCase):
+
+    def test_first_update_passes_command_through(self):
+        smoother = output_stage.ZoneSmoother(3)
+        np.testing.assert_array_equal(smoother.step([10, 0, 80], now=0), [10, 0, 80])
+        np.testing.assert_array_equal(smoother.on, [True, False, True])
+
+    def test_exponential_smoothing_uses_elapsed_time(self):
+        params = output_stage.SmoothingParams(tau=10, max_slew=np.inf, min_on=0, min_off=0)
+        smoother = output_stage.ZoneSmoother(1, params)
+        smoother.step([0], now=0)
+        out = smoother.step([100], now=10)
+        self.assertAlmostEqual(out[0], 100 * (1 - np.exp(-1)))
+
+    def test_slew_rate_limit(self):
+        params = output_stage.SmoothingParams(tau=0, max_slew=2, min_on=0, min_off=0)
+        smoother = output_stage.ZoneSmoother(2, params)
+        smoother.step([50, 50], now=0)
+        np.testing.assert_allclose(smoother.step([100, 0], now=5), [60, 40])
+
+    def test_minimum_off_time_holds_actuator_off(self):
+        params = output_stage.SmoothingParams(tau=0, max_slew=np.inf, min_on=0, min_off=60)
+        smoother = output_stage.ZoneSmoother(1, params)
+        smoother.step([0], now=0)
+        self.assertEqual(smoother.step([40], now=30)[0], 0)
+        self.assertFalse(smoother.on[0])
+        self.assertEqual(smoother.step([40], now=61)[0], 40)
+        self.assertTrue(smoother.on[0])
+
+    def test_minimum_on_time_holds_previous_level(self):
+        params = output_stage.SmoothingParams(tau=0, max_slew=np.inf, min_on=120, min_off=0)
+        smoother = output_stage.ZoneSmoother(1, params)
+        smoother.step([30], now=0)
+        self.assertEqual(smoother.step([0], now=60)[0], 30)
+        self.assertEqual(smoother.step([0], now=130)[0], 0)
+
+    def test_default_params_switch_a_zone_off(self):
+        smoother = output_stage.ZoneSmoother(1)
+        smoother.step([60], now=0)
+        for now in range(60, 600, 60):
+            out = smoother.step([0], now=now)
+        self.assertEqual(out[0], 0)
+        self.assertFalse(smoother.on[0])
+        self.assertEqual(smoother.switch_time[0], 300)  # as soon as min_on allows
+
+    def test_subset_update_leaves_other_zones(self):
+        params = output_stage.SmoothingParams(tau=0, max_slew=np.inf, min_on=0, min_off=0)
+        smoother = output_stage.ZoneSmoother(4, params)
+        smoother.step([1, 2, 3, 4], now=0)
+        smoother.step([9, 9], now=1, zones=[1, 3])
+        np.testing.assert_array_equal(smoother.value, [1, 9, 3, 9])
+        np.testing.assert_array_equal(smoother.time, [0, 1, 0, 1])
+
+    def test_per_zone_time(self):
+        smoother = output_stage.ZoneSmoother(2, output_stage.SmoothingParams(tau=0, max_slew=1, min_on=0, min_off=0))
+        smoother.step([0, 0], now=[0, 0])
+        np.testing.assert_allclose(smoother.step([50, 50], now=[10, 20]), [10, 20])
+
+
+class TestDeadbandFilter(unittest.TestCase):
+
+    def test_first_cycle_emits_every_zone(self):
+        deadband = output_stage.DeadbandFilter(3)
+        np.testing.assert_array_equal(deadband.update([10, 20, 30], [1, 1, 1]), [0, 1, 2])
+        self.assertEqual((deadband.emitted, deadband.suppressed), (3, 0))
+
+    def test_small_changes_are_suppressed(self):
+        deadband = output_stage.DeadbandFilter(3, deadband=2.0)
+        deadband.update([10, 20, 30], [1, 1, 1])
+        emit = deadband.update([11, 23, 30], [1, 1, 1])
+        np.testing.assert_array_equal(emit, [1])
+        self.assertEqual(emit.dtype, np.int32)
+        self.assertEqual((deadband.emitted, deadband.suppressed), (4, 2))
+        self.assertAlmostEqual(deadband.suppression_ratio, 2 / 6)
+
+    def test_category_change_is_always_emitted(self):
+        deadband = output_stage.DeadbandFilter(2, deadband=5.0)
+        deadband.update([39, 50], [1, 2])
+        np.testing.assert_array_equal(deadband.update([40, 50], [2, 2]), [0])
+
+    def test_drift_accumulates_against_last_sent_value(self):
+        deadband = output_stage.DeadbandFilter(1, deadband=1.0)
+        deadband.update([10], [1])
+        self.assertEqual(len(deadband.update([10.6], [1])), 0)
+        np.testing.assert_array_equal(deadband.update([11.2], [1]), [0])
+
+    def test_zone_subset(self):
+        deadband = output_stage.DeadbandFilter(4)
+        deadband.update([1, 2, 3, 4], [0, 0, 0, 0])
+        np.testing.assert_array_equal(deadband.update([50, 4], [2, 0], zones=[2, 3]), [2])
+        np.testing.assert_array_equal(deadband.sent_level, [1, 2, 50, 4])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import os
+import tempfile
+import unittest
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import numpy as np
+from matplotlib import pyplot as plt
+
+import mylibs.hvac_batch as hb
+import mylibs.plotting as pl
+
+
+class TestLiveDashboard(unittest.TestCase):
+
+    def setUp(self):
+        self.dashboard = pl.LiveDashboard(plt.figure(figsize=(6, 4)))
+
+    def tearDown(self):
+        plt.close(self.dashboard.figure)
+
+    def test_update_moves_dynamic_artists_only(self):
+        n_lines = sum(len(ax.lines) for ax in self.dashboard.figure.axes)
+        self.dashboard.update(23.5, 55, 900)
+        self.dashboard.update(28, 75, 1400)
+        self.assertEqual(sum(len(ax.lines) for ax in self.dashboard.figure.axes), n_lines)
+
+        panels = self.dashboard.panels
+        np.testing.assert_allclose(panels.points[0].get_offsets()[:, 0], [28, 28, 28])
+        np.testing.assert_allclose(panels.points[0].get_offsets()[:, 1], hb.fuzzify(28, hb.TEMP_TERMS))
+        expected = hb.hvac_batch(28, 75, 1400)[0]
+        self.assertAlmostEqual(panels.output.get_offsets()[0, 0], expected)
+        self.assertIn("28.0", panels.titles[0].get_text())
+
+    def test_dynamic_artists_are_animated(self):
+        self.assertTrue(all(artist.get_animated() for artist in self.dashboard.panels.artists))
+        self.assertIsNotNone(self.dashboard.background)
+
+
+class TestReports(unittest.TestCase):
+
+    def test_render_reports_writes_one_png_per_reading(self):
+        readings = [(23.5, 55, 450), (28, 75, 1400), (19, 35, 1000)]
+        with tempfile.TemporaryDirectory() as tmp:
+            for workers in (1, 2):
+                with self.subTest(workers=workers):
+                    out_dir = os.path.join(tmp, str(workers))
+                    paths = pl.render_reports(readings, out_dir, names=["a", "b", "c"], workers=workers)
+                    self.assertEqual([os.path.basename(p) for p in paths], ["a.png", "b.png", "c.png"])
+                    for path in paths:
+                        with open(path, "rb") as f:
+                            self.assertEqual(f.read(8), b"\x89PNG\r\n\x1a\n")
+
+    def test_report_panels_are_not_animated(self):
+        panels = pl.HvacPanels(matplotlib.figure.Figure())
+        self.assertFalse(any(artist.get_animated() for artist in panels.artists))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+import unittest
+
+import numpy as np
+
+import mylibs.hvac_batch as hb
+import mylibs.mamdani as md
+import mylibs.membership_functions as mf
+import mylibs.operators as ops
+import mylibs.rule_analysis as ra
+
+
+def random_readings(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return np.column_stack([rng.uniform(16, 32, n), rng.uniform(20, 90, n), rng.uniform(250, 1700, n)])
+
+
+class TestRuleAnalysis(unittest.TestCase):
+
+    def test_rule_7_is_subsumed_by_rule_6(self):
+        analysis = ra.analyze()
+        self.assertEqual(analysis.subsumed, ((6, 5),))
+        self.assertEqual(analysis.unreachable, ())
+        self.assertEqual(analysis.conflicts, ((4, 6, "specialization"),))
+        self.assertEqual(analysis.kept, (0, 1, 2, 3, 4, 5))
+        self.assertEqual(ra.HVAC_MINIMAL_RULES, hb.HVAC_RULES[:6])
+        self.assertIn("Rule 7 is subsumed by rule 6", str(analysis))
+
+    def test_minimized_rule_base_gives_the_same_outputs(self):
+        readings = random_readings(20000)
+        degrees = hb.fuzzify_inputs(*readings.T)
+        for operators in (ops.ZADEH, ops.Operators(tnorm="product", implication="product")):
+            full = hb.firing_strengths(degrees, operators=operators)
+            minimal = hb.firing_strengths(degrees, ra.HVAC_MINIMAL_RULES, operators)
+            np.testing.assert_array_equal(
+                hb.aggregate(minimal, rules=ra.HVAC_MINIMAL_RULES, operators=operators),
+                hb.aggregate(full, operators=operators))
+        np.testing.assert_array_equal(hb.clip_heights(minimal, ra.HVAC_MINIMAL_RULES), hb.clip_heights(full))
+
+    def test_weights_and_operators_decide_what_is_removable(self):
+        # A lighter rule 6 no longer covers rule 7, a zero weight makes rule 7 unreachable.
+        self.assertEqual(ra.analyze(weights=[1, 1, 1, 1, 1, 0.5, 1]).kept, tuple(range(7)))
+        silenced = ra.analyze(weights=[1, 1, 1, 1, 1, 1, 0])
+        self.assertEqual((silenced.subsumed, silenced.unreachable), ((), (6,)))
+        np.testing.assert_array_equal(silenced.weights, np.ones(6))
+        # Non-idempotent aggregation adds up every rule, so nothing is subsumed.
+        self.assertEqual(ra.analyze(operators=ops.Operators(snorm="probabilistic_sum")).subsumed, ())
+
+    def test_duplicates_contradictions_and_dead_terms(self):
+        rules = hb.HVAC_RULES + (((1, 1, 0), 0), ((1, 1, 0), 3))
+        analysis = ra.analyze(rules)
+        self.assertEqual(analysis.subsumed, ((6, 5), (7, 0)))
+        self.assertIn((0, 8, "contradiction"), analysis.conflicts)
+        self.assertIn((7, 8, "contradiction"), analysis.conflicts)
+        # A term beyond the universe is zero on its samples but fires for a 45 °C reading: reported, not removed.
+        temp_terms = hb.TEMP_TERMS + (("Hot", "inc", (40, 45)), ("Never", "trap", (26, 26, 26, 26)))
+        analysis = ra.analyze(rules=hb.HVAC_RULES + (((3, None, None), 3), ((4, 1, None), 2)),
+                              input_terms=(temp_terms,) + hb.INPUT_TERMS[1:])
+        self.assertEqual(analysis.out_of_universe, (7,))
+        self.assertIn(7, analysis.kept)
+        self.assertIn("Rule 8 is unreachable within the input universes", str(analysis))
+        # A zero-width support never fires for any input.
+        self.assertEqual(analysis.unreachable, (8,))
+        self.assertNotIn(8, analysis.kept)
+        self.assertTrue(ra.never_fires("tri", (5, 5, 5)))
+        self.assertFalse(ra.never_fires("trap", (18, 18, 20, 22)))
+
+    def test_unordered_breakpoints_are_reported_not_removed(self):
+        # tri(6, 5, 7, 3) == 0.5 although a >= c: only the breakpoint order is wrong.
+        self.assertEqual(mf.tri(6, 5, 7, 3), 0.5)
+        self.assertFalse(ra.never_fires("tri", (5, 7, 3)))
+        self.assertFalse(ra.never_fires("trap", (5, 7, 3, 3)))
+        temp_terms = hb.TEMP_TERMS + (("Odd", "tri", (22, 24, 20)),)
+        analysis = ra.analyze(rules=hb.HVAC_RULES + (((3, None, None), 3),),
+                              input_terms=(temp_terms,) + hb.INPUT_TERMS[1:])
+        self.assertEqual(analysis.malformed, ((0, 3),))
+        self.assertEqual(analysis.unreachable, ())
+        self.assertIn(7, analysis.kept)
+        self.assertIn("Input 1 term 4 has unordered breakpoints", str(analysis))
+        self.assertEqual(ra.analyze().malformed, ())
+
+    def test_or_antecedents_of_the_mamdani_engine(self):
+        engine = md.ALCOHOL_CONSUMPTION
+        rules = engine.rules + (((0, 0), 1),)  # already a part of the R3 disjunction
+        inputs = tuple(v.terms for v in engine.inputs)
+        universes = tuple(v.universe for v in engine.inputs)
+        analysis = ra.analyze(rules, input_terms=inputs, input_universes=universes, sets=engine.sets)
+        self.assertEqual(analysis.subsumed, ((3, 2),))
+        self.assertEqual(analysis.rules, engine.rules)
+
+
+if __name__ == "__main__":
+    unittest.main()
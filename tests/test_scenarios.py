@@ -0,0 +1,65 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+import mylibs.hvac_batch as hb
+import mylibs.scenarios as sc
+
+
+class TestScenarioRunner(unittest.TestCase):
+
+    def test_verification_scenarios_pass(self):
+        report = sc.run_scenarios()
+        self.assertTrue(report.all_passed, str(report))
+        self.assertEqual(report.strongest_rules[-1], 0)
+
+    def test_failures_are_reported_per_row(self):
+        scenarios = (
+            sc.Scenario("ok", 23.5, 55, 450, "Off"),
+            sc.Scenario("wrong category", 23.5, 55, 450, "High"),
+            sc.Scenario("wrong range and rule", 24, 55, 1400, output_range=(0, 50), rule=1),
+        )
+        report = sc.run_scenarios(scenarios)
+        np.testing.assert_array_equal(report.passed, [True, False, False])
+        self.assertEqual(report.failures[0], [])
+        self.assertEqual(report.failures[1], ["category Off, expected High"])
+        self.assertEqual(len(report.failures[2]), 2)
+        self.assertIn("1/3 scenarios passed", str(report))
+
+    def test_generated_cases_match_batch_controller(self):
+        rng = np.random.default_rng(0)
+        readings = np.column_stack([rng.uniform(18, 30, 2000), rng.uniform(25, 85, 2000),
+                                    rng.uniform(300, 1600, 2000)])
+        scenarios = tuple(sc.Scenario(str(i), *row) for i, row in enumerate(readings.tolist()))
+        report = sc.run_scenarios(scenarios)
+        np.testing.assert_allclose(report.outputs, hb.hvac_batch(*readings.T))
+        codes = hb.dominant_categories(hb.evaluate_rules_batch(*readings.T))
+        self.assertEqual(report.categories, [sc.HVAC_LABELS[c] for c in codes])
+
+    def test_weights_change_categories_consistently(self):
+        weights = [1, 1, 1, 0, 1, 1, 1]
+        report = sc.run_scenarios((sc.Scenario("rule 4 off", 28, 55, 700, "Off", (0, 0)),), weights=weights)
+        self.assertTrue(report.all_passed, str(report))
+        # Rule 4 fires strongest (0.24) unweighted; at half weight rule 5 (0.2) leads.
+        scenario = sc.Scenario("rule 4 halved", 26, 62, 1050, rule=5)
+        self.assertEqual(sc.run_scenarios((scenario,)).strongest_rules.tolist(), [4])
+        report = sc.run_scenarios((scenario,), weights=[1, 1, 1, 0.5, 1, 1, 1])
+        self.assertTrue(report.all_passed, str(report))
+
+    def test_load_scenarios_from_csv(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "cases.csv")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write("name,temp,humid,co2,category,min_output,max_output,rule\n")
+                f.write("rule 6,24,55,1400,High,80,,6\n")
+                f.write("unchecked,21,63,1000,,,,\n")
+            scenarios = sc.load_scenarios(path)
+        self.assertEqual(scenarios[0], sc.Scenario("rule 6", 24, 55, 1400, "High", (80, np.inf), 6))
+        self.assertEqual(scenarios[1], sc.Scenario("unchecked", 21, 63, 1000))
+        self.assertTrue(sc.run_scenarios(scenarios).all_passed)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+import unittest
+
+import numpy as np
+
+import mylibs.hvac_batch as hb
+import mylibs.operators as ops
+import mylibs.sensitivity as se
+
+
+def random_readings(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return np.column_stack([rng.uniform(18, 30, n), rng.uniform(25, 85, n), rng.uniform(300, 1600, n)])
+
+
+FINE_STEPS = (1e-6, 1e-6, 1e-5)
+
+
+class TestSensitivity(unittest.TestCase):
+
+    def test_output_matches_batch_controller(self):
+        readings = random_readings(3000)
+        result = se.sensitivity(*readings.T, chunk_size=700)
+        np.testing.assert_array_equal(result.output, hb.hvac_batch(*readings.T))
+
+    def test_analytic_gradient_matches_finite_differences(self):
+        readings = random_readings(3000, seed=1)
+        result = se.sensitivity(*readings.T)
+        self.assertGreater(result.exact.mean(), 0.99)
+        _, numeric = se.finite_difference(readings, steps=FINE_STEPS)
+        np.testing.assert_allclose(result.gradient[result.exact], numeric[result.exact], atol=1e-5)
+
+    def test_weighted_rules(self):
+        readings = random_readings(500, seed=2)
+        weights = [1, 0.5, 1, 0.8, 1, 0.3, 1]
+        result = se.sensitivity(*readings.T, weights=weights)
+        numeric_out, numeric = se.finite_difference(readings, weights=weights, steps=FINE_STEPS)
+        np.testing.assert_allclose(result.output, numeric_out)
+        np.testing.assert_allclose(result.gradient[result.exact], numeric[result.exact], atol=1e-5)
+
+    def test_breakpoints_fall_back_to_finite_differences(self):
+        # 22 °C is where "Cold" ends, 1100 ppm where "Medium" CO2 ends, (23.5, 52.5, 800) are peaks.
+        result = se.sensitivity([22, 21, 23.5], [55, 55, 52.5], [600, 1100, 800])
+        np.testing.assert_array_equal(result.exact, [False, False, False])
+        self.assertTrue(np.all(np.isfinite(result.gradient)))
+
+    def test_flat_region_has_zero_gradient(self):
+        result = se.sensitivity(28, 75, 1300)
+        self.assertTrue(result.exact[0])
+        np.testing.assert_array_equal(result.gradient, [[0, 0, 0]])
+
+    def test_non_linear_sets_use_finite_differences(self):
+        temp_terms = (
+            ("Cold", "gaussian", (19, 1.5)),
+            ("Comfortable", "gaussian", (23.5, 1.5)),
+            ("Warm", "gaussian", (28, 1.5)),
+        )
+        input_terms = (temp_terms, hb.HUMID_TERMS, hb.CO2_TERMS)
+        readings = random_readings(50, seed=3)
+        result = se.sensitivity(*readings.T, input_terms=input_terms)
+        self.assertFalse(result.exact.any())
+        expected = se.crisp_outputs(readings, input_terms)
+        np.testing.assert_allclose(result.output, expected)
+
+    def test_other_operators_use_finite_differences(self):
+        readings = random_readings(50, seed=4)
+        result = se.sensitivity(*readings.T, operators=ops.LARSEN_SUM)
+        self.assertFalse(result.exact.any())
+        np.testing.assert_allclose(result.output, hb.hvac_batch(*readings.T, operators=ops.LARSEN_SUM))
+
+
+class TestTermSlopes(unittest.TestCase):
+
+    def test_slopes_and_breakpoints(self):
+        slopes, breaks = se.term_slopes([19, 21, 23.5, 26], hb.TEMP_TERMS)
+        np.testing.assert_allclose(slopes[:, 0], [0, -0.5, 0, 0])
+        np.testing.assert_allclose(slopes[:, 1], [0, 1 / 3.5, 0, -1 / 3.5])
+        np.testing.assert_array_equal(breaks[:, 1], [False, False, True, False])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import unittest
+
+import numpy as np
+
+import mylibs.centroid_cache as cc
+import mylibs.hvac_batch as hb
+import mylibs.operators as ops
+import mylibs.simulation as sim
+
+CALM = sim.Weather(mean_temp=30.0, temp_swing=0.0, mean_humid=60.0, humid_swing=0.0, day_to_day=0.0)
+
+
+def constant(level):
+    return lambda readings: np.full(len(readings), float(level))
+
+
+class TestSimulation(unittest.TestCase):
+
+    def test_energy_follows_the_level(self):
+        result = sim.simulate(5, days=1, controller=constant(40))
+        np.testing.assert_allclose(result.energy, sim.ZoneModel().rated_power * 0.4 * 24)
+        np.testing.assert_allclose(result.mean_level, 40)
+
+    def test_free_running_zone_matches_the_exponential_response(self):
+        result = sim.simulate(3, days=2, dt=300, controller=constant(0), weather=CALM, occupants=np.zeros(3),
+                              initial=(22.0, 50.0, 800.0), record_every=1)
+        times, states, _ = result.trace
+        hours = times[-1] / 3600.0
+        expected_temp = 30 + (22 - 30) * np.exp(-hours / sim.ZoneModel.envelope_hours)
+        expected_co2 = 420 + (800 - 420) * np.exp(-hours * sim.ZoneModel.infiltration_ach)
+        np.testing.assert_allclose(states[-1, :, 0], expected_temp)
+        np.testing.assert_allclose(states[-1, :, 2], expected_co2)
+        self.assertTrue(np.all(np.diff(states[:, 0, 0]) > 0))
+
+    def test_closed_loop_improves_comfort(self):
+        off = sim.simulate(200, days=3, controller=constant(0))
+        fuzzy = sim.simulate(200, days=3)
+        self.assertLess(fuzzy.violation_degree_hours.sum(axis=0)[0], off.violation_degree_hours.sum(axis=0)[0])
+        self.assertLess(fuzzy.violation_hours[:, 2].sum(), off.violation_hours[:, 2].sum())
+        self.assertGreater(fuzzy.energy.sum(), 0)
+        self.assertIn("kWh per zone-day", str(fuzzy))
+
+    def test_rule_bases_can_be_compared(self):
+        weights = np.ones(len(hb.HVAC_RULES))
+        weights[5] = 0  # drop rule 6 (high CO2 -> high)
+        full = sim.simulate(200, days=3)
+        reduced = sim.simulate(200, days=3, controller=sim.fuzzy_controller(weights=weights))
+        self.assertGreater(reduced.violation_hours[:, 2].sum(), full.violation_hours[:, 2].sum())
+        self.assertLess(reduced.energy.sum(), full.energy.sum())
+
+    def test_cached_controller_tracks_the_exact_one(self):
+        cache = cc.CentroidCache()
+        exact = sim.simulate(100, days=2)
+        cached = sim.simulate(100, days=2, controller=sim.fuzzy_controller(cache=cache))
+        self.assertAlmostEqual(cached.energy.sum() / exact.energy.sum(), 1, places=2)
+        self.assertGreater(cache.hit_rate, 0.9)
+        with self.assertRaises(ValueError):
+            sim.fuzzy_controller(operators=ops.LARSEN_SUM, cache=cache)
+
+    def test_default_controller_matches_batch_controller(self):
+        readings = np.random.default_rng(0).uniform([18, 30, 400], [30, 80, 1500], (500, 3))
+        np.testing.assert_array_equal(sim.fuzzy_controller()(readings), hb.hvac_batch(*readings.T))
+
+    def test_seeded_runs_are_deterministic(self):
+        a, b = sim.simulate(50, days=1, seed=3), sim.simulate(50, days=1, seed=3)
+        np.testing.assert_array_equal(a.energy, b.energy)
+        np.testing.assert_array_equal(a.violation_hours, b.violation_hours)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+import main as app
+import mylibs.hvac_batch as hb
+import mylibs.telemetry as tm
+
+CLEAN = tm.TelemetryConfig(n_zones=8, block_steps=64, dropout_rate=0, spike_rate=0, stuck_rate=0)
+
+
+def collect(rows, seed=0, config=tm.TelemetryConfig(n_zones=20, block_steps=64)):
+    return np.concatenate(list(tm.generate(rows, seed, config)))
+
+
+class TestTelemetry(unittest.TestCase):
+
+    def test_row_count_and_layout(self):
+        data = collect(3001)
+        self.assertEqual(len(data), 3001)
+        self.assertEqual(data.dtype, tm.TELEMETRY_DTYPE)
+        np.testing.assert_array_equal(data["zone"][:40], np.tile(np.arange(20), 2))
+        self.assertTrue(np.all(np.diff(data["time"]) >= 0))
+
+    def test_seeded_streams_are_deterministic(self):
+        a, b, c = collect(5000, seed=4), collect(5000, seed=4), collect(5000, seed=5)
+        self.assertEqual(a.tobytes(), b.tobytes())
+        self.assertNotEqual(a.tobytes(), c.tobytes())
+
+    def test_clean_readings_stay_in_the_universes(self):
+        data = collect(20000, config=CLEAN)
+        self.assertFalse(data["fault"].any())
+        for name, universe in zip(("temp", "humid", "co2"), hb.INPUT_UNIVERSES):
+            self.assertGreaterEqual(data[name].min(), np.float32(universe[0]))
+            self.assertLessEqual(data[name].max(), np.float32(universe[-1]))
+
+    def test_occupancy_raises_co2(self):
+        config = tm.TelemetryConfig(n_zones=8, block_steps=64, noise=(0, 0, 0), dropout_rate=0, spike_rate=0,
+                                    stuck_rate=0)
+        data = collect(8 * 24 * 60, config=config)  # one weekday at one-minute steps
+        hour = (data["time"] / 3600) % 24
+        self.assertGreater(data["co2"][(hour > 15) & (hour < 17)].mean(),
+                           data["co2"][(hour > 4) & (hour < 6)].mean() + 200)
+
+    def test_faults(self):
+        config = tm.TelemetryConfig(n_zones=20, block_steps=64, dropout_rate=0.01, spike_rate=0.01, stuck_rate=0.01)
+        data = collect(20000, config=config)
+        self.assertTrue(np.all(np.isnan(data["temp"]) <= (data["fault"] == tm.FAULT_DROPOUT)))
+        counts = np.bincount(data["fault"], minlength=4)
+        self.assertTrue(np.all(counts[1:] > 0))
+
+    def test_csv_feeds_the_batch_cli(self):
+        f = io.StringIO()
+        self.assertEqual(tm.write_csv(tm.generate(500, config=CLEAN), f), 500)
+        readings = app.parse_lines(f.getvalue().splitlines())
+        self.assertEqual(readings.shape, (500, 3))
+
+    def test_jsonl_and_binary_round_trip(self):
+        data = collect(1000, config=CLEAN)
+        f = io.StringIO()
+        tm.write_jsonl(iter([data]), f)
+        np.testing.assert_allclose(app.parse_lines(f.getvalue().splitlines())[:, 0], data["temp"], atol=0.006)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "telemetry.bin")
+            with open(path, "wb") as out:
+                tm.write_binary(tm.generate(1000, config=CLEAN), out)
+            restored = np.concatenate(list(tm.read_binary(path, block_rows=300)))
+        self.assertEqual(restored.tobytes(), data.tobytes())
+
+    def test_jsonl_writes_dropouts_as_null(self):
+        config = tm.TelemetryConfig(n_zones=20, block_steps=64, dropout_rate=0.05)
+        data = collect(2000, config=config)
+        f = io.StringIO()
+        tm.write_jsonl(iter([data]), f)
+
+        def reject(token):
+            raise ValueError(f"not JSON: {token}")
+
+        records = [json.loads(line, parse_constant=reject) for line in f.getvalue().splitlines()]
+        self.assertEqual(len(records), 2000)
+        for name in ("temp", "humid", "co2"):
+            missing = np.isnan(data[name])
+            self.assertGreater(missing.sum(), 0)
+            np.testing.assert_array_equal([r[name] is None for r in records], missing)
+
+
+if __name__ == "__main__":
+    unittest.main()
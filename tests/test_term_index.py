@@ -0,0 +1,50 @@
+import unittest
+
+import numpy as np
+
+import mylibs.hvac_batch as hb
+import mylibs.term_index as ti
+
+
+class TestTermIndex(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(21)
+        self.fine = ti.uniform_partition(18, 30, 15)
+        self.xs = np.concatenate([rng.uniform(15, 33, 500), np.linspace(18, 30, 61)])
+
+    def test_dense_view_matches_full_fuzzification(self):
+        for terms, universe in zip((*hb.INPUT_TERMS, self.fine), (*hb.INPUT_UNIVERSES, hb.TEMP_UNIVERSE)):
+            with self.subTest(terms=terms[0][0]):
+                xs = np.concatenate([universe, np.linspace(universe[0] - 5, universe[-1] + 5, 97)])
+                index = ti.TermIndex(terms)
+                np.testing.assert_allclose(index.fuzzify(xs).dense(), hb.fuzzify(xs, terms), atol=1e-12)
+
+    def test_active_width_does_not_grow_with_term_count(self):
+        self.assertEqual(ti.TermIndex(ti.uniform_partition(0, 1, 3)).width, 2)
+        self.assertEqual(ti.TermIndex(self.fine).width, 2)
+        self.assertEqual(len(self.fine), 15)
+
+    def test_sorted_batch_locates_like_unsorted(self):
+        index = ti.TermIndex(self.fine)
+        xs = np.sort(np.concatenate([self.xs, [np.nan, np.nan]]))
+        np.testing.assert_array_equal(index.locate(xs, assume_sorted=True), index.locate(xs))
+
+    def test_nan_activates_no_term(self):
+        sparse = ti.TermIndex(hb.TEMP_TERMS).fuzzify(np.array([np.nan]))
+        np.testing.assert_array_equal(sparse.dense(), [[0, 0, 0]])
+
+    def test_sparse_degrees_feed_rule_evaluation(self):
+        rng = np.random.default_rng(4)
+        readings = (rng.uniform(18, 30, 200), rng.uniform(25, 85, 200), rng.uniform(300, 1600, 200))
+        sparse = [ti.TermIndex(terms).fuzzify(x) for x, terms in zip(readings, hb.INPUT_TERMS)]
+        expected = hb.firing_strengths(hb.fuzzify_inputs(*readings))
+        np.testing.assert_allclose(hb.firing_strengths(sparse), expected)
+
+    def test_unbounded_shapes_are_rejected(self):
+        with self.assertRaises(ValueError):
+            ti.TermIndex((("Mid", "gaussian", (0, 1)),))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+import unittest
+
+import numpy as np
+
+import mylibs.hvac_batch as hb
+import mylibs.membership_functions as mf
+import mylibs.tuning as tu
+
+VARIABLES = (*hb.INPUT_TERMS, hb.HVAC_TERMS)
+UNIVERSES = (*hb.INPUT_UNIVERSES, hb.HVAC_UNIVERSE)
+
+
+class TestTuning(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        rng = np.random.default_rng(1)
+        cls.readings = np.column_stack([
+            rng.uniform(18, 30, 400), rng.uniform(25, 85, 400), rng.uniform(300, 1600, 400)
+        ])
+        cls.layout = tu.parameter_layout(VARIABLES, UNIVERSES)
+        cls.x0 = tu.pack(VARIABLES, cls.layout)
+
+        # Target produced by a shifted "comfortable" set, so a better design exists.
+        shifted = cls.x0.copy()
+        offset = cls.layout[1][2]
+        shifted[offset:offset + 3] += 1.0
+        cls.target = hb.hvac_batch(*cls.readings.T)
+        cls.shifted_target = cls._predict(shifted)
+
+    @classmethod
+    def _predict(cls, vector):
+        terms = tu.unpack(vector, VARIABLES, cls.layout)
+        degrees = [hb.fuzzify(cls.readings[:, i], terms[i]) for i in range(3)]
+        sets = hb.output_sets(hb.HVAC_UNIVERSE, terms[-1])
+        aggregated = hb.aggregate(hb.firing_strengths(degrees), sets)
+        return mf.defuzzify_centroid_batch(hb.HVAC_UNIVERSE, aggregated)
+
+    def test_pack_unpack_round_trip(self):
+        self.assertEqual(tu.unpack(self.x0, VARIABLES, self.layout), VARIABLES)
+
+    def test_hand_picked_design_scores_zero_on_its_own_output(self):
+        losses = tu.score_population(np.stack([self.x0, self.x0]), self.readings, self.target)
+        np.testing.assert_allclose(losses, [0, 0], atol=1e-18)
+
+    def test_population_scoring_matches_single_candidate_scoring(self):
+        rng = np.random.default_rng(2)
+        lower, upper = tu.bounds(self.layout)
+        population = tu.repair(self.x0 + rng.normal(size=(5, len(self.x0))), self.layout, lower, upper)
+        together = tu.score_population(population, self.readings, self.target, chunk_size=100)
+        alone = [tu.score_population(p, self.readings, self.target)[0] for p in population]
+        np.testing.assert_allclose(together, alone)
+
+    def test_repair_keeps_terms_ordered_and_in_bounds(self):
+        lower, upper = tu.bounds(self.layout)
+        population = tu.repair(np.random.default_rng(3).uniform(-500, 2000, (4, len(self.x0))),
+                               self.layout, lower, upper)
+        self.assertTrue(np.all(population >= lower) and np.all(population <= upper))
+        for *_, offset, size, _, _ in self.layout:
+            self.assertTrue(np.all(np.diff(population[:, offset:offset + size], axis=1) >= 0))
+
+    def test_tune_improves_on_hand_picked_design(self):
+        result = tu.tune(self.readings, self.shifted_target, generations=20, population_size=12, seed=0)
+        self.assertGreater(result.initial_loss, 0)
+        self.assertLess(result.loss, result.initial_loss)
+        self.assertEqual(len(result.history), 21)
+        self.assertTrue(all(a >= b for a, b in zip(result.history, result.history[1:])))
+
+    def test_parallel_workers_match_serial_run(self):
+        kwargs = dict(generations=3, population_size=8, seed=4, tune_weights=True)
+        serial = tu.tune(self.readings, self.shifted_target, workers=1, **kwargs)
+        parallel = tu.tune(self.readings, self.shifted_target, workers=2, **kwargs)
+        self.assertAlmostEqual(serial.loss, parallel.loss)
+        np.testing.assert_allclose(serial.weights, parallel.weights)
+        self.assertEqual(len(serial.weights), len(hb.HVAC_RULES))
+
+    def test_more_workers_than_members_and_too_small_populations(self):
+        kwargs = dict(generations=2, population_size=4, seed=5)
+        serial = tu.tune(self.readings, self.shifted_target, workers=1, **kwargs)
+        parallel = tu.tune(self.readings, self.shifted_target, workers=6, **kwargs)
+        self.assertAlmostEqual(serial.loss, parallel.loss)
+        with self.assertRaises(ValueError):
+            tu.tune(self.readings, self.shifted_target, population_size=3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+import unittest
+
+import numpy as np
+
+import mylibs.hvac_batch as hb
+import mylibs.membership_functions as mf
+import mylibs.type2 as t2
+
+
+def scalar_karnik_mendel(universe, lower, upper):
+    # Reference: try every switch point one at a time.
+    index = np.arange(len(universe))
+    y_l, y_r = np.inf, -np.inf
+    for k in range(-1, len(universe)):
+        left = np.where(index <= k, upper, lower)
+        right = np.where(index <= k, lower, upper)
+        if left.sum() > 0:
+            y_l = min(y_l, (left * universe).sum() / left.sum())
+        if right.sum() > 0:
+            y_r = max(y_r, (right * universe).sum() / right.sum())
+    return (0.0, 0.0) if np.isinf(y_l) else (y_l, y_r)
+
+
+class TestIntervalType2(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(11)
+        self.readings = (rng.uniform(18, 30, 300), rng.uniform(25, 85, 300), rng.uniform(300, 1600, 300))
+
+    def test_lower_never_exceeds_upper(self):
+        tables = t2.build_tables()
+        for universe, upper, lower in zip(hb.INPUT_UNIVERSES, tables.input_upper, tables.input_lower):
+            self.assertTrue(np.all(hb.fuzzify(universe, lower) <= hb.fuzzify(universe, upper)))
+        self.assertTrue(np.all(tables.sets_lower <= tables.sets_upper))
+
+    def test_zero_spread_reduces_to_type1(self):
+        tables = t2.build_tables((0, 0, 0), 0)
+        expected = hb.hvac_batch(*self.readings)
+        for reducer in t2.TYPE_REDUCERS:
+            with self.subTest(reducer):
+                result = t2.hvac_type2_batch(*self.readings, tables=tables, reducer=reducer)
+                np.testing.assert_allclose(result, expected, atol=1e-9)
+
+    def test_karnik_mendel_matches_switch_point_search(self):
+        lower, upper = t2.aggregate_interval(t2.build_tables(), *(x[:20] for x in self.readings))
+        y_l, y_r = t2.karnik_mendel(hb.HVAC_UNIVERSE, lower, upper)
+        expected = np.array([scalar_karnik_mendel(hb.HVAC_UNIVERSE, lo, up) for lo, up in zip(lower, upper)])
+        np.testing.assert_allclose(y_l, expected[:, 0], atol=1e-6)
+        np.testing.assert_allclose(y_r, expected[:, 1], atol=1e-6)
+        self.assertTrue(np.all(y_l <= y_r))
+
+    def test_interval_contains_embedded_centroids(self):
+        lower, upper = t2.aggregate_interval(t2.build_tables(), *(x[:20] for x in self.readings))
+        y_l, y_r = t2.karnik_mendel(hb.HVAC_UNIVERSE, lower, upper)
+        embedded = lower + np.random.default_rng(0).random(lower.shape) * (upper - lower)
+        centroid = mf.defuzzify_centroid_batch(hb.HVAC_UNIVERSE, embedded)
+        fired = upper.sum(axis=-1) > 0
+        self.assertTrue(np.all(centroid[fired] >= y_l[fired] - 1e-9))
+        self.assertTrue(np.all(centroid[fired] <= y_r[fired] + 1e-9))
+
+    def test_no_firing_returns_zero(self):
+        self.assertEqual(t2.hvac_type2_batch(19, 35, 1000, tables=t2.build_tables((0, 0, 0), 0))[0], 0)
+
+    def test_unknown_reducer_is_rejected(self):
+        with self.assertRaises(ValueError):
+            t2.hvac_type2_batch(24, 55, 700, reducer="centre_of_sets")
+
+
+if __name__ == "__main__":
+    unittest.main()
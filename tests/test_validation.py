@@ -0,0 +1,89 @@
+import unittest
+
+import numpy as np
+
+import mylibs.hvac_batch as hb
+import mylibs.validation as va
+
+
+class TestInputValidator(unittest.TestCase):
+
+    def test_default_ranges_cover_the_terms(self):
+        self.assertEqual(va.DEFAULT_RANGES, ((18, 30), (30, 80), (400, 1500)))
+        np.testing.assert_allclose(va.FIRING_RANGES, va.DEFAULT_RANGES)
+        # Every clamp target fires a term: the dead span ends (trapezoids with a == b) are stepped inward.
+        for (low, high), terms in zip(va.FIRING_RANGES, hb.INPUT_TERMS):
+            self.assertGreater(hb.fuzzify(low, terms).max(), 0)
+            self.assertGreater(hb.fuzzify(high, terms).max(), 0)
+
+    def test_clamped_readings_fire_the_nearest_shoulder(self):
+        result = va.InputValidator(1).validate([[17, 55, 350]])
+        temp, _, co2 = result.readings[0]
+        self.assertEqual(hb.fuzzify(temp, hb.TEMP_TERMS)[0], 1)  # Cold
+        self.assertEqual(hb.fuzzify(co2, hb.CO2_TERMS)[0], 1)  # Low CO2
+        self.assertEqual(hb.hvac_batch(*result.readings.T)[0], hb.hvac_batch(18.01, 55, 401)[0])
+
+    def test_flags(self):
+        validator = va.InputValidator(3)
+        result = validator.validate([[22, 55, 600], [np.nan, 90, 600], [17, 55, 350]])
+        np.testing.assert_array_equal(result.flags, [[0, 0, 0], [va.NAN, va.OUT_OF_RANGE, 0],
+                                                     [va.OUT_OF_RANGE, 0, va.OUT_OF_RANGE]])
+        self.assertEqual(validator.counts["nan"], 1)
+        self.assertEqual(validator.counts["out_of_range"], 3)
+
+    def test_range_bounds_are_valid_readings(self):
+        validator = va.InputValidator(2)
+        result = validator.validate([[18, 30, 400], [30, 80, 1500]])
+        np.testing.assert_array_equal(result.flags, 0)
+        np.testing.assert_array_equal(result.readings, [[18, 30, 400], [30, 80, 1500]])
+        self.assertEqual(validator.counts["out_of_range"], 0)
+
+    def test_out_of_range_values_are_clamped(self):
+        validator = va.InputValidator(2)
+        result = validator.validate([[17, 90, 350], [31, 20, 2000]])
+        np.testing.assert_array_equal(result.readings, [[np.nextafter(18, 19), 80, np.nextafter(400, 401)],
+                                                       [30, np.nextafter(30, 31), 1500]])
+        self.assertEqual(validator.counts["clamped"], 6)
+        self.assertFalse(result.fallback.any())
+
+    def test_nan_uses_last_good_value_of_the_zone(self):
+        validator = va.InputValidator(2)
+        validator.validate([[22, 55, 600], [25, 60, 900]])
+        result = validator.validate([[np.nan, 50, 700]], zones=[1])
+        np.testing.assert_array_equal(result.readings, [[25, 50, 700]])
+        self.assertEqual(validator.counts["substituted"], 1)
+        # Zone 0 never had a good value for a NaN that comes first.
+        fresh = va.InputValidator(1).validate([[np.nan, 50, 700]])
+        self.assertTrue(fresh.fallback[0])
+
+    def test_invalid_values_do_not_become_last_good(self):
+        validator = va.InputValidator(1)
+        validator.validate([[22, 55, 600]])
+        validator.validate([[35, 55, 600]])
+        np.testing.assert_array_equal(validator.last_good, [[22, 55, 600]])
+
+    def test_stale_rows_fall_back(self):
+        policy = va.ValidationPolicy(max_age=60, fallback_output=40)
+        validator = va.InputValidator(3, policy)
+        out, result = va.hvac_validated(validator, [[22, 55, 600], [28, 75, 1300], [21, 55, 600]],
+                                        timestamps=[100, 10, np.nan], now=100)
+        np.testing.assert_array_equal(result.fallback, [False, True, True])
+        np.testing.assert_allclose(out, [hb.hvac_batch(22, 55, 600)[0], 40, 40])
+        self.assertEqual(validator.counts["stale"], 2)  # rows, not values
+        self.assertEqual(validator.counts["fallback"], 2)
+
+    def test_policy_actions_are_checked(self):
+        with self.assertRaises(ValueError):
+            va.ValidationPolicy(on_nan="clamp")
+        with self.assertRaises(ValueError):
+            va.ValidationPolicy(on_stale="ignore")
+
+    def test_out_of_range_fallback(self):
+        validator = va.InputValidator(2, va.ValidationPolicy(on_out_of_range="fallback", fallback_output=50))
+        out, result = va.hvac_validated(validator, [[22, 55, 600], [22, 55, 300]])
+        np.testing.assert_array_equal(result.fallback, [False, True])
+        self.assertEqual(out[1], 50)
+
+
+if __name__ == "__main__":
+    unittest.main()
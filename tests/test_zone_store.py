@@ -0,0 +1,76 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+import mylibs.hvac_batch as hb
+import mylibs.output_stage as output_stage
+import mylibs.zone_store as zone_store
+
+NO_SMOOTHING = output_stage.SmoothingParams(tau=0, max_slew=np.inf, min_on=0, min_off=0)
+
+
+class TestZoneStore(unittest.TestCase):
+
+    def setUp(self):
+        self.ids = np.array([105, 3, 42, 7, 88])
+        self.store = zone_store.ZoneStore(self.ids, NO_SMOOTHING)
+
+    def test_records_are_sorted_and_compact(self):
+        np.testing.assert_array_equal(self.store.records["zone_id"], np.sort(self.ids))
+        self.assertEqual(self.store.nbytes, len(self.ids) * zone_store.ZONE_DTYPE.itemsize)
+
+    def test_unknown_zone_raises(self):
+        with self.assertRaises(KeyError):
+            self.store.index([3, 4])
+
+    def test_bulk_update_and_infer(self):
+        readings = np.array([[21.5, 55, 600], [28, 75, 1300], [19, 50, 450], [23.5, 52.5, 800], [26, 62, 1050]])
+        self.store.update(self.ids, *readings.T, now=10)
+        rows = self.store.infer(now=10)
+        self.assertEqual(len(rows), len(self.ids))
+        order = self.store.index(self.ids)
+        records = self.store.records[order]
+        expected = hb.hvac_batch(*readings.astype(np.float32).T)
+        np.testing.assert_allclose(records["output"], expected, rtol=1e-6)
+        np.testing.assert_allclose(records["value"], expected, rtol=1e-6)
+        np.testing.assert_array_equal(records["category"],
+                                      hb.dominant_categories(hb.evaluate_rules_batch(*readings.astype(np.float32).T)))
+        np.testing.assert_array_equal(records["temp_category"], [1, 2, 0, 1, 2])
+
+    def test_only_stale_zones_are_inferred(self):
+        self.store.update(self.ids, 22, 55, 600, now=0)
+        self.store.infer(now=0)
+        self.assertEqual(len(self.store.stale(now=5)), 0)
+        self.store.update([42, 7], 28, 75, 1300, now=5)
+        np.testing.assert_array_equal(self.store.records["zone_id"][self.store.infer(now=5)], [7, 42])
+        self.assertEqual(len(self.store.stale(now=400, max_age=300)), len(self.ids))
+
+    def test_zones_without_readings_are_not_stale(self):
+        self.store.update([3], 22, 55, 600, now=0)
+        np.testing.assert_array_equal(self.store.records["zone_id"][self.store.stale()], [3])
+
+    def test_smoothing_state_carries_over(self):
+        store = zone_store.ZoneStore([1], output_stage.SmoothingParams(tau=0, max_slew=1, min_on=0, min_off=0))
+        store.update([1], 21.5, 55, 600, now=0)
+        store.infer(now=0)
+        first = store.records["value"][0]
+        store.update([1], 28, 75, 1300, now=10)
+        store.infer(now=10)
+        self.assertAlmostEqual(store.records["value"][0], first + 10, places=4)
+
+    def test_snapshot_round_trip(self):
+        self.store.update(self.ids, 22, 55, 600, now=0)
+        self.store.infer(now=0)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "zones.npz")
+            self.store.snapshot(path)
+            restored = zone_store.ZoneStore.restore(path)
+        self.assertEqual(restored.params, self.store.params)
+        for name in zone_store.ZONE_DTYPE.names:
+            np.testing.assert_array_equal(restored.records[name], self.store.records[name])
+
+
+if __name__ == "__main__":
+    unittest.main()